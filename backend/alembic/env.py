@@ -11,11 +11,14 @@ from app.database import Base
 
 # Import all models so Alembic can detect them
 from app.auth.models import User  # noqa: F401
-from app.products.models import Product, ProductCategory, ProductImage, ProductVendor  # noqa: F401
+from app.products.models import Product, ProductCategory, ProductCategoryClosure, ProductClassification, ProductImage, ProductVendor  # noqa: F401
 from app.vendors.models import Vendor  # noqa: F401
 from app.warehouse.models import Warehouse, Zone, Location  # noqa: F401
-from app.purchasing.models import PurchaseOrder, POLineItem, GoodsReceipt, GoodsReceiptItem  # noqa: F401
-from app.inventory.models import StockLevel, StockMovement, StockAdjustment  # noqa: F401
+from app.purchasing.models import PurchaseOrder, POLineItem, GoodsReceipt, GoodsReceiptItem, ProductOnOrder, VendorPerformance  # noqa: F401
+from app.inventory.models import StockLevel, StockMovement, StockMovementDaily, StockAdjustment  # noqa: F401
+from app.idempotency.models import IdempotencyKey  # noqa: F401
+from app.exports.models import ExportWatermark  # noqa: F401
+from app.reporting.models import ReportJob  # noqa: F401
 
 config = context.config
 
@@ -8,6 +8,43 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     CORS_ORIGINS: list[str] = ["http://localhost:5173"]
+    TOPOLOGY_CACHE_TTL_SECONDS: int = 300
+    DOCUMENT_NUMBER_BLOCK_SIZE: int = 1
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    IDEMPOTENCY_CACHE_SIZE: int = 10_000
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = 600
+    DASHBOARD_KPI_TTL_SECONDS: int = 30
+    DASHBOARD_KPI_STALE_SECONDS: int = 300
+    REPORT_CACHE_MAX_ENTRIES: int = 256
+    REPORT_CACHE_TTL_SECONDS: int = 60
+    REPORT_CACHE_STALE_SECONDS: int = 300
+    # Per-report TTL overrides, e.g. {"purchase_history": 600}
+    REPORT_CACHE_TTLS: dict[str, int] = {}
+    EXPORT_DIR: str = "exports"
+    EXPORT_BATCH_SIZE: int = 50_000
+    EXPORT_WATERMARK_LAG_SECONDS: int = 60
+    FORECAST_HISTORY_DAYS: int = 730
+    FORECAST_SMOOTHING_ALPHA: float = 0.1
+    FORECAST_SERVICE_LEVEL: float = 0.95
+    FORECAST_ORDER_COVER_DAYS: int = 30
+    FORECAST_DEFAULT_LEAD_TIME_DAYS: int = 7
+    FORECAST_BATCH_SIZE: int = 10_000
+    REPORT_JOB_DIR: str = "report_jobs"
+    REPORT_JOB_WORKERS: int = 2
+    REPORT_JOB_RETENTION_HOURS: int = 24
+    REPORT_JOB_PURGE_INTERVAL_SECONDS: int = 3600
+    REPORT_VIEW_CHECK_SECONDS: int = 30
+    REPORT_VIEW_MAX_AGE_SECONDS: int = 300
+    # Source rows inserted, updated or deleted that trigger an early refresh
+    REPORT_VIEW_CHANGE_THRESHOLD: int = 1000
+    CATALOG_IMPORT_BATCH_SIZE: int = 10_000
+    # Error rows returned by an import; the counts always cover all of them
+    CATALOG_IMPORT_ERROR_LIMIT: int = 1000
+    CLASSIFICATION_HISTORY_WEEKS: int = 52
+    # Cumulative consumption-value share closing classes A and B
+    CLASSIFICATION_ABC_THRESHOLDS: tuple[float, float] = (0.8, 0.95)
+    # Weekly demand coefficient of variation closing classes X and Y
+    CLASSIFICATION_XYZ_THRESHOLDS: tuple[float, float] = (0.5, 1.0)
 
     model_config = {"env_file": ".env", "extra": "ignore"}
 
@@ -1,11 +1,11 @@
 import logging
 import uuid
 from datetime import datetime
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Callable
 
-from sqlalchemy import TIMESTAMP, func
+from sqlalchemy import TIMESTAMP, event, func
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
 
 from app.config import settings
 
@@ -27,6 +27,36 @@ class TimestampMixin:
         TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
+    # Fetch server-generated timestamps via RETURNING on UPDATE as well as INSERT,
+    # so mutated objects can be serialized without a refresh round trip.
+    __mapper_args__ = {"eager_defaults": True}
+
+
+_AFTER_COMMIT_KEY = "after_commit_callbacks"
+
+
+def run_after_commit(db: AsyncSession, callback: Callable[[], None]) -> None:
+    """Defer *callback* until the session's current transaction commits.
+
+    Callbacks are dropped if the transaction rolls back, so process-local caches
+    are only invalidated for changes other sessions can actually see.
+    """
+    db.info.setdefault(_AFTER_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session) -> None:
+    for callback in session.info.pop(_AFTER_COMMIT_KEY, []):
+        try:
+            callback()
+        except Exception:
+            logger.exception("After-commit callback failed")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit_callbacks(session: Session) -> None:
+    session.info.pop(_AFTER_COMMIT_KEY, None)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
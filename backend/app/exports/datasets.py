@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+
+from sqlalchemy import Select, String, cast, select
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.inventory.models import StockMovement
+from app.purchasing.models import POLineItem, PurchaseOrder
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    expr: ColumnElement
+    # One of: uuid, string, int32, date, timestamp, or decimal(precision,scale)
+    kind: str
+
+    def selectable(self) -> ColumnElement:
+        # UUIDs travel as text so the files load as plain strings in pandas/DuckDB
+        expr = cast(self.expr, String) if self.kind == "uuid" else self.expr
+        return expr.label(self.name)
+
+    def arrow_type(self, pa):
+        if self.kind in ("uuid", "string"):
+            return pa.string()
+        if self.kind == "int32":
+            return pa.int32()
+        if self.kind == "date":
+            return pa.date32()
+        if self.kind == "timestamp":
+            return pa.timestamp("us", tz="UTC")
+        if self.kind.startswith("decimal("):
+            precision, scale = self.kind[8:-1].split(",")
+            return pa.decimal128(int(precision), int(scale))
+        raise ValueError(f"Unknown column kind '{self.kind}'")
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """An exportable table.
+
+    ``changed_at`` decides which rows fall in a date range or an incremental
+    window: creation time for the append-only ledger, the PO's last update
+    for purchasing data.
+    """
+
+    name: str
+    columns: tuple[Column, ...]
+    changed_at: ColumnElement
+    join: tuple = ()
+
+    def query(self, since, until) -> Select:
+        query = select(*(c.selectable() for c in self.columns))
+        for target, onclause in self.join:
+            query = query.join(target, onclause)
+        if since is not None:
+            query = query.where(self.changed_at >= since)
+        return query.where(self.changed_at < until).order_by(self.changed_at, self.columns[0].expr)
+
+    def arrow_schema(self, pa):
+        return pa.schema([pa.field(c.name, c.arrow_type(pa)) for c in self.columns])
+
+
+DATASETS = {
+    dataset.name: dataset
+    for dataset in (
+        Dataset(
+            name="stock_movements",
+            columns=(
+                Column("id", StockMovement.id, "uuid"),
+                Column("movement_type", StockMovement.movement_type, "string"),
+                Column("product_id", StockMovement.product_id, "uuid"),
+                Column("from_location_id", StockMovement.from_location_id, "uuid"),
+                Column("to_location_id", StockMovement.to_location_id, "uuid"),
+                Column("quantity", StockMovement.quantity, "int32"),
+                Column("reference_type", StockMovement.reference_type, "string"),
+                Column("reference_id", StockMovement.reference_id, "uuid"),
+                Column("notes", StockMovement.notes, "string"),
+                Column("performed_by", StockMovement.performed_by, "uuid"),
+                Column("created_at", StockMovement.created_at, "timestamp"),
+            ),
+            changed_at=StockMovement.created_at,
+        ),
+        Dataset(
+            name="purchase_orders",
+            columns=(
+                Column("id", PurchaseOrder.id, "uuid"),
+                Column("po_number", PurchaseOrder.po_number, "string"),
+                Column("vendor_id", PurchaseOrder.vendor_id, "uuid"),
+                Column("status", PurchaseOrder.status, "string"),
+                Column("order_date", PurchaseOrder.order_date, "date"),
+                Column("expected_delivery_date", PurchaseOrder.expected_delivery_date, "date"),
+                Column("subtotal", PurchaseOrder.subtotal, "decimal(14,2)"),
+                Column("tax_amount", PurchaseOrder.tax_amount, "decimal(14,2)"),
+                Column("total_amount", PurchaseOrder.total_amount, "decimal(14,2)"),
+                Column("created_by", PurchaseOrder.created_by, "uuid"),
+                Column("approved_by", PurchaseOrder.approved_by, "uuid"),
+                Column("approved_at", PurchaseOrder.approved_at, "timestamp"),
+                Column("created_at", PurchaseOrder.created_at, "timestamp"),
+                Column("updated_at", PurchaseOrder.updated_at, "timestamp"),
+            ),
+            changed_at=PurchaseOrder.updated_at,
+        ),
+        Dataset(
+            name="po_line_items",
+            columns=(
+                Column("id", POLineItem.id, "uuid"),
+                Column("purchase_order_id", POLineItem.purchase_order_id, "uuid"),
+                Column("product_id", POLineItem.product_id, "uuid"),
+                Column("quantity_ordered", POLineItem.quantity_ordered, "int32"),
+                Column("quantity_received", POLineItem.quantity_received, "int32"),
+                Column("unit_price", POLineItem.unit_price, "decimal(12,2)"),
+                Column("sort_order", POLineItem.sort_order, "int32"),
+                Column("created_at", POLineItem.created_at, "timestamp"),
+                Column("po_updated_at", PurchaseOrder.updated_at, "timestamp"),
+            ),
+            # Lines carry no update time of their own; every change to them
+            # (edits, additions, removals, receipts) touches their PO. A window
+            # therefore holds all current lines of each PO changed in it, and a
+            # line removed from a draft shows up only by its absence: consumers
+            # replace the lines of every PO in the same window's purchase_orders
+            # export rather than merging rows by id.
+            changed_at=PurchaseOrder.updated_at,
+            join=((PurchaseOrder, PurchaseOrder.id == POLineItem.purchase_order_id),),
+        ),
+    )
+}
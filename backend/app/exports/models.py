@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import TIMESTAMP, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ExportWatermark(Base):
+    """How far each dataset has been exported incrementally."""
+
+    __tablename__ = "export_watermarks"
+
+    dataset: Mapped[str] = mapped_column(String(50), primary_key=True)
+    # Exclusive upper bound of the last incremental export; the next one starts here
+    exported_until: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    last_row_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
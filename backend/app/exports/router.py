@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.models import User
+from app.database import get_db
+from app.dependencies import require_roles
+
+from .schemas import ExportCreate, ExportResponse, ExportWatermarkResponse
+from .service import ExportService
+
+router = APIRouter()
+
+
+@router.get("/exports/watermarks", response_model=list[ExportWatermarkResponse])
+async def list_export_watermarks(
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_roles("admin", "manager")),
+):
+    service = ExportService(db)
+    return await service.list_watermarks()
+
+
+@router.post("/exports/{dataset}", response_model=ExportResponse, status_code=201)
+async def create_export(
+    dataset: str,
+    data: ExportCreate,
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_roles("admin", "manager")),
+):
+    service = ExportService(db)
+    window = await service.window(dataset, data.since, data.until, data.incremental)
+    return await service.write_file(window, data.format)
+
+
+@router.get("/exports/{dataset}/download")
+async def download_export(
+    dataset: str,
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_roles("admin", "manager")),
+    fmt: str = Query("parquet", alias="format", pattern="^(parquet|arrow)$"),
+    since: datetime | None = Query(None),
+    until: datetime | None = Query(None),
+    incremental: bool = Query(False),
+):
+    service = ExportService(db)
+    window = await service.window(dataset, since, until, incremental)
+    return service.stream(window, fmt)
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class ExportCreate(BaseModel):
+    format: str = Field("parquet", pattern="^(parquet|arrow)$")
+    since: datetime | None = None
+    until: datetime | None = None
+    incremental: bool = False
+
+
+class ExportResponse(BaseModel):
+    dataset: str
+    format: str
+    path: str
+    rows: int
+    bytes: int
+    since: datetime | None
+    until: datetime
+    incremental: bool
+
+
+class ExportWatermarkResponse(BaseModel):
+    dataset: str
+    exported_until: datetime
+    last_row_count: int
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,233 @@
+import asyncio
+import io
+import os
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.exceptions import BadRequestException, NotFoundException
+
+from .datasets import DATASETS, Dataset
+from .models import ExportWatermark
+
+FORMATS = {
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:
+        raise BadRequestException("Columnar exports require the 'pyarrow' package") from exc
+    return pyarrow
+
+
+def _open_writer(pa, fmt: str, sink, schema):
+    # zstd keeps files small while staying fast to decode in pandas and DuckDB
+    if fmt == "parquet":
+        return pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    return pa.ipc.new_file(sink, schema, options=options)
+
+
+def _to_batch(pa, schema, rows) -> object:
+    columns = zip(*rows) if rows else [[] for _ in schema]
+    return pa.RecordBatch.from_arrays(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after every batch."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+@dataclass(frozen=True)
+class ExportWindow:
+    dataset: Dataset
+    since: datetime | None
+    until: datetime
+    incremental: bool
+
+    def filename(self, fmt: str) -> str:
+        start = self.since.strftime("%Y%m%dT%H%M%SZ") if self.since else "start"
+        end = self.until.strftime("%Y%m%dT%H%M%SZ")
+        return f"{self.dataset.name}_{start}_{end}.{FORMATS[fmt][0]}"
+
+
+async def _record_batches(db: AsyncSession, window: ExportWindow, pa, schema) -> AsyncIterator:
+    query = window.dataset.query(window.since, window.until)
+    result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+    async for partition in result.partitions():
+        yield _to_batch(pa, schema, partition)
+
+
+async def _advance_watermark(db: AsyncSession, window: ExportWindow, rows: int) -> None:
+    stmt = pg_insert(ExportWatermark).values(
+        dataset=window.dataset.name, exported_until=window.until, last_row_count=rows
+    )
+    # Never move a watermark backwards if an overlapping export finished first
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ExportWatermark.dataset],
+            set_={
+                "exported_until": stmt.excluded.exported_until,
+                "last_row_count": stmt.excluded.last_row_count,
+                "updated_at": func.now(),
+            },
+            where=ExportWatermark.exported_until < stmt.excluded.exported_until,
+        )
+    )
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class ExportService:
+    """Columnar exports of the stock ledger and purchasing tables.
+
+    Rows are read from a server-side cursor ``EXPORT_BATCH_SIZE`` at a time
+    and each batch becomes one Arrow record batch (one row group in
+    Parquet), so memory is bounded by the batch size. Incremental exports
+    cover ``[watermark, now - EXPORT_WATERMARK_LAG_SECONDS)``; the lag
+    leaves room for transactions that were still open at the cut-off. The
+    watermark only moves once the whole file has been written, so an
+    interrupted export is simply repeated.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_watermarks(self) -> list[ExportWatermark]:
+        result = await self.db.execute(select(ExportWatermark).order_by(ExportWatermark.dataset))
+        return list(result.scalars().all())
+
+    async def window(
+        self,
+        dataset: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        incremental: bool = False,
+    ) -> ExportWindow:
+        if dataset not in DATASETS:
+            raise NotFoundException(f"Unknown export dataset '{dataset}'")
+        since, until = _as_utc(since), _as_utc(until)
+        now = (await self.db.execute(select(func.clock_timestamp()))).scalar_one()
+        if incremental:
+            if since is not None or until is not None:
+                raise BadRequestException("Incremental exports take no since/until range")
+            since = (
+                await self.db.execute(
+                    select(ExportWatermark.exported_until).where(
+                        ExportWatermark.dataset == dataset
+                    )
+                )
+            ).scalar_one_or_none()
+            until = now - timedelta(seconds=settings.EXPORT_WATERMARK_LAG_SECONDS)
+            if since is not None and until <= since:
+                until = since
+        else:
+            until = until or now
+            if since is not None and since >= until:
+                raise BadRequestException("'since' must be before 'until'")
+        return ExportWindow(DATASETS[dataset], since, _as_utc(until), incremental)
+
+    async def write_file(self, window: ExportWindow, fmt: str) -> dict:
+        pa = _pyarrow()
+        schema = window.dataset.arrow_schema(pa)
+        path = Path(settings.EXPORT_DIR) / window.dataset.name / window.filename(fmt)
+        partial = path.with_name(path.name + ".part")
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        rows = 0
+        writer = await asyncio.to_thread(_open_writer, pa, fmt, str(partial), schema)
+        try:
+            async for batch in _record_batches(self.db, window, pa, schema):
+                await asyncio.to_thread(writer.write_batch, batch)
+                rows += batch.num_rows
+            await asyncio.to_thread(writer.close)
+        except BaseException:
+            writer.close()
+            partial.unlink(missing_ok=True)
+            raise
+        os.replace(partial, path)
+
+        if window.incremental:
+            await _advance_watermark(self.db, window, rows)
+        return {
+            "dataset": window.dataset.name,
+            "format": fmt,
+            "path": str(path),
+            "rows": rows,
+            "bytes": path.stat().st_size,
+            "since": window.since,
+            "until": window.until,
+            "incremental": window.incremental,
+        }
+
+    @staticmethod
+    def stream(window: ExportWindow, fmt: str) -> StreamingResponse:
+        pa = _pyarrow()
+        return StreamingResponse(
+            _stream(window, fmt, pa),
+            media_type=FORMATS[fmt][1],
+            headers={"Content-Disposition": f'attachment; filename="{window.filename(fmt)}"'},
+        )
+
+
+async def _stream(window: ExportWindow, fmt: str, pa) -> AsyncIterator[bytes]:
+    schema = window.dataset.arrow_schema(pa)
+    sink = _ChunkSink()
+    writer = _open_writer(pa, fmt, sink, schema)
+    rows = 0
+    # The request's session is closed before the body is sent, so the cursor
+    # (and the watermark update) get a session of their own
+    async with async_session() as db:
+        async for batch in _record_batches(db, window, pa, schema):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+        if window.incremental:
+            await _advance_watermark(db, window, rows)
+            await db.commit()
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import engine, run_after_commit
+from app.exceptions import ConflictException
+
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+REPLAY_HEADER = "Idempotent-Replayed"
+_PURGE_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class StoredResponse:
+    request_hash: str
+    status_code: int
+    body: object
+    expires_at: datetime
+
+
+class _RecentResponses:
+    """Bounded LRU of committed responses, so hot retries skip the database."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[tuple[uuid.UUID, str], StoredResponse] = OrderedDict()
+
+    def get(self, user_id: uuid.UUID, key: str) -> StoredResponse | None:
+        entry = self._entries.get((user_id, key))
+        if entry is None:
+            return None
+        if entry.expires_at <= datetime.now(timezone.utc):
+            del self._entries[(user_id, key)]
+            return None
+        self._entries.move_to_end((user_id, key))
+        return entry
+
+    def put(self, user_id: uuid.UUID, key: str, entry: StoredResponse) -> None:
+        self._entries[(user_id, key)] = entry
+        self._entries.move_to_end((user_id, key))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+recent_responses = _RecentResponses(settings.IDEMPOTENCY_CACHE_SIZE)
+_last_purge = 0.0
+
+
+class IdempotentRequest:
+    """Handle for one request carrying an ``Idempotency-Key``.
+
+    ``replay`` is set when the key was already used for the same request;
+    otherwise the caller performs the write and passes its response to
+    ``save``, which stores it in the same transaction as the write.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession | None = None,
+        user_id: uuid.UUID | None = None,
+        key: str | None = None,
+        request_hash: str | None = None,
+        replay: JSONResponse | None = None,
+    ):
+        self.db = db
+        self.user_id = user_id
+        self.key = key
+        self.request_hash = request_hash
+        self.replay = replay
+
+    async def save(self, response: BaseModel, status_code: int) -> BaseModel:
+        if self.db is None:
+            return response
+        body = jsonable_encoder(response)
+        result = await self.db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == self.user_id, IdempotencyKey.key == self.key)
+            .values(status_code=status_code, response_body=body)
+            .returning(IdempotencyKey.expires_at)
+        )
+        entry = StoredResponse(self.request_hash, status_code, body, result.scalar_one())
+        user_id, key = self.user_id, self.key
+        run_after_commit(self.db, lambda: recent_responses.put(user_id, key, entry))
+        return response
+
+
+class IdempotencyService:
+    """Claims ``Idempotency-Key`` values and replays their stored responses.
+
+    A key is claimed by inserting a placeholder row in the request's own
+    transaction. A concurrent retry with the same key blocks on the primary
+    key until the first attempt commits (and is then replayed) or rolls back
+    (and then claims the key itself), so the write path never runs twice.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def _hash(scope: str, payload: BaseModel, params: dict) -> str:
+        document = {
+            "scope": scope,
+            "body": payload.model_dump(mode="json"),
+            "params": jsonable_encoder(params),
+        }
+        encoded = json.dumps(document, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    @staticmethod
+    def _replay(entry: StoredResponse, request_hash: str) -> JSONResponse:
+        if entry.request_hash != request_hash:
+            raise ConflictException("Idempotency-Key was already used for a different request")
+        return JSONResponse(
+            status_code=entry.status_code, content=entry.body, headers={REPLAY_HEADER: "true"}
+        )
+
+    async def begin(
+        self,
+        key: str | None,
+        user_id: uuid.UUID,
+        scope: str,
+        payload: BaseModel,
+        **params,
+    ) -> IdempotentRequest:
+        if not key:
+            return IdempotentRequest()
+        request_hash = self._hash(scope, payload, params)
+
+        cached = recent_responses.get(user_id, key)
+        if cached is not None:
+            return IdempotentRequest(replay=self._replay(cached, request_hash))
+
+        await self._purge_expired()
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+        claim = pg_insert(IdempotencyKey).values(
+            user_id=user_id,
+            key=key,
+            scope=scope,
+            request_hash=request_hash,
+            expires_at=expires_at,
+        )
+        # An expired row that has not been purged yet is taken over in place
+        claimed = (
+            await self.db.execute(
+                claim.on_conflict_do_update(
+                    index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+                    set_={
+                        "scope": scope,
+                        "request_hash": request_hash,
+                        "status_code": None,
+                        "response_body": None,
+                        "created_at": func.now(),
+                        "expires_at": expires_at,
+                    },
+                    where=IdempotencyKey.expires_at <= func.now(),
+                ).returning(IdempotencyKey.key)
+            )
+        ).scalar_one_or_none()
+        if claimed is not None:
+            return IdempotentRequest(self.db, user_id, key, request_hash)
+
+        row = (
+            await self.db.execute(
+                select(IdempotencyKey).where(
+                    IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+                )
+            )
+        ).scalar_one()
+        if row.status_code is None:
+            raise ConflictException("A request with this Idempotency-Key is still in progress")
+        entry = StoredResponse(row.request_hash, row.status_code, row.response_body, row.expires_at)
+        recent_responses.put(user_id, key, entry)
+        return IdempotentRequest(replay=self._replay(entry, request_hash))
+
+    @staticmethod
+    async def _purge_expired() -> None:
+        """Delete a batch of expired keys at most once per purge interval.
+
+        Runs on its own connection so the request transaction never holds
+        locks on unrelated keys.
+        """
+        global _last_purge
+        now = time.monotonic()
+        if now - _last_purge < settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS:
+            return
+        _last_purge = now
+        expired = (
+            select(IdempotencyKey.user_id, IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at <= func.now())
+            .limit(_PURGE_BATCH_SIZE)
+        )
+        try:
+            async with engine.begin() as conn:
+                result = await conn.execute(
+                    delete(IdempotencyKey).where(
+                        tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_(expired)
+                    )
+                )
+            if result.rowcount:
+                logger.info("Purged %d expired idempotency keys", result.rowcount)
+        except Exception:
+            logger.exception("Could not purge expired idempotency keys")
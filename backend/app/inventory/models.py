@@ -1,7 +1,7 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import TIMESTAMP, ForeignKey, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy import TIMESTAMP, Date, ForeignKey, Integer, String, Text, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -27,6 +27,7 @@ class StockLevel(Base):
     __table_args__ = (
         UniqueConstraint("product_id", "location_id", name="uq_stock_product_location"),
     )
+    __mapper_args__ = {"eager_defaults": True}
 
 
 class StockMovement(Base):
@@ -51,8 +52,29 @@ class StockMovement(Base):
         UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
     )
     created_at: Mapped[datetime] = mapped_column(
-        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
+
+
+# Daily in/out totals per product and location, maintained by MovementRollupService
+class StockMovementDaily(Base):
+    __tablename__ = "stock_movement_daily"
+
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    location_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("locations.id", ondelete="CASCADE"), primary_key=True
     )
+    # UTC calendar day of the movements' created_at
+    day: Mapped[date] = mapped_column(Date, primary_key=True, index=True)
+    quantity_in: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    quantity_out: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Movements touching this location, by movement_type
+    in_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    out_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    adjustment_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    transfer_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
 
 class StockAdjustment(Base):
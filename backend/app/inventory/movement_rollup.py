@@ -0,0 +1,135 @@
+import uuid
+from collections import defaultdict
+from datetime import date
+
+from sqlalchemy import Date, Integer, case, delete, func, insert, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import StockMovement, StockMovementDaily
+
+MOVEMENT_TYPES = ("in", "out", "adjustment", "transfer")
+# Stock leaving the business; transfers only move it between locations
+DEMAND_MOVEMENT_TYPES = ("out", "adjustment")
+
+_COUNTERS = (
+    "quantity_in",
+    "quantity_out",
+    *(f"{movement_type}_count" for movement_type in MOVEMENT_TYPES),
+)
+
+
+def _utc_day(timestamp):
+    return func.timezone("UTC", timestamp).cast(Date)
+
+
+def movement_values(movement: StockMovement) -> dict:
+    """The columns ``MovementRollupService.record`` needs from a pending movement."""
+    return {
+        "movement_type": movement.movement_type,
+        "product_id": movement.product_id,
+        "from_location_id": movement.from_location_id,
+        "to_location_id": movement.to_location_id,
+        "quantity": movement.quantity,
+    }
+
+
+def _movement_sides():
+    """One row per (movement, location touched), with that side's in/out quantity."""
+
+    def side(location, quantity_in, quantity_out):
+        return select(
+            StockMovement.product_id,
+            location.label("location_id"),
+            _utc_day(StockMovement.created_at).label("day"),
+            StockMovement.movement_type,
+            quantity_in.label("quantity_in"),
+            quantity_out.label("quantity_out"),
+        ).where(location.is_not(None))
+
+    zero = literal(0, Integer)
+    return union_all(
+        side(StockMovement.to_location_id, StockMovement.quantity, zero),
+        side(StockMovement.from_location_id, zero, StockMovement.quantity),
+    ).subquery()
+
+
+class MovementRollupService:
+    """Keeps ``stock_movement_daily`` in step with ``stock_movements``.
+
+    Writers pass the movements they insert to ``record``, which adds them to
+    the current day's rows in one upsert. A transfer counts as out at its
+    source and in at its destination. ``backfill`` rebuilds the rollup from
+    the ledger, from a given day onwards.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record(self, movements: list[dict]) -> None:
+        """Add *movements* (``StockMovement`` column dicts) inserted in this transaction."""
+        totals: dict[tuple[uuid.UUID, uuid.UUID], dict[str, int]] = defaultdict(
+            lambda: dict.fromkeys(_COUNTERS, 0)
+        )
+        for movement in movements:
+            count = f"{movement['movement_type']}_count"
+            for side, location_id in (
+                ("quantity_in", movement.get("to_location_id")),
+                ("quantity_out", movement.get("from_location_id")),
+            ):
+                if location_id is None:
+                    continue
+                row = totals[(movement["product_id"], location_id)]
+                row[side] += movement["quantity"]
+                if count in row:
+                    row[count] += 1
+        if not totals:
+            return
+
+        # now() is the transaction timestamp, the same value the movements'
+        # created_at defaults to, so both agree on the day. Rows go in key
+        # order, so concurrent writers lock them in the same order.
+        stmt = pg_insert(StockMovementDaily).values([
+            {"product_id": product_id, "location_id": location_id, "day": _utc_day(func.now()), **row}
+            for (product_id, location_id), row in sorted(totals.items())
+        ])
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    StockMovementDaily.product_id,
+                    StockMovementDaily.location_id,
+                    StockMovementDaily.day,
+                ],
+                set_={
+                    name: getattr(StockMovementDaily, name) + getattr(stmt.excluded, name)
+                    for name in _COUNTERS
+                },
+            )
+        )
+
+    async def backfill(self, since: date | None = None) -> int:
+        """Recompute all rollup rows from *since* (or from the beginning)."""
+        sides = _movement_sides()
+        rows = select(
+            sides.c.product_id,
+            sides.c.location_id,
+            sides.c.day,
+            func.sum(sides.c.quantity_in),
+            func.sum(sides.c.quantity_out),
+            *(
+                func.count(case((sides.c.movement_type == movement_type, 1)))
+                for movement_type in MOVEMENT_TYPES
+            ),
+        ).group_by(sides.c.product_id, sides.c.location_id, sides.c.day)
+
+        cleared = delete(StockMovementDaily)
+        if since is not None:
+            rows = rows.where(sides.c.day >= since)
+            cleared = cleared.where(StockMovementDaily.day >= since)
+        await self.db.execute(cleared)
+        result = await self.db.execute(
+            insert(StockMovementDaily).from_select(
+                ["product_id", "location_id", "day", *_COUNTERS], rows
+            )
+        )
+        return result.rowcount
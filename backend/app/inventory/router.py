@@ -1,18 +1,23 @@
 import uuid
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.models import User
 from app.database import get_db
 from app.dependencies import get_current_active_user
+from app.idempotency.service import IdempotencyService
+from app.warehouse.topology import topology
 
+from .models import StockMovement
 from .schemas import (
     AggregatedStockResponse,
     ReorderAlertResponse,
     StockAdjustmentCreate,
     StockAdjustmentResponse,
     StockLevelResponse,
+    StockLocationResponse,
+    StockLocationRollupResponse,
     StockMovementResponse,
     StockTransferCreate,
 )
@@ -21,6 +26,13 @@ from .service import InventoryService
 router = APIRouter()
 
 
+def _movement_response(movement: StockMovement) -> StockMovementResponse:
+    response = StockMovementResponse.model_validate(movement)
+    response.from_location_path = topology.path(movement.from_location_id)
+    response.to_location_path = topology.path(movement.to_location_id)
+    return response
+
+
 @router.get("/inventory/stock-levels", response_model=dict)
 async def get_stock_levels(
     db: AsyncSession = Depends(get_db),
@@ -28,9 +40,15 @@ async def get_stock_levels(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     search: str | None = Query(None),
+    abc_class: str | None = Query(None, pattern="^[ABC]$"),
+    xyz_class: str | None = Query(None, pattern="^[XYZ]$"),
+    category_id: uuid.UUID | None = Query(None),
+    include_descendants: bool = Query(False),
 ):
     service = InventoryService(db)
-    items, total = await service.get_aggregated_stock(skip, limit, search)
+    items, total = await service.get_aggregated_stock(
+        skip, limit, search, abc_class, xyz_class, category_id, include_descendants
+    )
     return {
         "items": items,
         "total": total,
@@ -40,26 +58,34 @@ async def get_stock_levels(
     }
 
 
-@router.get("/inventory/stock-levels/by-location", response_model=list[StockLevelResponse])
+@router.get("/inventory/stock-levels/by-location", response_model=dict)
 async def get_stock_by_location(
     db: AsyncSession = Depends(get_db),
     _: User = Depends(get_current_active_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    warehouse_id: uuid.UUID | None = Query(None),
+    zone_id: uuid.UUID | None = Query(None),
     product_id: uuid.UUID | None = Query(None),
+    rollup: bool = Query(False),
 ):
     service = InventoryService(db)
-    items = await service.get_stock_by_location(product_id)
-    results = []
-    for item in items:
-        results.append(StockLevelResponse(
-            id=item.id,
-            product_id=item.product_id,
-            location_id=item.location_id,
-            quantity_on_hand=item.quantity_on_hand,
-            quantity_reserved=item.quantity_reserved,
-            quantity_available=item.quantity_on_hand - item.quantity_reserved,
-            updated_at=item.updated_at,
-        ))
-    return results
+    if rollup:
+        totals = await service.get_stock_location_rollup(warehouse_id, zone_id, product_id)
+        return {
+            "items": [StockLocationRollupResponse(**t) for t in totals],
+            "total": len(totals),
+        }
+    items, total = await service.list_stock_by_location(
+        skip, limit, warehouse_id, zone_id, product_id
+    )
+    return {
+        "items": [StockLocationResponse(**i) for i in items],
+        "total": total,
+        "page": skip // limit + 1,
+        "page_size": limit,
+        "total_pages": (total + limit - 1) // limit if limit else 1,
+    }
 
 
 @router.get("/inventory/stock-levels/product/{product_id}", response_model=list[StockLevelResponse])
@@ -76,6 +102,7 @@ async def get_product_stock(
             id=item.id,
             product_id=item.product_id,
             location_id=item.location_id,
+            location_path=topology.path(item.location_id),
             quantity_on_hand=item.quantity_on_hand,
             quantity_reserved=item.quantity_reserved,
             quantity_available=item.quantity_on_hand - item.quantity_reserved,
@@ -107,9 +134,16 @@ async def create_adjustment(
     data: StockAdjustmentCreate,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
+    idempotency_key: str | None = Header(None, max_length=255),
 ):
+    request = await IdempotencyService(db).begin(
+        idempotency_key, current_user.id, "inventory.adjustment", data
+    )
+    if request.replay:
+        return request.replay
     service = InventoryService(db)
-    return await service.create_adjustment(data, current_user.id)
+    adjustment = await service.create_adjustment(data, current_user.id)
+    return await request.save(StockAdjustmentResponse.model_validate(adjustment), 201)
 
 
 @router.get("/inventory/adjustments", response_model=dict)
@@ -142,7 +176,7 @@ async def list_movements(
     service = InventoryService(db)
     items, total = await service.list_movements(skip, limit, product_id, movement_type)
     return {
-        "items": [StockMovementResponse.model_validate(i) for i in items],
+        "items": [_movement_response(i) for i in items],
         "total": total,
         "page": skip // limit + 1,
         "page_size": limit,
@@ -155,6 +189,13 @@ async def create_transfer(
     data: StockTransferCreate,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
+    idempotency_key: str | None = Header(None, max_length=255),
 ):
+    request = await IdempotencyService(db).begin(
+        idempotency_key, current_user.id, "inventory.transfer", data
+    )
+    if request.replay:
+        return request.replay
     service = InventoryService(db)
-    return await service.create_transfer(data, current_user.id)
+    movement = await service.create_transfer(data, current_user.id)
+    return await request.save(_movement_response(movement), 201)
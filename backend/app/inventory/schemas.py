@@ -8,6 +8,7 @@ class StockLevelResponse(BaseModel):
     id: uuid.UUID
     product_id: uuid.UUID
     location_id: uuid.UUID
+    location_path: str | None = None
     quantity_on_hand: int
     quantity_reserved: int
     quantity_available: int = 0
@@ -16,6 +17,35 @@ class StockLevelResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class StockLocationResponse(BaseModel):
+    id: uuid.UUID
+    product_id: uuid.UUID
+    product_sku: str
+    product_name: str
+    location_id: uuid.UUID
+    location_code: str
+    zone_id: uuid.UUID
+    zone_code: str
+    warehouse_id: uuid.UUID
+    warehouse_code: str
+    quantity_on_hand: int
+    quantity_reserved: int
+    quantity_available: int
+    updated_at: datetime
+
+
+class StockLocationRollupResponse(BaseModel):
+    warehouse_id: uuid.UUID
+    warehouse_code: str
+    zone_id: uuid.UUID | None
+    zone_code: str | None
+    level: str
+    product_count: int
+    total_on_hand: int
+    total_reserved: int
+    total_available: int
+
+
 class AggregatedStockResponse(BaseModel):
     product_id: uuid.UUID
     product_sku: str
@@ -23,9 +53,12 @@ class AggregatedStockResponse(BaseModel):
     total_on_hand: int
     total_reserved: int
     total_available: int
+    quantity_on_order: int = 0
     reorder_point: int
     cost_price: float | None
     stock_value: float | None
+    abc_class: str | None = None
+    xyz_class: str | None = None
 
 
 class StockAdjustmentCreate(BaseModel):
@@ -62,7 +95,9 @@ class StockMovementResponse(BaseModel):
     movement_type: str
     product_id: uuid.UUID
     from_location_id: uuid.UUID | None
+    from_location_path: str | None = None
     to_location_id: uuid.UUID | None
+    to_location_path: str | None = None
     quantity: int
     reference_type: str | None
     reference_id: uuid.UUID | None
@@ -78,6 +113,7 @@ class ReorderAlertResponse(BaseModel):
     product_sku: str
     product_name: str
     total_on_hand: int
+    quantity_on_order: int = 0
     reorder_point: int
     reorder_quantity: int
     deficit: int
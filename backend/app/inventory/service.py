@@ -1,12 +1,18 @@
 import uuid
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.exceptions import BadRequestException, NotFoundException
-from app.products.models import Product
+from app.products.category_tree import category_filter
+from app.products.models import Product, ProductClassification
+from app.purchasing.models import ProductOnOrder
+from app.reporting.cache import STOCK, invalidate_after_commit
+from app.warehouse.models import Location, Warehouse, Zone
+from app.warehouse.topology import topology
 
 from .models import StockAdjustment, StockLevel, StockMovement
+from .movement_rollup import MovementRollupService, movement_values
 from .schemas import StockAdjustmentCreate, StockTransferCreate
 
 
@@ -19,6 +25,10 @@ class InventoryService:
         skip: int = 0,
         limit: int = 20,
         search: str | None = None,
+        abc_class: str | None = None,
+        xyz_class: str | None = None,
+        category_id: uuid.UUID | None = None,
+        include_descendants: bool = False,
     ) -> tuple[list[dict], int]:
         query = (
             select(
@@ -27,13 +37,33 @@ class InventoryService:
                 Product.name.label("product_name"),
                 func.coalesce(func.sum(StockLevel.quantity_on_hand), 0).label("total_on_hand"),
                 func.coalesce(func.sum(StockLevel.quantity_reserved), 0).label("total_reserved"),
+                func.coalesce(ProductOnOrder.quantity, 0).label("quantity_on_order"),
                 Product.reorder_point,
                 Product.cost_price,
+                ProductClassification.abc_class,
+                ProductClassification.xyz_class,
             )
             .outerjoin(StockLevel, StockLevel.product_id == Product.id)
+            .outerjoin(ProductOnOrder, ProductOnOrder.product_id == Product.id)
+            .outerjoin(ProductClassification, ProductClassification.product_id == Product.id)
             .where(Product.status == "active")
-            .group_by(Product.id, Product.sku, Product.name, Product.reorder_point, Product.cost_price)
+            .group_by(
+                Product.id,
+                Product.sku,
+                Product.name,
+                Product.reorder_point,
+                Product.cost_price,
+                ProductOnOrder.quantity,
+                ProductClassification.abc_class,
+                ProductClassification.xyz_class,
+            )
         )
+        if abc_class:
+            query = query.where(ProductClassification.abc_class == abc_class)
+        if xyz_class:
+            query = query.where(ProductClassification.xyz_class == xyz_class)
+        if category_id:
+            query = query.where(category_filter(category_id, include_descendants))
 
         if search:
             query = query.where(
@@ -60,9 +90,12 @@ class InventoryService:
                 "total_on_hand": on_hand,
                 "total_reserved": reserved,
                 "total_available": available,
+                "quantity_on_order": row.quantity_on_order,
                 "reorder_point": row.reorder_point,
                 "cost_price": float(row.cost_price) if row.cost_price else None,
                 "stock_value": stock_value,
+                "abc_class": row.abc_class,
+                "xyz_class": row.xyz_class,
             })
         return items, total
 
@@ -73,8 +106,130 @@ class InventoryService:
         if product_id:
             query = query.where(StockLevel.product_id == product_id)
         result = await self.db.execute(query)
+        await topology.ensure_loaded()
         return list(result.scalars().all())
 
+    @staticmethod
+    def _location_filters(
+        query,
+        warehouse_id: uuid.UUID | None = None,
+        zone_id: uuid.UUID | None = None,
+        product_id: uuid.UUID | None = None,
+    ):
+        if warehouse_id:
+            query = query.where(Zone.warehouse_id == warehouse_id)
+        if zone_id:
+            query = query.where(Location.zone_id == zone_id)
+        if product_id:
+            query = query.where(StockLevel.product_id == product_id)
+        return query
+
+    async def list_stock_by_location(
+        self,
+        skip: int = 0,
+        limit: int = 20,
+        warehouse_id: uuid.UUID | None = None,
+        zone_id: uuid.UUID | None = None,
+        product_id: uuid.UUID | None = None,
+    ) -> tuple[list[dict], int]:
+        query = self._location_filters(
+            select(
+                StockLevel.id,
+                StockLevel.product_id,
+                Product.sku.label("product_sku"),
+                Product.name.label("product_name"),
+                StockLevel.location_id,
+                Location.code.label("location_code"),
+                Zone.id.label("zone_id"),
+                Zone.code.label("zone_code"),
+                Warehouse.id.label("warehouse_id"),
+                Warehouse.code.label("warehouse_code"),
+                StockLevel.quantity_on_hand,
+                StockLevel.quantity_reserved,
+                StockLevel.updated_at,
+            )
+            .join(Product, Product.id == StockLevel.product_id)
+            .join(Location, Location.id == StockLevel.location_id)
+            .join(Zone, Zone.id == Location.zone_id)
+            .join(Warehouse, Warehouse.id == Zone.warehouse_id),
+            warehouse_id,
+            zone_id,
+            product_id,
+        )
+        count_query = self._location_filters(
+            select(func.count())
+            .select_from(StockLevel)
+            .join(Location, Location.id == StockLevel.location_id)
+            .join(Zone, Zone.id == Location.zone_id),
+            warehouse_id,
+            zone_id,
+            product_id,
+        )
+
+        total = (await self.db.execute(count_query)).scalar() or 0
+        result = await self.db.execute(
+            query.order_by(Warehouse.code, Zone.code, Location.code, Product.sku)
+            .offset(skip)
+            .limit(limit)
+        )
+        items = []
+        for row in result.all():
+            item = row._asdict()
+            item["quantity_available"] = row.quantity_on_hand - row.quantity_reserved
+            items.append(item)
+        return items, total
+
+    async def get_stock_location_rollup(
+        self,
+        warehouse_id: uuid.UUID | None = None,
+        zone_id: uuid.UUID | None = None,
+        product_id: uuid.UUID | None = None,
+    ) -> list[dict]:
+        # One GROUPING SETS pass yields both the per-warehouse and per-zone totals;
+        # grouping(zones.id) = 1 marks the warehouse-level rows.
+        query = self._location_filters(
+            select(
+                Warehouse.id.label("warehouse_id"),
+                Warehouse.code.label("warehouse_code"),
+                Zone.id.label("zone_id"),
+                Zone.code.label("zone_code"),
+                func.grouping(Zone.id).label("is_warehouse_total"),
+                func.count(func.distinct(StockLevel.product_id)).label("product_count"),
+                func.coalesce(func.sum(StockLevel.quantity_on_hand), 0).label("total_on_hand"),
+                func.coalesce(func.sum(StockLevel.quantity_reserved), 0).label("total_reserved"),
+            )
+            .select_from(StockLevel)
+            .join(Location, Location.id == StockLevel.location_id)
+            .join(Zone, Zone.id == Location.zone_id)
+            .join(Warehouse, Warehouse.id == Zone.warehouse_id)
+            .group_by(
+                func.grouping_sets(
+                    tuple_(Warehouse.id, Warehouse.code),
+                    tuple_(Warehouse.id, Warehouse.code, Zone.id, Zone.code),
+                )
+            ),
+            warehouse_id,
+            zone_id,
+            product_id,
+        )
+        result = await self.db.execute(
+            query.order_by(Warehouse.code, func.grouping(Zone.id).desc(), Zone.code)
+        )
+        return [
+            {
+                "warehouse_id": row.warehouse_id,
+                "warehouse_code": row.warehouse_code,
+                "zone_id": row.zone_id,
+                "zone_code": row.zone_code,
+                "level": "warehouse" if row.is_warehouse_total else "zone",
+                "product_count": row.product_count,
+                "total_on_hand": row.total_on_hand,
+                "total_reserved": row.total_reserved,
+                "total_available": row.total_on_hand - row.total_reserved,
+            }
+            for row in result.all()
+        ]
+
     async def get_stock_valuation(self) -> dict:
         result = await self.db.execute(
             select(
@@ -108,10 +263,12 @@ class InventoryService:
                 Product.sku.label("product_sku"),
                 Product.name.label("product_name"),
                 func.coalesce(subquery.c.total_on_hand, 0).label("total_on_hand"),
+                func.coalesce(ProductOnOrder.quantity, 0).label("quantity_on_order"),
                 Product.reorder_point,
                 Product.reorder_quantity,
             )
             .outerjoin(subquery, subquery.c.product_id == Product.id)
+            .outerjoin(ProductOnOrder, ProductOnOrder.product_id == Product.id)
             .where(
                 Product.status == "active",
                 Product.reorder_point > 0,
@@ -129,6 +286,7 @@ class InventoryService:
                 "product_sku": row.product_sku,
                 "product_name": row.product_name,
                 "total_on_hand": row.total_on_hand,
+                "quantity_on_order": row.quantity_on_order,
                 "reorder_point": row.reorder_point,
                 "reorder_quantity": row.reorder_quantity,
                 "deficit": row.reorder_point - row.total_on_hand,
@@ -184,9 +342,10 @@ class InventoryService:
             performed_by=user_id,
         )
         self.db.add(movement)
+        await MovementRollupService(self.db).record([movement_values(movement)])
 
         await self.db.flush()
-        await self.db.refresh(adjustment)
+        invalidate_after_commit(self.db, STOCK)
         return adjustment
 
     async def list_adjustments(
@@ -254,8 +413,10 @@ class InventoryService:
             performed_by=user_id,
         )
         self.db.add(movement)
+        await MovementRollupService(self.db).record([movement_values(movement)])
         await self.db.flush()
-        await self.db.refresh(movement)
+        invalidate_after_commit(self.db, STOCK)
+        await topology.ensure_loaded()
         return movement
 
     async def list_movements(
@@ -279,4 +440,5 @@ class InventoryService:
         result = await self.db.execute(
             query.order_by(StockMovement.created_at.desc()).offset(skip).limit(limit)
         )
+        await topology.ensure_loaded()
         return list(result.scalars().all()), total
@@ -16,6 +16,10 @@ from app.warehouse.router import router as warehouse_router
 from app.purchasing.router import router as purchasing_router
 from app.inventory.router import router as inventory_router
 from app.reporting.router import router as reporting_router
+from app.reporting.jobs import report_workers
+from app.reporting.views import report_view_scheduler
+from app.exports.router import router as exports_router
+from app.warehouse.topology import topology
 
 logging.basicConfig(
     level=logging.INFO,
@@ -32,7 +36,16 @@ RATE_LIMIT_MAX_REQUESTS = 10  # per window
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Application starting up")
+    try:
+        await topology.load()
+    except Exception:
+        # Not fatal: the topology is loaded lazily on first use
+        logger.exception("Could not preload warehouse topology")
+    await report_workers.start()
+    report_view_scheduler.start()
     yield
+    await report_view_scheduler.stop()
+    await report_workers.stop()
     logger.info("Application shutting down")
 
 
@@ -93,6 +106,7 @@ app.include_router(warehouse_router, prefix="/api/v1", tags=["Warehouse"])
 app.include_router(purchasing_router, prefix="/api/v1", tags=["Purchasing"])
 app.include_router(inventory_router, prefix="/api/v1", tags=["Inventory"])
 app.include_router(reporting_router, prefix="/api/v1", tags=["Dashboard & Reports"])
+app.include_router(exports_router, prefix="/api/v1", tags=["Exports"])
 
 
 @app.get("/api/v1/health")
@@ -0,0 +1,117 @@
+import logging
+import re
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, cast, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+_CODE_PATTERN = re.compile(r"^[a-z][a-z0-9_]*$")
+
+
+@dataclass(frozen=True)
+class DocumentType:
+    """A numbered document series, e.g. ``PO-20260001``.
+
+    ``column`` is only read once per year, when the backing sequence is first
+    created, so that new sequences continue after numbers issued before the
+    allocator existed.
+    """
+
+    code: str
+    prefix: str
+    column: InstrumentedAttribute | None = None
+    width: int = 4
+    block_size: int = 1
+
+    def __post_init__(self):
+        if not _CODE_PATTERN.match(self.code):
+            raise ValueError(f"Invalid document type code '{self.code}'")
+
+    def sequence_name(self, year: int) -> str:
+        return f"docnum_{self.code}_{year}"
+
+    def format(self, year: int, value: int) -> str:
+        return f"{self.prefix}-{year}{value:0{self.width}d}"
+
+
+# Sequences known to exist and numbers pre-allocated to this worker, per (code, year)
+_known_sequences: set[str] = set()
+_reserved: dict[tuple[str, int], deque[int]] = defaultdict(deque)
+
+
+class DocumentNumberService:
+    """Allocates document numbers from one Postgres sequence per type and year.
+
+    ``nextval`` never blocks and is not rolled back, so concurrent creates
+    cannot collide; the trade-off is that numbers drawn by a failed
+    transaction leave gaps. With ``block_size > 1`` each worker reserves a
+    block of values per round trip, so numbers are unique but not strictly
+    in creation order across workers.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def next_number(self, doc_type: DocumentType) -> str:
+        year = datetime.now(timezone.utc).year
+        reserved = _reserved[(doc_type.code, year)]
+        if not reserved:
+            reserved.extend(await self._nextval(doc_type, year, doc_type.block_size))
+        return doc_type.format(year, reserved.popleft())
+
+    async def allocate(self, doc_type: DocumentType, count: int) -> list[str]:
+        """Allocate *count* numbers in a single round trip."""
+        if count <= 0:
+            return []
+        year = datetime.now(timezone.utc).year
+        values = await self._nextval(doc_type, year, count)
+        return [doc_type.format(year, value) for value in values]
+
+    async def _nextval(self, doc_type: DocumentType, year: int, count: int) -> list[int]:
+        sequence = doc_type.sequence_name(year)
+        if sequence not in _known_sequences:
+            await self._ensure_sequence(doc_type, year)
+        result = await self.db.execute(
+            text(f"SELECT nextval('{sequence}') FROM generate_series(1, :count)"),
+            {"count": count},
+        )
+        return sorted(result.scalars().all())
+
+    async def _ensure_sequence(self, doc_type: DocumentType, year: int) -> None:
+        sequence = doc_type.sequence_name(year)
+        # DDL runs on its own connection so the sequence survives a rollback of
+        # the calling request; the advisory lock serialises concurrent creators.
+        async with engine.begin() as conn:
+            await conn.execute(
+                select(func.pg_advisory_xact_lock(func.hashtext(sequence)))
+            )
+            exists = (
+                await conn.execute(select(func.to_regclass(sequence)))
+            ).scalar()
+            if exists is None:
+                start = await self._highest_issued(conn, doc_type, year) + 1
+                await conn.execute(
+                    text(f"CREATE SEQUENCE {sequence} START WITH {int(start)}")
+                )
+                logger.info("Created document number sequence %s starting at %d", sequence, start)
+        _known_sequences.add(sequence)
+
+    @staticmethod
+    async def _highest_issued(conn, doc_type: DocumentType, year: int) -> int:
+        if doc_type.column is None:
+            return 0
+        series = f"{doc_type.prefix}-{year}"
+        suffix = func.substr(doc_type.column, len(series) + 1)
+        result = await conn.execute(
+            select(func.max(cast(suffix, BigInteger)))
+            .where(doc_type.column.like(f"{series}%"))
+            .where(suffix.regexp_match("^[0-9]+$"))
+        )
+        return result.scalar() or 0
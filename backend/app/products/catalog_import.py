@@ -0,0 +1,304 @@
+import asyncio
+import codecs
+import csv
+import json
+from collections.abc import Iterator
+from itertools import islice
+from typing import BinaryIO
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.exceptions import BadRequestException
+from app.reporting.cache import PRODUCTS, invalidate_after_commit
+
+# Import column -> the SQL type its text must parse as
+_TYPED_COLUMNS = {
+    "weight_kg": "numeric(10,3)",
+    "length_cm": "numeric(10,2)",
+    "width_cm": "numeric(10,2)",
+    "height_cm": "numeric(10,2)",
+    "reorder_point": "integer",
+    "reorder_quantity": "integer",
+    "cost_price": "numeric(12,2)",
+}
+_TEXT_COLUMNS = {
+    "sku": 50,
+    "name": 255,
+    "description": None,
+    "unit_of_measure": 20,
+    "barcode": 50,
+    "status": 10,
+}
+# "category" holds the category name and is resolved to category_id
+IMPORT_COLUMNS = (*_TEXT_COLUMNS, *_TYPED_COLUMNS, "category")
+_REQUIRED_COLUMNS = ("sku", "name")
+# Applied to new products only; blank cells never overwrite stored values
+_DEFAULTS = {
+    "unit_of_measure": "'each'",
+    "status": "'active'",
+    "reorder_point": "0",
+    "reorder_quantity": "0",
+}
+
+_STAGING = "product_import_staging"
+_ERRORS = "product_import_errors"
+
+
+def _clean(value: str | None) -> str | None:
+    # Blank values are missing values, not empty strings
+    return (value.strip() or None) if value else None
+
+
+def _record(line: int, row: dict) -> tuple[int, dict | None, str | None]:
+    # Postgres text cannot hold NUL, so COPY would fail the whole file
+    if any("\x00" in value for value in row.values() if value):
+        return line, None, "Row contains a NUL character"
+    return line, row, None
+
+
+def _csv_records(file: BinaryIO) -> Iterator[tuple[int, dict | None, str | None]]:
+    reader = csv.DictReader(codecs.iterdecode(file, "utf-8-sig"))
+    try:
+        _check_columns(reader.fieldnames or [])
+        for row in reader:
+            if None in row:
+                yield reader.line_num, None, "Row has more values than the header"
+                continue
+            yield _record(reader.line_num, {key: _clean(value) for key, value in row.items()})
+    except UnicodeDecodeError as exc:
+        raise BadRequestException("File is not valid UTF-8") from exc
+    except csv.Error as exc:
+        # The reader cannot resynchronise after a malformed record
+        raise BadRequestException(f"Invalid CSV on line {reader.line_num}: {exc}") from exc
+
+
+def _ndjson_records(file: BinaryIO) -> Iterator[tuple[int, dict | None, str | None]]:
+    try:
+        for line_number, line in enumerate(codecs.iterdecode(file, "utf-8-sig"), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, None, "Invalid JSON"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "Expected a JSON object"
+                continue
+            unknown = set(row) - set(IMPORT_COLUMNS)
+            if unknown:
+                yield line_number, None, f"Unknown fields: {', '.join(sorted(unknown))}"
+                continue
+            yield _record(line_number, {
+                key: None if value is None else _clean(str(value)) for key, value in row.items()
+            })
+    except UnicodeDecodeError as exc:
+        raise BadRequestException("File is not valid UTF-8") from exc
+
+
+def _next_batch(records: Iterator, size: int) -> tuple[list[tuple], list[tuple], set[str]]:
+    """COPY rows for the staging and error tables from the next *size* records."""
+    staged, rejected, columns = [], [], set()
+    for line, row, error in islice(records, size):
+        if error:
+            rejected.append((line, None, error))
+        else:
+            columns.update(row)
+            staged.append((line, *(row.get(name) for name in IMPORT_COLUMNS)))
+    return staged, rejected, columns
+
+
+def _check_columns(columns: list[str]) -> None:
+    missing = [name for name in _REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise BadRequestException(f"Missing required columns: {', '.join(missing)}")
+    unknown = [name for name in columns if name not in IMPORT_COLUMNS]
+    if unknown:
+        raise BadRequestException(f"Unknown columns: {', '.join(unknown)}")
+
+
+def _validation_checks() -> list[str]:
+    """SELECTs of (line, sku, error) for every invalid staged row."""
+    checks = [
+        f"SELECT line, sku, '{name} is required' FROM {_STAGING} WHERE {name} IS NULL"
+        for name in _REQUIRED_COLUMNS
+    ]
+    checks += [
+        f"SELECT line, sku, '{name} is longer than {length} characters' "
+        f"FROM {_STAGING} WHERE length({name}) > {length}"
+        for name, length in _TEXT_COLUMNS.items()
+        if length
+    ]
+    checks += [
+        f"SELECT line, sku, '{name} is not a valid {sql_type}' FROM {_STAGING} "
+        f"WHERE NOT pg_input_is_valid({name}, '{sql_type}')"
+        for name, sql_type in _TYPED_COLUMNS.items()
+    ]
+    checks += [
+        f"SELECT line, sku, '{name} must not be negative' FROM {_STAGING} "
+        f"WHERE CASE WHEN pg_input_is_valid({name}, '{sql_type}') THEN {name}::numeric < 0 END"
+        for name, sql_type in _TYPED_COLUMNS.items()
+    ]
+    checks += [
+        f"SELECT line, sku, 'status must be active or inactive' FROM {_STAGING} "
+        "WHERE status NOT IN ('active', 'inactive')",
+        f"SELECT s.line, s.sku, 'Unknown category ''' || s.category || '''' FROM {_STAGING} s "
+        "WHERE s.category IS NOT NULL "
+        "AND NOT EXISTS (SELECT 1 FROM product_categories c WHERE c.name = s.category)",
+        # Later repeats of a SKU or barcode are rejected; the first one wins
+        "SELECT line, sku, 'Duplicate SKU, first given on line ' || first_line FROM ("
+        "  SELECT line, sku, min(line) OVER (PARTITION BY sku) AS first_line"
+        f"  FROM {_STAGING} WHERE sku IS NOT NULL"
+        ") d WHERE line > first_line",
+        "SELECT line, sku, 'Duplicate barcode, first given on line ' || first_line FROM ("
+        "  SELECT line, sku, min(line) OVER (PARTITION BY barcode) AS first_line"
+        f"  FROM {_STAGING} WHERE barcode IS NOT NULL"
+        ") d WHERE line > first_line",
+        f"SELECT s.line, s.sku, 'Barcode is already used by ' || p.sku FROM {_STAGING} s "
+        "JOIN products p ON p.barcode = s.barcode WHERE p.sku <> s.sku",
+    ]
+    return checks
+
+
+def _upsert_statement(columns: set[str]) -> str:
+    """INSERT ... ON CONFLICT (sku) for the valid staged rows.
+
+    A blank cell, or a column the file does not have, leaves the stored
+    value of an existing product alone, and rows identical to the stored
+    product are not rewritten at all.
+    """
+    values = {}
+    for name in _TEXT_COLUMNS:
+        if name in columns:
+            values[name] = f"s.{name}"
+    for name, sql_type in _TYPED_COLUMNS.items():
+        if name in columns:
+            values[name] = f"s.{name}::{sql_type}"
+    for name, default in _DEFAULTS.items():
+        # NOT NULL columns: a blank falls back to the existing product's
+        # value first, so the default only ever reaches new products
+        staged = f"{values[name]}, " if name in values else ""
+        values[name] = f"coalesce({staged}p.{name}, {default})"
+    if "category" in columns:
+        values["category_id"] = "c.id"
+
+    inserted = ", ".join(values)
+    selected = ", ".join(values.values())
+    updated = {
+        name: f"coalesce(EXCLUDED.{name}, products.{name})"
+        for name in values
+        if name != "sku" and (name in columns or name == "category_id")
+    }
+    if updated:
+        assignments = ", ".join(f"{name} = {value}" for name, value in updated.items())
+        changed = " OR ".join(
+            f"products.{name} IS DISTINCT FROM {value}" for name, value in updated.items()
+        )
+        conflict = f"DO UPDATE SET {assignments}, updated_at = now() WHERE {changed}"
+    else:
+        conflict = "DO NOTHING"
+    return (
+        f"INSERT INTO products (id, {inserted}, created_at, updated_at) "
+        f"SELECT gen_random_uuid(), {selected}, now(), now() FROM {_STAGING} s "
+        "LEFT JOIN products p ON p.sku = s.sku "
+        "LEFT JOIN product_categories c ON c.name = s.category "
+        f"WHERE NOT EXISTS (SELECT 1 FROM {_ERRORS} e WHERE e.line = s.line) "
+        f"ON CONFLICT (sku) {conflict} "
+        # xmax is 0 only for rows this statement inserted
+        "RETURNING (xmax = 0) AS inserted"
+    )
+
+
+class CatalogImportService:
+    """Bulk-loads a supplier catalog file into ``products``.
+
+    The file is parsed as a stream, a batch at a time on a worker thread,
+    and copied into a temporary staging table with ``COPY``,
+    ``CATALOG_IMPORT_BATCH_SIZE`` rows at a time. All
+    validation then runs as set-based SQL over the staging table, and every
+    valid row is upserted on SKU in a single statement. Invalid rows are
+    skipped and reported with their line number, so one bad row does not
+    hold up the rest of the catalog.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def import_file(self, file: BinaryIO, fmt: str, dry_run: bool = False) -> dict:
+        connection = await self.db.connection()
+        await connection.execute(text(f"DROP TABLE IF EXISTS {_STAGING}, {_ERRORS}"))
+        staged_columns = ", ".join(f"{name} text" for name in IMPORT_COLUMNS)
+        await connection.execute(
+            text(f"CREATE TEMP TABLE {_STAGING} (line integer, {staged_columns}) ON COMMIT DROP")
+        )
+        await connection.execute(
+            text(f"CREATE TEMP TABLE {_ERRORS} (line integer, sku text, error text) ON COMMIT DROP")
+        )
+        driver = (await connection.get_raw_connection()).driver_connection
+
+        records = _csv_records(file) if fmt == "csv" else _ndjson_records(file)
+        rows, columns = await self._copy(driver, records)
+
+        await connection.execute(text(f"CREATE INDEX ON {_STAGING} (sku)"))
+        await connection.execute(text(f"ANALYZE {_STAGING}"))
+        for check in _validation_checks():
+            await connection.execute(text(f"INSERT INTO {_ERRORS} (line, sku, error) {check}"))
+
+        inserted = updated = 0
+        if not dry_run:
+            result = await connection.execute(text(_upsert_statement(columns)))
+            for (was_inserted,) in result:
+                if was_inserted:
+                    inserted += 1
+                else:
+                    updated += 1
+            if inserted or updated:
+                invalidate_after_commit(self.db, PRODUCTS)
+
+        invalid, error_count = (
+            await connection.execute(text(f"SELECT count(DISTINCT line), count(*) FROM {_ERRORS}"))
+        ).one()
+        errors = (
+            await connection.execute(
+                text(
+                    f"SELECT line, sku, error FROM {_ERRORS} ORDER BY line, error LIMIT :limit"
+                ),
+                {"limit": settings.CATALOG_IMPORT_ERROR_LIMIT},
+            )
+        ).mappings().all()
+        return {
+            "rows": rows,
+            "valid": rows - invalid,
+            "invalid": invalid,
+            "inserted": inserted,
+            "updated": updated,
+            "unchanged": 0 if dry_run else rows - invalid - inserted - updated,
+            "dry_run": dry_run,
+            "errors": [dict(error) for error in errors],
+            "errors_truncated": error_count > len(errors),
+        }
+
+    @staticmethod
+    async def _copy(driver, records) -> tuple[int, set[str]]:
+        rows = 0
+        columns: set[str] = set()
+        while True:
+            # Reading the upload (spooled to disk past 1 MB) and parsing both
+            # block, so every batch is pulled on a worker thread
+            staged, rejected, seen = await asyncio.to_thread(
+                _next_batch, records, settings.CATALOG_IMPORT_BATCH_SIZE
+            )
+            if not staged and not rejected:
+                return rows, columns
+            rows += len(staged) + len(rejected)
+            columns |= seen
+            if staged:
+                await driver.copy_records_to_table(
+                    _STAGING, records=staged, columns=["line", *IMPORT_COLUMNS]
+                )
+            if rejected:
+                await driver.copy_records_to_table(
+                    _ERRORS, records=rejected, columns=["line", "sku", "error"]
+                )
@@ -0,0 +1,137 @@
+import uuid
+
+from sqlalchemy import delete, insert, literal, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.exceptions import BadRequestException
+
+from .models import Product, ProductCategory, ProductCategoryClosure
+
+closure = ProductCategoryClosure
+
+
+def subtree_ids(category_id: uuid.UUID):
+    """The category and all of its descendants, as a subquery of ids."""
+    return select(closure.descendant_id).where(closure.ancestor_id == category_id)
+
+
+def category_filter(category_id: uuid.UUID, include_descendants: bool = False):
+    if include_descendants:
+        return Product.category_id.in_(subtree_ids(category_id))
+    return Product.category_id == category_id
+
+
+class CategoryTree:
+    """Keeps ``product_category_closure`` in step with ``parent_id``."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add(self, category_id: uuid.UUID, parent_id: uuid.UUID | None) -> None:
+        rows = select(
+            literal(category_id).label("ancestor_id"),
+            literal(category_id).label("descendant_id"),
+            literal(0).label("depth"),
+        )
+        if parent_id is not None:
+            rows = rows.union_all(
+                select(closure.ancestor_id, literal(category_id), closure.depth + 1).where(
+                    closure.descendant_id == parent_id
+                )
+            )
+        await self.db.execute(
+            insert(closure).from_select(["ancestor_id", "descendant_id", "depth"], rows)
+        )
+
+    async def _detach(self, category_id: uuid.UUID) -> None:
+        """Cut the subtree under *category_id* off from the category's ancestors."""
+        await self.db.execute(
+            delete(closure).where(
+                closure.descendant_id.in_(subtree_ids(category_id)),
+                closure.ancestor_id.in_(
+                    select(closure.ancestor_id).where(
+                        closure.descendant_id == category_id, closure.ancestor_id != category_id
+                    )
+                ),
+            )
+        )
+
+    async def move(self, category_id: uuid.UUID, parent_id: uuid.UUID | None) -> None:
+        if parent_id is not None:
+            cycle = (
+                await self.db.execute(
+                    select(closure.depth).where(
+                        closure.ancestor_id == category_id, closure.descendant_id == parent_id
+                    )
+                )
+            ).first()
+            if cycle is not None:
+                raise BadRequestException(
+                    "A category cannot be moved under itself or one of its descendants"
+                )
+        await self._detach(category_id)
+        if parent_id is None:
+            return
+        above, below = aliased(closure), aliased(closure)
+        await self.db.execute(
+            insert(closure).from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                # Every ancestor of the new parent paired with every node of the subtree
+                select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1)
+                .select_from(above)
+                .join(below, true())
+                .where(above.descendant_id == parent_id, below.ancestor_id == category_id),
+            )
+        )
+
+    async def remove(self, category_id: uuid.UUID) -> None:
+        """Drop a category's pairs; its children become roots, as ``parent_id`` does."""
+        await self._detach(category_id)
+        await self.db.execute(
+            delete(closure).where(
+                (closure.ancestor_id == category_id) | (closure.descendant_id == category_id)
+            )
+        )
+
+    async def rebuild(self) -> int:
+        """Recompute the whole closure from ``parent_id``."""
+        category = aliased(ProductCategory)
+        tree = select(
+            ProductCategory.id.label("ancestor_id"),
+            ProductCategory.id.label("descendant_id"),
+            literal(0).label("depth"),
+        ).cte("tree", recursive=True)
+        tree = tree.union_all(
+            select(tree.c.ancestor_id, category.id, tree.c.depth + 1).join(
+                category, category.parent_id == tree.c.descendant_id
+            )
+        )
+        await self.db.execute(delete(closure))
+        result = await self.db.execute(
+            insert(closure).from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                select(tree.c.ancestor_id, tree.c.descendant_id, tree.c.depth),
+            )
+        )
+        return result.rowcount
+
+    async def nested(self, root_id: uuid.UUID | None = None) -> list[dict]:
+        """The category tree (or the subtree under *root_id*) as nested dicts."""
+        query = select(ProductCategory.id, ProductCategory.name, ProductCategory.parent_id)
+        if root_id is not None:
+            query = query.where(ProductCategory.id.in_(subtree_ids(root_id)))
+        rows = (await self.db.execute(query.order_by(ProductCategory.name))).all()
+
+        nodes = {
+            row.id: {"id": row.id, "name": row.name, "parent_id": row.parent_id, "children": []}
+            for row in rows
+        }
+        roots = []
+        for node in nodes.values():
+            parent = nodes.get(node["parent_id"])
+            if parent is None:
+                roots.append(node)
+            else:
+                parent["children"].append(node)
+        return roots
@@ -0,0 +1,145 @@
+from datetime import datetime, time, timedelta, timezone
+
+from sqlalchemy import Date, Float, case, delete, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.inventory.models import StockMovement
+from app.inventory.movement_rollup import DEMAND_MOVEMENT_TYPES
+
+from .models import Product, ProductClassification
+
+
+class ClassificationService:
+    """ABC/XYZ classification of active products.
+
+    ABC ranks products by consumption value (demand over the last
+    ``CLASSIFICATION_HISTORY_WEEKS`` weeks times cost price): the products
+    making up the first ``CLASSIFICATION_ABC_THRESHOLDS[0]`` of total value
+    are A, up to ``[1]`` B, the rest C. XYZ buckets the coefficient of
+    variation of weekly demand by ``CLASSIFICATION_XYZ_THRESHOLDS``; products
+    without demand are Z. Everything, including the running value share,
+    is computed by one INSERT ... SELECT with window functions.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _classification_query(self, today):
+        weeks = settings.CLASSIFICATION_HISTORY_WEEKS
+        start = today - timedelta(weeks=weeks)
+        day = func.timezone("UTC", StockMovement.created_at).cast(Date)
+        week = (day - start) // 7
+        weekly = (
+            select(
+                StockMovement.product_id,
+                week.label("week"),
+                func.sum(StockMovement.quantity).label("quantity"),
+            )
+            .where(
+                StockMovement.movement_type.in_(DEMAND_MOVEMENT_TYPES),
+                StockMovement.from_location_id.is_not(None),
+                StockMovement.created_at >= datetime.combine(start, time(), tzinfo=timezone.utc),
+                StockMovement.created_at < datetime.combine(today, time(), tzinfo=timezone.utc),
+            )
+            .group_by(StockMovement.product_id, week)
+            .subquery()
+        )
+        # Weeks without demand are zeros, so the moments are taken over all weeks
+        demand = (
+            select(
+                weekly.c.product_id,
+                (func.sum(weekly.c.quantity).cast(Float) / weeks).label("mean"),
+                (func.sum(weekly.c.quantity * weekly.c.quantity).cast(Float) / weeks).label(
+                    "mean_square"
+                ),
+            )
+            .group_by(weekly.c.product_id)
+            .subquery()
+        )
+        value = (
+            func.coalesce(demand.c.mean, 0) * weeks * func.coalesce(Product.cost_price, 0)
+        ).label("value")
+        cv = (
+            func.sqrt(func.greatest(demand.c.mean_square - demand.c.mean * demand.c.mean, 0))
+            / func.nullif(demand.c.mean, 0)
+        ).label("cv")
+        products = (
+            select(Product.id.label("product_id"), value, cv)
+            .outerjoin(demand, demand.c.product_id == Product.id)
+            .where(Product.status == "active")
+            .subquery()
+        )
+        running = func.sum(products.c.value).over(
+            order_by=(products.c.value.desc(), products.c.product_id), rows=(None, 0)
+        )
+        ranked = select(
+            products,
+            ((running - products.c.value) / func.nullif(func.sum(products.c.value).over(), 0))
+            .label("share_before"),
+        ).subquery()
+
+        a_share, b_share = settings.CLASSIFICATION_ABC_THRESHOLDS
+        x_cv, y_cv = settings.CLASSIFICATION_XYZ_THRESHOLDS
+        return select(
+            ranked.c.product_id,
+            case(
+                (ranked.c.value <= 0, "C"),
+                (ranked.c.share_before < a_share, "A"),
+                (ranked.c.share_before < b_share, "B"),
+                else_="C",
+            ),
+            case(
+                (ranked.c.cv.is_(None), "Z"),
+                (ranked.c.cv <= x_cv, "X"),
+                (ranked.c.cv <= y_cv, "Y"),
+                else_="Z",
+            ),
+            ranked.c.value,
+            ranked.c.cv,
+            literal(today, Date),
+        )
+
+    async def classify(self) -> dict:
+        today = datetime.now(timezone.utc).date()
+        await self.db.execute(delete(ProductClassification))
+        await self.db.execute(
+            insert(ProductClassification).from_select(
+                [
+                    "product_id",
+                    "abc_class",
+                    "xyz_class",
+                    "consumption_value",
+                    "demand_cv",
+                    "classified_on",
+                ],
+                self._classification_query(today),
+            )
+        )
+        return await self.summary()
+
+    async def summary(self) -> dict:
+        result = await self.db.execute(
+            select(
+                ProductClassification.abc_class,
+                ProductClassification.xyz_class,
+                func.count().label("products"),
+                func.sum(ProductClassification.consumption_value).label("consumption_value"),
+                func.max(ProductClassification.classified_on).label("classified_on"),
+            )
+            .group_by(ProductClassification.abc_class, ProductClassification.xyz_class)
+            .order_by(ProductClassification.abc_class, ProductClassification.xyz_class)
+        )
+        rows = result.all()
+        return {
+            "classified_on": max((r.classified_on for r in rows), default=None),
+            "classes": [
+                {
+                    "abc_class": r.abc_class,
+                    "xyz_class": r.xyz_class,
+                    "products": r.products,
+                    "consumption_value": float(r.consumption_value),
+                }
+                for r in rows
+            ],
+        }
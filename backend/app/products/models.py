@@ -1,7 +1,7 @@
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import TIMESTAMP, Boolean, ForeignKey, Integer, Numeric, String, Text, UniqueConstraint, func
+from sqlalchemy import TIMESTAMP, Boolean, Date, Float, ForeignKey, Integer, Numeric, String, Text, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -94,3 +94,40 @@ class ProductVendor(Base):
     __table_args__ = (
         UniqueConstraint("product_id", "vendor_id", name="uq_product_vendor"),
     )
+
+
+# ABC (consumption value) / XYZ (demand variability) class per product,
+# recomputed in one statement by ClassificationService
+class ProductClassification(Base):
+    __tablename__ = "product_classifications"
+
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    abc_class: Mapped[str] = mapped_column(String(1), nullable=False, index=True)
+    xyz_class: Mapped[str] = mapped_column(String(1), nullable=False, index=True)
+    consumption_value: Mapped[float] = mapped_column(Numeric(16, 2), nullable=False, default=0)
+    # Coefficient of variation of weekly demand; NULL without any demand
+    demand_cv: Mapped[float | None] = mapped_column(Float, nullable=True)
+    classified_on: Mapped[date] = mapped_column(Date, nullable=False)
+
+
+class ProductCategoryClosure(Base):
+    """Every (ancestor, descendant) pair of the category tree, self-pairs included.
+
+    Maintained by ``CategoryTree`` whenever categories are created, moved or
+    deleted, so a whole subtree is one indexed lookup on ``ancestor_id``.
+    """
+
+    __tablename__ = "product_category_closure"
+
+    ancestor_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("product_categories.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("product_categories.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
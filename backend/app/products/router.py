@@ -1,15 +1,16 @@
 import uuid
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, File, Query, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.models import User
 from app.database import get_db
-from app.dependencies import get_current_active_user
+from app.dependencies import get_current_active_user, require_roles
 
 from .schemas import (
     CategoryCreate,
     CategoryResponse,
+    CategoryTreeNode,
     CategoryUpdate,
     ProductCreate,
     ProductImageCreate,
@@ -17,6 +18,9 @@ from .schemas import (
     ProductResponse,
     ProductUpdate,
 )
+from .catalog_import import CatalogImportService
+from .category_tree import CategoryTree
+from .classification import ClassificationService
 from .service import ProductService
 
 router = APIRouter()
@@ -33,6 +37,23 @@ async def list_categories(
     return await service.list_categories()
 
 
+@router.get("/product-categories/tree", response_model=list[CategoryTreeNode])
+async def get_category_tree(
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(get_current_active_user),
+    root_id: uuid.UUID | None = Query(None),
+):
+    return await CategoryTree(db).nested(root_id)
+
+
+@router.post("/product-categories/tree/rebuild")
+async def rebuild_category_tree(
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_roles("admin")),
+):
+    return {"pairs": await CategoryTree(db).rebuild()}
+
+
 @router.post("/product-categories", response_model=CategoryResponse, status_code=201)
 async def create_category(
     data: CategoryCreate,
@@ -75,11 +96,26 @@ async def list_products(
     search: str | None = Query(None),
     status: str | None = Query(None),
     category_id: uuid.UUID | None = Query(None),
+    abc_class: str | None = Query(None, pattern="^[ABC]$"),
+    xyz_class: str | None = Query(None, pattern="^[XYZ]$"),
+    fields: str | None = Query(None, description="Comma-separated product fields, e.g. id,sku,name"),
+    include: str | None = Query(None, pattern="^images$"),
+    include_descendants: bool = Query(False),
 ):
     service = ProductService(db)
-    items, total = await service.list_products(skip, limit, search, status, category_id)
+    if fields:
+        items, total = await service.list_product_fields(
+            tuple(name.strip() for name in fields.split(",") if name.strip()),
+            include == "images",
+            skip, limit, search, status, category_id, abc_class, xyz_class, include_descendants,
+        )
+    else:
+        products, total = await service.list_products(
+            skip, limit, search, status, category_id, abc_class, xyz_class, include_descendants
+        )
+        items = [ProductResponse.model_validate(p) for p in products]
     return {
-        "items": [ProductResponse.model_validate(p) for p in items],
+        "items": items,
         "total": total,
         "page": skip // limit + 1,
         "page_size": limit,
@@ -87,6 +123,14 @@ async def list_products(
     }
 
 
+@router.post("/products/classifications/rebuild")
+async def rebuild_product_classifications(
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_roles("admin", "manager")),
+):
+    return await ClassificationService(db).classify()
+
+
 @router.post("/products", response_model=ProductResponse, status_code=201)
 async def create_product(
     data: ProductCreate,
@@ -97,6 +141,20 @@ async def create_product(
     return await service.create_product(data)
 
 
+@router.post("/products/import")
+async def import_products(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_roles("admin", "manager")),
+    fmt: str | None = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    dry_run: bool = Query(False),
+):
+    if fmt is None:
+        # Falls back to the file extension, then to CSV
+        fmt = "ndjson" if (file.filename or "").lower().endswith((".ndjson", ".jsonl")) else "csv"
+    return await CatalogImportService(db).import_file(file.file, fmt, dry_run)
+
+
 @router.get("/products/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: uuid.UUID,
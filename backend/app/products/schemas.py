@@ -23,6 +23,13 @@ class CategoryResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class CategoryTreeNode(BaseModel):
+    id: uuid.UUID
+    name: str
+    parent_id: uuid.UUID | None
+    children: list["CategoryTreeNode"] = []
+
+
 class ProductImageResponse(BaseModel):
     id: uuid.UUID
     url: str
@@ -88,6 +95,10 @@ class ProductResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+# Columns a product list can be narrowed to with ``fields=``
+PRODUCT_FIELDS = tuple(name for name in ProductResponse.model_fields if name != "images")
+
+
 class ProductImageCreate(BaseModel):
     url: str = Field(..., max_length=500)
     is_primary: bool = False
@@ -1,13 +1,22 @@
 import uuid
 
-from sqlalchemy import func, select
+from sqlalchemy import Float, Numeric, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.exceptions import ConflictException, NotFoundException
+from app.exceptions import BadRequestException, ConflictException, NotFoundException
+from app.reporting.cache import PRODUCTS, invalidate_after_commit
 
-from .models import Product, ProductCategory, ProductImage
-from .schemas import CategoryCreate, CategoryUpdate, ProductCreate, ProductImageCreate, ProductUpdate
+from .category_tree import CategoryTree, category_filter
+from .models import Product, ProductCategory, ProductClassification, ProductImage
+from .schemas import (
+    PRODUCT_FIELDS,
+    CategoryCreate,
+    CategoryUpdate,
+    ProductCreate,
+    ProductImageCreate,
+    ProductUpdate,
+)
 
 
 class ProductService:
@@ -24,7 +33,7 @@ class ProductService:
         category = ProductCategory(**data.model_dump())
         self.db.add(category)
         await self.db.flush()
-        await self.db.refresh(category)
+        await CategoryTree(self.db).add(category.id, category.parent_id)
         return category
 
     async def update_category(self, category_id: uuid.UUID, data: CategoryUpdate) -> ProductCategory:
@@ -34,10 +43,12 @@ class ProductService:
         category = result.scalar_one_or_none()
         if not category:
             raise NotFoundException("Category not found")
-        for key, value in data.model_dump(exclude_unset=True).items():
+        changes = data.model_dump(exclude_unset=True)
+        if "parent_id" in changes and changes["parent_id"] != category.parent_id:
+            await CategoryTree(self.db).move(category.id, changes["parent_id"])
+        for key, value in changes.items():
             setattr(category, key, value)
         await self.db.flush()
-        await self.db.refresh(category)
         return category
 
     async def delete_category(self, category_id: uuid.UUID) -> None:
@@ -47,8 +58,34 @@ class ProductService:
         category = result.scalar_one_or_none()
         if not category:
             raise NotFoundException("Category not found")
+        await CategoryTree(self.db).remove(category.id)
         await self.db.delete(category)
 
+    @staticmethod
+    def _product_filters(
+        search: str | None = None,
+        status: str | None = None,
+        category_id: uuid.UUID | None = None,
+        abc_class: str | None = None,
+        xyz_class: str | None = None,
+        include_descendants: bool = False,
+    ) -> list:
+        filters = []
+        if search:
+            filters.append(Product.name.ilike(f"%{search}%") | Product.sku.ilike(f"%{search}%"))
+        if status:
+            filters.append(Product.status == status)
+        if category_id:
+            filters.append(category_filter(category_id, include_descendants))
+        if abc_class or xyz_class:
+            classified = select(ProductClassification.product_id)
+            if abc_class:
+                classified = classified.where(ProductClassification.abc_class == abc_class)
+            if xyz_class:
+                classified = classified.where(ProductClassification.xyz_class == xyz_class)
+            filters.append(Product.id.in_(classified))
+        return filters
+
     async def list_products(
         self,
         skip: int = 0,
@@ -56,26 +93,93 @@ class ProductService:
         search: str | None = None,
         status: str | None = None,
         category_id: uuid.UUID | None = None,
+        abc_class: str | None = None,
+        xyz_class: str | None = None,
+        include_descendants: bool = False,
     ) -> tuple[list[Product], int]:
-        query = select(Product).options(selectinload(Product.images))
-        count_query = select(func.count()).select_from(Product)
+        filters = self._product_filters(
+            search, status, category_id, abc_class, xyz_class, include_descendants
+        )
+        total = (
+            await self.db.execute(select(func.count()).select_from(Product).where(*filters))
+        ).scalar() or 0
+        result = await self.db.execute(
+            select(Product)
+            .options(selectinload(Product.images))
+            .where(*filters)
+            .order_by(Product.name)
+            .offset(skip)
+            .limit(limit)
+        )
+        return list(result.scalars().all()), total
 
-        if search:
-            search_filter = Product.name.ilike(f"%{search}%") | Product.sku.ilike(f"%{search}%")
-            query = query.where(search_filter)
-            count_query = count_query.where(search_filter)
-        if status:
-            query = query.where(Product.status == status)
-            count_query = count_query.where(Product.status == status)
-        if category_id:
-            query = query.where(Product.category_id == category_id)
-            count_query = count_query.where(Product.category_id == category_id)
+    @staticmethod
+    def _projected(name: str):
+        column = getattr(Product, name)
+        # Serialised as numbers, as ProductResponse does, not as decimal strings
+        if isinstance(column.type, Numeric):
+            return column.cast(Float).label(name)
+        return column
 
-        total = (await self.db.execute(count_query)).scalar() or 0
+    async def list_product_fields(
+        self,
+        fields: tuple[str, ...],
+        include_images: bool = False,
+        skip: int = 0,
+        limit: int = 20,
+        search: str | None = None,
+        status: str | None = None,
+        category_id: uuid.UUID | None = None,
+        abc_class: str | None = None,
+        xyz_class: str | None = None,
+        include_descendants: bool = False,
+    ) -> tuple[list[dict], int]:
+        """Like ``list_products``, but selects only *fields* and returns plain rows.
+
+        Nothing is hydrated into ORM objects; images are only read, in one
+        query for the whole page, when *include_images* is set.
+        """
+        unknown = set(fields) - set(PRODUCT_FIELDS)
+        if unknown:
+            raise BadRequestException(f"Unknown product fields: {', '.join(sorted(unknown))}")
+        # The id is always returned so rows can be told apart and linked to
+        columns = ["id", *(name for name in PRODUCT_FIELDS if name in fields and name != "id")]
+
+        filters = self._product_filters(
+            search, status, category_id, abc_class, xyz_class, include_descendants
+        )
+        total = (
+            await self.db.execute(select(func.count()).select_from(Product).where(*filters))
+        ).scalar() or 0
         result = await self.db.execute(
-            query.order_by(Product.name).offset(skip).limit(limit)
+            select(*(self._projected(name) for name in columns))
+            .where(*filters)
+            .order_by(Product.name)
+            .offset(skip)
+            .limit(limit)
         )
-        return list(result.scalars().all()), total
+        items = [dict(row) for row in result.mappings()]
+
+        if include_images and items:
+            images: dict[uuid.UUID, list[dict]] = {item["id"]: [] for item in items}
+            for image in (
+                await self.db.execute(
+                    select(
+                        ProductImage.product_id,
+                        ProductImage.id,
+                        ProductImage.url,
+                        ProductImage.is_primary,
+                        ProductImage.sort_order,
+                    )
+                    .where(ProductImage.product_id.in_(images))
+                    .order_by(ProductImage.product_id, ProductImage.sort_order)
+                )
+            ).mappings():
+                image = dict(image)
+                images[image.pop("product_id")].append(image)
+            for item in items:
+                item["images"] = images[item["id"]]
+        return items, total
 
     async def get_product(self, product_id: uuid.UUID) -> Product:
         result = await self.db.execute(
@@ -95,22 +199,26 @@ class ProductService:
         if existing.scalar_one_or_none():
             raise ConflictException(f"Product with SKU '{data.sku}' already exists")
 
-        product = Product(**data.model_dump())
+        # A new product has no images; setting the empty collection avoids a reload
+        product = Product(**data.model_dump(), images=[])
         self.db.add(product)
         await self.db.flush()
-        return await self.get_product(product.id)
+        invalidate_after_commit(self.db, PRODUCTS)
+        return product
 
     async def update_product(self, product_id: uuid.UUID, data: ProductUpdate) -> Product:
         product = await self.get_product(product_id)
         for key, value in data.model_dump(exclude_unset=True).items():
             setattr(product, key, value)
         await self.db.flush()
-        return await self.get_product(product_id)
+        invalidate_after_commit(self.db, PRODUCTS)
+        return product
 
     async def delete_product(self, product_id: uuid.UUID) -> Product:
         product = await self.get_product(product_id)
         product.status = "inactive"
         await self.db.flush()
+        invalidate_after_commit(self.db, PRODUCTS)
         return product
 
     async def add_image(self, product_id: uuid.UUID, data: ProductImageCreate) -> ProductImage:
@@ -118,7 +226,6 @@ class ProductService:
         image = ProductImage(product_id=product_id, **data.model_dump())
         self.db.add(image)
         await self.db.flush()
-        await self.db.refresh(image)
         return image
 
     async def remove_image(self, product_id: uuid.UUID, image_id: uuid.UUID) -> None:
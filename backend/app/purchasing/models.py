@@ -108,3 +108,39 @@ class GoodsReceiptItem(Base):
     goods_receipt: Mapped["GoodsReceipt"] = relationship(back_populates="items")
 
 
+# Unreceived quantity on open POs per product, maintained by OnOrderService
+class ProductOnOrder(Base):
+    __tablename__ = "product_on_order"
+
+    product_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+# Additive per-vendor delivery counters, maintained by VendorPerformanceService
+class VendorPerformance(Base):
+    __tablename__ = "vendor_performance"
+
+    vendor_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("vendors.id", ondelete="CASCADE"), primary_key=True
+    )
+    # POs that have been sent to the vendor (and not cancelled since)
+    order_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_spend: Mapped[float] = mapped_column(Numeric(16, 2), nullable=False, default=0)
+    quantity_ordered: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Received quantity up to the ordered quantity of each line
+    quantity_filled: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    receipt_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Days from order_date to received_date, over receipts whose PO has an order date
+    lead_time_days_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    lead_time_samples: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Receipts on or before expected_delivery_date, over receipts whose PO has one
+    on_time_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    on_time_samples: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
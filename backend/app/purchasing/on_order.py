@@ -0,0 +1,75 @@
+import uuid
+
+from sqlalchemy import Integer, delete, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import POLineItem, ProductOnOrder, PurchaseOrder
+
+# PO statuses whose unreceived quantities count as on order
+ON_ORDER_STATUSES = ("approved", "sent", "partially_received")
+
+
+def _open_quantity():
+    return func.greatest(POLineItem.quantity_ordered - POLineItem.quantity_received, 0)
+
+
+class OnOrderService:
+    """Keeps ``product_on_order`` in step with PO lines.
+
+    Every write is a single upsert that adds a signed delta per product, so
+    concurrent transactions touching the same product only contend on that
+    product's row. ``rebuild`` recomputes the table from scratch.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _upsert(self, stmt) -> None:
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ProductOnOrder.product_id],
+                set_={
+                    "quantity": ProductOnOrder.quantity + stmt.excluded.quantity,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+
+    async def add_purchase_orders(self, po_ids: list[uuid.UUID], sign: int) -> None:
+        """Add (``sign=1``) or remove (``sign=-1``) the open lines of *po_ids*."""
+        if not po_ids:
+            return
+        rows = (
+            select(
+                POLineItem.product_id,
+                (literal(sign, Integer) * func.sum(_open_quantity())).cast(Integer),
+            )
+            .where(POLineItem.purchase_order_id.in_(po_ids))
+            .group_by(POLineItem.product_id)
+        )
+        await self._upsert(pg_insert(ProductOnOrder).from_select(["product_id", "quantity"], rows))
+
+    async def apply_deltas(self, deltas: dict[uuid.UUID, int]) -> None:
+        deltas = {product_id: delta for product_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        # Key order, so concurrent writers lock rows in the same order
+        await self._upsert(pg_insert(ProductOnOrder).values([
+            {"product_id": product_id, "quantity": delta}
+            for product_id, delta in sorted(deltas.items())
+        ]))
+
+    async def rebuild(self) -> int:
+        await self.db.execute(delete(ProductOnOrder))
+        result = await self.db.execute(
+            insert(ProductOnOrder)
+            .from_select(
+                ["product_id", "quantity"],
+                select(POLineItem.product_id, func.sum(_open_quantity()).cast(Integer))
+                .join(PurchaseOrder, PurchaseOrder.id == POLineItem.purchase_order_id)
+                .where(PurchaseOrder.status.in_(ON_ORDER_STATUSES))
+                .group_by(POLineItem.product_id),
+            )
+        )
+        return result.rowcount
@@ -0,0 +1,212 @@
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.inventory.models import StockLevel
+from app.numbering.service import DocumentNumberService
+from app.products.models import Product, ProductVendor
+from app.reporting.cache import PURCHASING, invalidate_after_commit
+from app.vendors.models import Vendor
+
+from .models import POLineItem, ProductOnOrder, PurchaseOrder
+from .service import PURCHASE_ORDER_NUMBERS
+
+# Not yet on order, but already proposed: counted so that runs don't repeat
+_UNAPPROVED_STATUSES = ("draft", "pending_approval")
+# Serialises concurrent runs so two of them cannot both order the same shortfall
+_RUN_LOCK_KEY = "purchasing.replenishment"
+
+
+def preferred_suppliers():
+    """Each product's preferred (then cheapest) active vendor, as a subquery."""
+    return (
+        select(
+            ProductVendor.product_id,
+            ProductVendor.vendor_id,
+            ProductVendor.unit_cost,
+            Vendor.code.label("vendor_code"),
+            Vendor.name.label("vendor_name"),
+            Vendor.lead_time_days,
+        )
+        .join(Vendor, Vendor.id == ProductVendor.vendor_id)
+        .where(Vendor.status == "active")
+        .distinct(ProductVendor.product_id)
+        .order_by(
+            ProductVendor.product_id,
+            ProductVendor.is_preferred.desc(),
+            ProductVendor.unit_cost.asc().nulls_last(),
+        )
+        .subquery()
+    )
+
+
+class ReplenishmentService:
+    """Turns reorder-point shortfalls into draft purchase orders.
+
+    The proposal is computed in one statement over the whole catalog: stock on
+    hand, the maintained on-order quantity and lines on POs not yet approved
+    are combined per product, each product is
+    paired with its preferred (then cheapest) active vendor, and only products
+    whose net position is below their reorder point come back. Draft POs are
+    counted as open, so re-running does not duplicate earlier proposals.
+    Products without a vendor or without any known cost are reported rather
+    than ordered.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _proposal_query(self, vendor_id: uuid.UUID | None = None):
+        on_hand = (
+            select(
+                StockLevel.product_id,
+                func.sum(StockLevel.quantity_on_hand).label("quantity"),
+            )
+            .group_by(StockLevel.product_id)
+            .subquery()
+        )
+        proposed = (
+            select(
+                POLineItem.product_id,
+                func.sum(POLineItem.quantity_ordered).label("quantity"),
+            )
+            .join(PurchaseOrder, PurchaseOrder.id == POLineItem.purchase_order_id)
+            .where(PurchaseOrder.status.in_(_UNAPPROVED_STATUSES))
+            .group_by(POLineItem.product_id)
+            .subquery()
+        )
+        supplier = preferred_suppliers()
+
+        stock = func.coalesce(on_hand.c.quantity, 0)
+        incoming = func.coalesce(ProductOnOrder.quantity, 0) + func.coalesce(proposed.c.quantity, 0)
+        position = stock + incoming
+        query = (
+            select(
+                Product.id.label("product_id"),
+                Product.sku.label("product_sku"),
+                Product.name.label("product_name"),
+                Product.reorder_point,
+                stock.label("on_hand"),
+                incoming.label("on_order"),
+                func.greatest(Product.reorder_quantity, Product.reorder_point - position).label(
+                    "quantity"
+                ),
+                func.coalesce(supplier.c.unit_cost, Product.cost_price).label("unit_price"),
+                supplier.c.vendor_id,
+                supplier.c.vendor_code,
+                supplier.c.vendor_name,
+                supplier.c.lead_time_days,
+            )
+            .outerjoin(on_hand, on_hand.c.product_id == Product.id)
+            .outerjoin(ProductOnOrder, ProductOnOrder.product_id == Product.id)
+            .outerjoin(proposed, proposed.c.product_id == Product.id)
+            .outerjoin(supplier, supplier.c.product_id == Product.id)
+            .where(
+                Product.status == "active",
+                Product.reorder_point > 0,
+                position < Product.reorder_point,
+            )
+            .order_by(supplier.c.vendor_code, Product.sku)
+        )
+        if vendor_id:
+            query = query.where(supplier.c.vendor_id == vendor_id)
+        return query
+
+    async def propose(self, vendor_id: uuid.UUID | None = None) -> dict:
+        rows = (await self.db.execute(self._proposal_query(vendor_id))).all()
+
+        orders: dict[uuid.UUID, dict] = {}
+        unassigned = []
+        unpriced = []
+        for row in rows:
+            line = {
+                "product_id": row.product_id,
+                "product_sku": row.product_sku,
+                "product_name": row.product_name,
+                "on_hand": row.on_hand,
+                "on_order": row.on_order,
+                "reorder_point": row.reorder_point,
+                "quantity": row.quantity,
+                "unit_price": row.unit_price,
+            }
+            if row.vendor_id is None:
+                unassigned.append(line)
+                continue
+            if row.unit_price is None:
+                # Neither a vendor cost nor a cost price: a buyer has to price it first
+                unpriced.append(line)
+                continue
+            order = orders.setdefault(row.vendor_id, {
+                "vendor_id": row.vendor_id,
+                "vendor_code": row.vendor_code,
+                "vendor_name": row.vendor_name,
+                "lead_time_days": row.lead_time_days,
+                "po_id": None,
+                "po_number": None,
+                "subtotal": Decimal(0),
+                "lines": [],
+            })
+            order["lines"].append(line)
+            order["subtotal"] += row.quantity * row.unit_price
+
+        return {
+            "purchase_orders": list(orders.values()),
+            "unassigned": unassigned,
+            "unpriced": unpriced,
+        }
+
+    async def run(
+        self, user_id: uuid.UUID, dry_run: bool = False, vendor_id: uuid.UUID | None = None
+    ) -> dict:
+        if not dry_run:
+            await self.db.execute(select(func.pg_advisory_xact_lock(func.hashtext(_RUN_LOCK_KEY))))
+
+        proposal = await self.propose(vendor_id)
+        proposal["dry_run"] = dry_run
+        orders = proposal["purchase_orders"]
+        if dry_run or not orders:
+            return proposal
+
+        numbers = await DocumentNumberService(self.db).allocate(PURCHASE_ORDER_NUMBERS, len(orders))
+        today = date.today()
+        created = await self.db.execute(
+            insert(PurchaseOrder).returning(PurchaseOrder.id, sort_by_parameter_order=True),
+            [
+                {
+                    "po_number": po_number,
+                    "vendor_id": order["vendor_id"],
+                    "status": "draft",
+                    "order_date": today,
+                    "expected_delivery_date": today + timedelta(days=order["lead_time_days"] or 0),
+                    "subtotal": order["subtotal"],
+                    "tax_amount": 0,
+                    "total_amount": order["subtotal"],
+                    "notes": "Generated by replenishment run",
+                    "created_by": user_id,
+                }
+                for order, po_number in zip(orders, numbers)
+            ],
+        )
+        for order, po_number, po_id in zip(orders, numbers, created.scalars()):
+            order["po_id"] = po_id
+            order["po_number"] = po_number
+
+        await self.db.execute(
+            insert(POLineItem),
+            [
+                {
+                    "purchase_order_id": order["po_id"],
+                    "product_id": line["product_id"],
+                    "quantity_ordered": line["quantity"],
+                    "unit_price": line["unit_price"],
+                    "sort_order": index,
+                }
+                for order in orders
+                for index, line in enumerate(order["lines"])
+            ],
+        )
+        invalidate_after_commit(self.db, PURCHASING)
+        return proposal
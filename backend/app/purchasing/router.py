@@ -1,20 +1,29 @@
 import uuid
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.models import User
 from app.database import get_db
 from app.dependencies import get_current_active_user, require_roles
+from app.exceptions import ForbiddenException
+from app.idempotency.service import IdempotencyService
 
 from .schemas import (
     GoodsReceiptCreate,
     GoodsReceiptResponse,
+    POBulkTransitionRequest,
+    POBulkTransitionResponse,
     PurchaseOrderCreate,
     PurchaseOrderResponse,
+    PurchaseOrderSummaryResponse,
     PurchaseOrderUpdate,
+    ReplenishmentResponse,
 )
+from .on_order import OnOrderService
+from .replenishment import ReplenishmentService
 from .service import PurchaseOrderService
+from .vendor_performance import VendorPerformanceService
 
 router = APIRouter()
 
@@ -27,11 +36,19 @@ async def list_purchase_orders(
     limit: int = Query(20, ge=1, le=100),
     status: str | None = Query(None),
     vendor_id: uuid.UUID | None = Query(None),
+    view: str = Query("summary", pattern="^(summary|full)$"),
 ):
     service = PurchaseOrderService(db)
-    items, total = await service.list_purchase_orders(skip, limit, status, vendor_id)
+    if view == "full":
+        items, total = await service.list_purchase_orders(skip, limit, status, vendor_id)
+        results = [PurchaseOrderResponse.model_validate(i) for i in items]
+    else:
+        items, total = await service.list_purchase_order_summaries(
+            skip, limit, status, vendor_id
+        )
+        results = [PurchaseOrderSummaryResponse(**i) for i in items]
     return {
-        "items": [PurchaseOrderResponse.model_validate(i) for i in items],
+        "items": results,
         "total": total,
         "page": skip // limit + 1,
         "page_size": limit,
@@ -49,6 +66,50 @@ async def create_purchase_order(
     return await service.create_purchase_order(data, current_user.id)
 
 
+@router.post("/purchase-orders/replenishment", response_model=ReplenishmentResponse)
+async def run_replenishment(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_roles("admin", "manager", "buyer")),
+    dry_run: bool = Query(False),
+    vendor_id: uuid.UUID | None = Query(None),
+):
+    service = ReplenishmentService(db)
+    return await service.run(current_user.id, dry_run=dry_run, vendor_id=vendor_id)
+
+
+@router.post("/purchase-orders/bulk-transition", response_model=POBulkTransitionResponse)
+async def bulk_transition(
+    data: POBulkTransitionRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    # Same rule as the single-PO approve endpoint
+    if data.status == "approved" and current_user.role != "admin":
+        raise ForbiddenException(
+            detail=f"Role '{current_user.role}' is not authorized for this action"
+        )
+    service = PurchaseOrderService(db)
+    return await service.bulk_transition(data.ids, data.status, current_user.id)
+
+
+@router.post("/purchase-orders/on-order/rebuild")
+async def rebuild_on_order(
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_roles("admin")),
+):
+    products = await OnOrderService(db).rebuild()
+    return {"products": products}
+
+
+@router.post("/purchase-orders/vendor-performance/rebuild")
+async def rebuild_vendor_performance(
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_roles("admin")),
+):
+    vendors = await VendorPerformanceService(db).rebuild()
+    return {"vendors": vendors}
+
+
 @router.get("/purchase-orders/{po_id}", response_model=PurchaseOrderResponse)
 async def get_purchase_order(
     po_id: uuid.UUID,
@@ -116,6 +177,13 @@ async def receive_goods(
     data: GoodsReceiptCreate,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
+    idempotency_key: str | None = Header(None, max_length=255),
 ):
+    request = await IdempotencyService(db).begin(
+        idempotency_key, current_user.id, "purchasing.receive", data, po_id=po_id
+    )
+    if request.replay:
+        return request.replay
     service = PurchaseOrderService(db)
-    return await service.receive_goods(po_id, data, current_user.id)
+    receipt = await service.receive_goods(po_id, data, current_user.id)
+    return await request.save(GoodsReceiptResponse.model_validate(receipt), 201)
@@ -7,10 +7,16 @@ from pydantic import BaseModel, Field
 class POLineItemCreate(BaseModel):
     product_id: uuid.UUID
     quantity_ordered: int = Field(..., gt=0)
-    unit_price: float = Field(..., ge=0)
+    # Defaults to the vendor's unit cost for the product when omitted
+    unit_price: float | None = Field(None, ge=0)
     sort_order: int = 0
 
 
+class POLineItemUpdate(POLineItemCreate):
+    # Existing lines are matched by id; lines without one are added
+    id: uuid.UUID | None = None
+
+
 class POLineItemResponse(BaseModel):
     id: uuid.UUID
     purchase_order_id: uuid.UUID
@@ -41,7 +47,7 @@ class PurchaseOrderUpdate(BaseModel):
     shipping_address: str | None = None
     tax_amount: float | None = Field(None, ge=0)
     notes: str | None = None
-    line_items: list[POLineItemCreate] | None = None
+    line_items: list[POLineItemUpdate] | None = None
 
 
 class PurchaseOrderResponse(BaseModel):
@@ -66,6 +72,45 @@ class PurchaseOrderResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class PurchaseOrderSummaryResponse(BaseModel):
+    id: uuid.UUID
+    po_number: str
+    vendor_id: uuid.UUID
+    vendor_name: str
+    status: str
+    order_date: date | None
+    expected_delivery_date: date | None
+    subtotal: float
+    tax_amount: float
+    total_amount: float
+    line_count: int
+    quantity_ordered: int
+    quantity_received: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class POBulkTransitionRequest(BaseModel):
+    ids: list[uuid.UUID] = Field(..., min_length=1, max_length=1000)
+    status: str = Field(..., pattern="^(draft|pending_approval|approved|sent|cancelled)$")
+
+
+class POBulkTransitionResult(BaseModel):
+    id: uuid.UUID
+    po_number: str | None
+    success: bool
+    previous_status: str | None
+    status: str | None
+    detail: str | None = None
+
+
+class POBulkTransitionResponse(BaseModel):
+    status: str
+    updated: int
+    failed: int
+    results: list[POBulkTransitionResult]
+
+
 class GoodsReceiptItemCreate(BaseModel):
     po_line_item_id: uuid.UUID
     product_id: uuid.UUID
@@ -76,7 +121,7 @@ class GoodsReceiptItemCreate(BaseModel):
 class GoodsReceiptCreate(BaseModel):
     received_date: date
     notes: str | None = None
-    items: list[GoodsReceiptItemCreate]
+    items: list[GoodsReceiptItemCreate] = Field(..., min_length=1)
 
 
 class GoodsReceiptItemResponse(BaseModel):
@@ -102,3 +147,31 @@ class GoodsReceiptResponse(BaseModel):
     items: list[GoodsReceiptItemResponse] = []
 
     model_config = {"from_attributes": True}
+
+
+class ReplenishmentLine(BaseModel):
+    product_id: uuid.UUID
+    product_sku: str
+    product_name: str
+    on_hand: int
+    on_order: int
+    reorder_point: int
+    quantity: int
+    unit_price: float | None
+
+
+class ReplenishmentOrder(BaseModel):
+    vendor_id: uuid.UUID
+    vendor_code: str
+    vendor_name: str
+    po_id: uuid.UUID | None = None
+    po_number: str | None = None
+    subtotal: float
+    lines: list[ReplenishmentLine]
+
+
+class ReplenishmentResponse(BaseModel):
+    dry_run: bool
+    purchase_orders: list[ReplenishmentOrder]
+    unassigned: list[ReplenishmentLine] = []
+    unpriced: list[ReplenishmentLine] = []
@@ -1,15 +1,34 @@
 import uuid
+from collections import defaultdict
 from datetime import datetime, timezone
+from decimal import Decimal
 
-from sqlalchemy import func, select
+from sqlalchemy import String, any_, bindparam, delete, func, insert, select, true, update
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.config import settings
 from app.exceptions import BadRequestException, NotFoundException
 from app.inventory.models import StockLevel, StockMovement
+from app.inventory.movement_rollup import MovementRollupService
+from app.numbering.service import DocumentNumberService, DocumentType
+from app.products.models import Product, ProductVendor
+from app.reporting.cache import PURCHASING, STOCK, invalidate_after_commit
+from app.vendors.models import Vendor
 
 from .models import GoodsReceipt, GoodsReceiptItem, POLineItem, PurchaseOrder
-from .schemas import GoodsReceiptCreate, PurchaseOrderCreate, PurchaseOrderUpdate
+from .on_order import ON_ORDER_STATUSES, OnOrderService
+from .vendor_performance import PLACED_STATUSES, VendorPerformanceService
+from .schemas import (
+    GoodsReceiptCreate,
+    POLineItemCreate,
+    POLineItemUpdate,
+    PurchaseOrderCreate,
+    PurchaseOrderUpdate,
+)
 
 VALID_TRANSITIONS = {
     "draft": ["pending_approval", "cancelled"],
@@ -19,20 +38,44 @@ VALID_TRANSITIONS = {
     "partially_received": ["received"],
 }
 
+PURCHASE_ORDER_NUMBERS = DocumentType(
+    code="po",
+    prefix="PO",
+    column=PurchaseOrder.po_number,
+    block_size=settings.DOCUMENT_NUMBER_BLOCK_SIZE,
+)
+CENT = Decimal("0.01")
+
+# Relationships PurchaseOrderResponse serializes; nothing else is loaded for responses
+PO_RESPONSE_OPTIONS = (selectinload(PurchaseOrder.line_items),)
+
+GOODS_RECEIPT_NUMBERS = DocumentType(
+    code="gr",
+    prefix="GR",
+    column=GoodsReceipt.receipt_number,
+    block_size=settings.DOCUMENT_NUMBER_BLOCK_SIZE,
+)
+
 
 class PurchaseOrderService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def _generate_po_number(self) -> str:
-        year = datetime.now(timezone.utc).year
-        result = await self.db.execute(
-            select(func.count())
-            .select_from(PurchaseOrder)
-            .where(PurchaseOrder.po_number.like(f"PO-{year}%"))
+    @staticmethod
+    def _list_filters(query, status: str | None, vendor_id: uuid.UUID | None):
+        if status:
+            query = query.where(PurchaseOrder.status == status)
+        if vendor_id:
+            query = query.where(PurchaseOrder.vendor_id == vendor_id)
+        return query
+
+    async def _count_purchase_orders(
+        self, status: str | None, vendor_id: uuid.UUID | None
+    ) -> int:
+        count_query = self._list_filters(
+            select(func.count()).select_from(PurchaseOrder), status, vendor_id
         )
-        count = (result.scalar() or 0) + 1
-        return f"PO-{year}{count:04d}"
+        return (await self.db.execute(count_query)).scalar() or 0
 
     async def list_purchase_orders(
         self,
@@ -41,29 +84,72 @@ class PurchaseOrderService:
         status: str | None = None,
         vendor_id: uuid.UUID | None = None,
     ) -> tuple[list[PurchaseOrder], int]:
-        query = select(PurchaseOrder).options(selectinload(PurchaseOrder.line_items))
-        count_query = select(func.count()).select_from(PurchaseOrder)
-
-        if status:
-            query = query.where(PurchaseOrder.status == status)
-            count_query = count_query.where(PurchaseOrder.status == status)
-        if vendor_id:
-            query = query.where(PurchaseOrder.vendor_id == vendor_id)
-            count_query = count_query.where(PurchaseOrder.vendor_id == vendor_id)
-
-        total = (await self.db.execute(count_query)).scalar() or 0
+        query = self._list_filters(
+            select(PurchaseOrder).options(*PO_RESPONSE_OPTIONS), status, vendor_id
+        )
+        total = await self._count_purchase_orders(status, vendor_id)
         result = await self.db.execute(
             query.order_by(PurchaseOrder.created_at.desc()).offset(skip).limit(limit)
         )
         return list(result.scalars().all()), total
 
+    async def list_purchase_order_summaries(
+        self,
+        skip: int = 0,
+        limit: int = 20,
+        status: str | None = None,
+        vendor_id: uuid.UUID | None = None,
+    ) -> tuple[list[dict], int]:
+        """One row per PO with line aggregates computed in SQL.
+
+        The page of POs is selected first and the lateral subquery then
+        aggregates lines for just those rows, so no line item is loaded.
+        """
+        page = (
+            self._list_filters(select(PurchaseOrder), status, vendor_id)
+            .order_by(PurchaseOrder.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+            .subquery()
+        )
+        lines = (
+            select(
+                func.count().label("line_count"),
+                func.coalesce(func.sum(POLineItem.quantity_ordered), 0).label("quantity_ordered"),
+                func.coalesce(func.sum(POLineItem.quantity_received), 0).label("quantity_received"),
+            )
+            .where(POLineItem.purchase_order_id == page.c.id)
+            .lateral("lines")
+        )
+        result = await self.db.execute(
+            select(
+                page.c.id,
+                page.c.po_number,
+                page.c.vendor_id,
+                Vendor.name.label("vendor_name"),
+                page.c.status,
+                page.c.order_date,
+                page.c.expected_delivery_date,
+                page.c.subtotal,
+                page.c.tax_amount,
+                page.c.total_amount,
+                page.c.created_at,
+                page.c.updated_at,
+                lines.c.line_count,
+                lines.c.quantity_ordered,
+                lines.c.quantity_received,
+            )
+            .join(Vendor, Vendor.id == page.c.vendor_id)
+            .join(lines, true())
+            .order_by(page.c.created_at.desc())
+        )
+        total = await self._count_purchase_orders(status, vendor_id)
+        return [dict(row._mapping) for row in result.all()], total
+
     async def get_purchase_order(self, po_id: uuid.UUID) -> PurchaseOrder:
         result = await self.db.execute(
             select(PurchaseOrder)
-            .options(
-                selectinload(PurchaseOrder.line_items),
-                selectinload(PurchaseOrder.goods_receipts).selectinload(GoodsReceipt.items),
-            )
+            .options(*PO_RESPONSE_OPTIONS)
             .where(PurchaseOrder.id == po_id)
         )
         po = result.scalar_one_or_none()
@@ -71,14 +157,69 @@ class PurchaseOrderService:
             raise NotFoundException("Purchase order not found")
         return po
 
+    async def _resolve_line_values(
+        self, vendor_id: uuid.UUID, items: list[POLineItemCreate]
+    ) -> list[dict]:
+        """Validate products and vendor links in one query and price each line.
+
+        Returns the column values for each item, in request order.
+        """
+        product_ids = {item.product_id for item in items}
+        if not product_ids:
+            return []
+        rows = (
+            await self.db.execute(
+                select(Product.id, ProductVendor.id.label("link_id"), ProductVendor.unit_cost)
+                .outerjoin(
+                    ProductVendor,
+                    (ProductVendor.product_id == Product.id)
+                    & (ProductVendor.vendor_id == vendor_id),
+                )
+                .where(Product.id.in_(product_ids))
+            )
+        ).all()
+        links = {row.id: row for row in rows}
+
+        missing = product_ids - links.keys()
+        if missing:
+            raise BadRequestException(
+                f"Unknown product(s): {', '.join(sorted(str(p) for p in missing))}"
+            )
+        unlinked = sorted(str(pid) for pid, row in links.items() if row.link_id is None)
+        if unlinked:
+            raise BadRequestException(
+                f"Product(s) not supplied by this vendor: {', '.join(unlinked)}"
+            )
+
+        values = []
+        for item in items:
+            if item.unit_price is not None:
+                unit_price = Decimal(str(item.unit_price)).quantize(CENT)
+            elif links[item.product_id].unit_cost is not None:
+                unit_price = links[item.product_id].unit_cost
+            else:
+                raise BadRequestException(
+                    f"No unit price given and no vendor cost on file for product {item.product_id}"
+                )
+            values.append({
+                "product_id": item.product_id,
+                "quantity_ordered": item.quantity_ordered,
+                "unit_price": unit_price,
+                "sort_order": item.sort_order,
+            })
+        return values
+
     async def create_purchase_order(
         self, data: PurchaseOrderCreate, user_id: uuid.UUID
     ) -> PurchaseOrder:
-        po_number = await self._generate_po_number()
+        line_values = await self._resolve_line_values(data.vendor_id, data.line_items)
+        po_number = await DocumentNumberService(self.db).next_number(PURCHASE_ORDER_NUMBERS)
 
-        subtotal = sum(item.quantity_ordered * item.unit_price for item in data.line_items)
-        total_amount = subtotal + data.tax_amount
+        subtotal = sum((v["quantity_ordered"] * v["unit_price"] for v in line_values), Decimal(0))
+        tax_amount = Decimal(str(data.tax_amount)).quantize(CENT)
 
+        # Lines are attached in memory, so the flush writes them as one multi-row
+        # INSERT and the returned object already holds everything the response needs.
         po = PurchaseOrder(
             po_number=po_number,
             vendor_id=data.vendor_id,
@@ -87,26 +228,16 @@ class PurchaseOrderService:
             expected_delivery_date=data.expected_delivery_date,
             shipping_address=data.shipping_address,
             subtotal=subtotal,
-            tax_amount=data.tax_amount,
-            total_amount=total_amount,
+            tax_amount=tax_amount,
+            total_amount=subtotal + tax_amount,
             notes=data.notes,
             created_by=user_id,
+            line_items=[POLineItem(**values) for values in line_values],
         )
         self.db.add(po)
         await self.db.flush()
-
-        for item_data in data.line_items:
-            line_item = POLineItem(
-                purchase_order_id=po.id,
-                product_id=item_data.product_id,
-                quantity_ordered=item_data.quantity_ordered,
-                unit_price=item_data.unit_price,
-                sort_order=item_data.sort_order,
-            )
-            self.db.add(line_item)
-
-        await self.db.flush()
-        return await self.get_purchase_order(po.id)
+        invalidate_after_commit(self.db, PURCHASING)
+        return po
 
     async def update_purchase_order(
         self, po_id: uuid.UUID, data: PurchaseOrderUpdate
@@ -115,51 +246,245 @@ class PurchaseOrderService:
         if po.status != "draft":
             raise BadRequestException("Can only edit draft purchase orders")
 
-        if data.line_items is not None:
-            # Replace all line items
-            for item in po.line_items:
-                await self.db.delete(item)
-            await self.db.flush()
-
-            for item_data in data.line_items:
-                line_item = POLineItem(
-                    purchase_order_id=po.id,
-                    product_id=item_data.product_id,
-                    quantity_ordered=item_data.quantity_ordered,
-                    unit_price=item_data.unit_price,
-                    sort_order=item_data.sort_order,
-                )
-                self.db.add(line_item)
-
-            subtotal = sum(i.quantity_ordered * i.unit_price for i in data.line_items)
-            po.subtotal = subtotal
-            tax = data.tax_amount if data.tax_amount is not None else po.tax_amount
-            po.tax_amount = tax
-            po.total_amount = subtotal + tax
-
         update_fields = data.model_dump(exclude_unset=True, exclude={"line_items"})
         for key, value in update_fields.items():
             setattr(po, key, value)
 
-        if "tax_amount" in update_fields and data.line_items is None:
-            po.total_amount = po.subtotal + po.tax_amount
+        if data.line_items is not None:
+            await self._sync_line_items(po, data.line_items)
+            po.subtotal = sum(
+                (line.quantity_ordered * line.unit_price for line in po.line_items), Decimal(0)
+            )
+            # Line edits need not change any PO column, but line changes are
+            # tracked through the parent's updated_at (e.g. by incremental exports)
+            po.updated_at = func.now()
+
+        if data.line_items is not None or "tax_amount" in update_fields:
+            po.total_amount = Decimal(str(po.subtotal)) + Decimal(str(po.tax_amount))
 
         await self.db.flush()
-        return await self.get_purchase_order(po.id)
+        invalidate_after_commit(self.db, PURCHASING)
+        return po
 
-    async def _transition_status(self, po_id: uuid.UUID, new_status: str, user_id: uuid.UUID | None = None) -> PurchaseOrder:
-        po = await self.get_purchase_order(po_id)
-        valid = VALID_TRANSITIONS.get(po.status, [])
-        if new_status not in valid:
-            raise BadRequestException(
-                f"Cannot transition from '{po.status}' to '{new_status}'"
+    async def _sync_line_items(self, po: PurchaseOrder, items: list[POLineItemUpdate]) -> None:
+        """Diff *items* against the PO's lines by id and apply the changes in bulk.
+
+        At most one DELETE, one executemany UPDATE and one multi-row INSERT are
+        issued; the in-memory collection is then replaced without a reload.
+        """
+        existing = {line.id: line for line in po.line_items}
+        kept_ids = [item.id for item in items if item.id is not None]
+        kept = set(kept_ids)
+        if len(kept_ids) != len(kept):
+            raise BadRequestException("Duplicate line item id in request")
+        if not kept <= existing.keys():
+            raise BadRequestException("Line item does not belong to this purchase order")
+
+        line_values = await self._resolve_line_values(po.vendor_id, items)
+
+        removed = [line for line_id, line in existing.items() if line_id not in kept]
+        if removed:
+            await self.db.execute(
+                delete(POLineItem).where(POLineItem.id.in_([line.id for line in removed]))
             )
-        po.status = new_status
+
+        changed: list[tuple[POLineItem, dict]] = []
+        new_rows: list[dict] = []
+        for item, values in zip(items, line_values):
+            if item.id is None:
+                new_rows.append({"purchase_order_id": po.id, **values})
+            elif any(getattr(existing[item.id], k) != v for k, v in values.items()):
+                changed.append((existing[item.id], values))
+        if changed:
+            await self.db.execute(
+                update(POLineItem),
+                [{"id": line.id, **values} for line, values in changed],
+            )
+            for line, values in changed:
+                for key, value in values.items():
+                    set_committed_value(line, key, value)
+
+        # Matched back to the request items by position
+        inserted = iter(
+            await self.db.scalars(
+                insert(POLineItem).returning(POLineItem, sort_by_parameter_order=True), new_rows
+            )
+            if new_rows
+            else ()
+        )
+        lines = [existing[item.id] if item.id is not None else next(inserted) for item in items]
+        set_committed_value(po, "line_items", lines)
+        for line in removed:
+            self.db.expunge(line)
+
+    @staticmethod
+    def _transition_values(new_status: str, user_id: uuid.UUID | None) -> tuple[list[str], dict]:
+        allowed_from = [
+            status for status, targets in VALID_TRANSITIONS.items() if new_status in targets
+        ]
+        values: dict = {"status": new_status}
         if new_status == "approved" and user_id:
-            po.approved_by = user_id
-            po.approved_at = datetime.now(timezone.utc)
-        await self.db.flush()
-        return await self.get_purchase_order(po.id)
+            values["approved_by"] = user_id
+            values["approved_at"] = datetime.now(timezone.utc)
+        return allowed_from, values
+
+    @staticmethod
+    def _on_order_sign(previous_status: str, new_status: str) -> int:
+        """+1 when a PO starts counting as on order, -1 when it stops, else 0."""
+        return int(new_status in ON_ORDER_STATUSES) - int(previous_status in ON_ORDER_STATUSES)
+
+    @staticmethod
+    def _placed_sign(previous_status: str, new_status: str) -> int:
+        """+1 when a PO is placed with its vendor, -1 when a placed PO is cancelled."""
+        return int(new_status in PLACED_STATUSES) - int(previous_status in PLACED_STATUSES)
+
+    @staticmethod
+    def _transition_error(current_status: str, new_status: str) -> str:
+        if new_status == "cancelled":
+            if current_status == "received":
+                return "Cannot cancel a fully received PO"
+            return f"Cannot cancel PO in '{current_status}' status"
+        return f"Cannot transition from '{current_status}' to '{new_status}'"
+
+    async def _transition_status(
+        self,
+        po_id: uuid.UUID,
+        new_status: str,
+        user_id: uuid.UUID | None = None,
+    ) -> PurchaseOrder:
+        allowed_from, values = self._transition_values(new_status, user_id)
+
+        # The status check and the write are one conditional UPDATE; RETURNING plus a
+        # selectin load of the lines gives the response in two statements. Only
+        # transitions that change the on-order or vendor rollups cost more.
+        previous = (
+            select(PurchaseOrder.id, PurchaseOrder.status)
+            .where(PurchaseOrder.id == po_id)
+            .subquery("previous")
+        )
+        result = await self.db.execute(
+            update(PurchaseOrder)
+            .where(PurchaseOrder.id == previous.c.id, PurchaseOrder.status.in_(allowed_from))
+            .values(**values)
+            .returning(PurchaseOrder, previous.c.status)
+            .options(*PO_RESPONSE_OPTIONS)
+            .execution_options(populate_existing=True)
+        )
+        row = result.one_or_none()
+        if row:
+            invalidate_after_commit(self.db, PURCHASING)
+            po, previous_status = row
+            sign = self._on_order_sign(previous_status, new_status)
+            if sign:
+                await OnOrderService(self.db).add_purchase_orders([po.id], sign)
+            placed = self._placed_sign(previous_status, new_status)
+            if placed:
+                await VendorPerformanceService(self.db).add_purchase_orders([po.id], placed)
+            return po
+
+        current_status = await self._current_status(po_id)
+        raise BadRequestException(self._transition_error(current_status, new_status))
+
+    async def bulk_transition(
+        self,
+        po_ids: list[uuid.UUID],
+        new_status: str,
+        user_id: uuid.UUID | None = None,
+    ) -> dict:
+        """Move many POs to *new_status* with one conditional UPDATE.
+
+        Ineligible or unknown ids are reported per PO instead of failing the
+        whole batch; they cost one extra lookup only when there are any.
+        """
+        po_ids = list(dict.fromkeys(po_ids))
+        allowed_from, values = self._transition_values(new_status, user_id)
+
+        previous = (
+            select(PurchaseOrder.id, PurchaseOrder.status)
+            .where(PurchaseOrder.id == any_(bindparam("po_ids", po_ids, ARRAY(UUID(as_uuid=True)))))
+            .subquery("previous")
+        )
+        result = await self.db.execute(
+            update(PurchaseOrder)
+            .where(
+                PurchaseOrder.id == previous.c.id,
+                PurchaseOrder.status
+                == any_(bindparam("allowed_from", allowed_from, ARRAY(String))),
+            )
+            .values(**values)
+            .returning(PurchaseOrder.id, PurchaseOrder.po_number, previous.c.status)
+            .execution_options(synchronize_session=False)
+        )
+        results = {
+            row.id: {
+                "id": row.id,
+                "po_number": row.po_number,
+                "success": True,
+                "previous_status": row.status,
+                "status": new_status,
+                "detail": None,
+            }
+            for row in result.all()
+        }
+
+        if results:
+            invalidate_after_commit(self.db, PURCHASING)
+            # The UPDATE bypassed the session, so drop any stale loaded copies
+            for obj in list(self.db.identity_map.values()):
+                if isinstance(obj, PurchaseOrder) and obj.id in results:
+                    self.db.expire(obj)
+        by_sign: dict[int, list[uuid.UUID]] = defaultdict(list)
+        by_placed: dict[int, list[uuid.UUID]] = defaultdict(list)
+        for po_id, outcome in results.items():
+            by_sign[self._on_order_sign(outcome["previous_status"], new_status)].append(po_id)
+            by_placed[self._placed_sign(outcome["previous_status"], new_status)].append(po_id)
+        on_order = OnOrderService(self.db)
+        performance = VendorPerformanceService(self.db)
+        for sign in (1, -1):
+            await on_order.add_purchase_orders(by_sign[sign], sign)
+            await performance.add_purchase_orders(by_placed[sign], sign)
+
+        skipped = [po_id for po_id in po_ids if po_id not in results]
+        if skipped:
+            current = {
+                row.id: row
+                for row in await self.db.execute(
+                    select(PurchaseOrder.id, PurchaseOrder.po_number, PurchaseOrder.status)
+                    .where(PurchaseOrder.id.in_(skipped))
+                )
+            }
+            for po_id in skipped:
+                row = current.get(po_id)
+                results[po_id] = {
+                    "id": po_id,
+                    "po_number": row.po_number if row else None,
+                    "success": False,
+                    "previous_status": row.status if row else None,
+                    "status": row.status if row else None,
+                    "detail": (
+                        self._transition_error(row.status, new_status)
+                        if row
+                        else "Purchase order not found"
+                    ),
+                }
+
+        updated = len(po_ids) - len(skipped)
+        return {
+            "status": new_status,
+            "updated": updated,
+            "failed": len(skipped),
+            "results": [results[po_id] for po_id in po_ids],
+        }
+
+    async def _current_status(self, po_id: uuid.UUID) -> str:
+        status = (
+            await self.db.execute(
+                select(PurchaseOrder.status).where(PurchaseOrder.id == po_id)
+            )
+        ).scalar_one_or_none()
+        if status is None:
+            raise NotFoundException("Purchase order not found")
+        return status
 
     async def submit_po(self, po_id: uuid.UUID) -> PurchaseOrder:
         return await self._transition_status(po_id, "pending_approval")
@@ -171,30 +496,40 @@ class PurchaseOrderService:
         return await self._transition_status(po_id, "sent")
 
     async def cancel_po(self, po_id: uuid.UUID) -> PurchaseOrder:
-        po = await self.get_purchase_order(po_id)
-        if po.status in ("received",):
-            raise BadRequestException("Cannot cancel a fully received PO")
-        valid = VALID_TRANSITIONS.get(po.status, [])
-        if "cancelled" not in valid:
-            raise BadRequestException(f"Cannot cancel PO in '{po.status}' status")
-        po.status = "cancelled"
-        await self.db.flush()
-        return await self.get_purchase_order(po_id)
+        return await self._transition_status(po_id, "cancelled")
 
     async def receive_goods(
         self, po_id: uuid.UUID, data: GoodsReceiptCreate, user_id: uuid.UUID
     ) -> GoodsReceipt:
-        po = await self.get_purchase_order(po_id)
+        result = await self.db.execute(
+            select(PurchaseOrder).where(PurchaseOrder.id == po_id).with_for_update()
+        )
+        po = result.scalar_one_or_none()
+        if not po:
+            raise NotFoundException("Purchase order not found")
         if po.status not in ("sent", "partially_received"):
             raise BadRequestException("PO must be 'sent' or 'partially_received' to receive goods")
 
-        # Generate receipt number
+        # All of the PO's lines in one locking query: they are needed both to
+        # validate the receipt and to derive the PO's new status.
         result = await self.db.execute(
-            select(func.count()).select_from(GoodsReceipt)
+            select(POLineItem)
+            .where(POLineItem.purchase_order_id == po_id)
+            .with_for_update()
         )
-        count = (result.scalar() or 0) + 1
-        receipt_number = f"GR-{datetime.now(timezone.utc).year}{count:04d}"
+        lines = {line.id: line for line in result.scalars().all()}
+        unknown = {item.po_line_item_id for item in data.items} - lines.keys()
+        if unknown:
+            raise BadRequestException(
+                f"Line item(s) not on this purchase order: {', '.join(sorted(map(str, unknown)))}"
+            )
+        for item in data.items:
+            if lines[item.po_line_item_id].product_id != item.product_id:
+                raise BadRequestException(
+                    f"Product does not match PO line item {item.po_line_item_id}"
+                )
 
+        receipt_number = await DocumentNumberService(self.db).next_number(GOODS_RECEIPT_NUMBERS)
         receipt = GoodsReceipt(
             receipt_number=receipt_number,
             purchase_order_id=po_id,
@@ -205,74 +540,89 @@ class PurchaseOrderService:
         self.db.add(receipt)
         await self.db.flush()
 
-        # Create receipt items and update stock
-        for item_data in data.items:
-            receipt_item = GoodsReceiptItem(
-                goods_receipt_id=receipt.id,
-                po_line_item_id=item_data.po_line_item_id,
-                product_id=item_data.product_id,
-                quantity_received=item_data.quantity_received,
-                location_id=item_data.location_id,
+        # Apply quantities in memory; repeated (product, location) pairs are merged
+        # because one upsert statement cannot touch the same row twice.
+        stock_deltas: dict[tuple[uuid.UUID, uuid.UUID], int] = defaultdict(int)
+        on_order_deltas: dict[uuid.UUID, int] = defaultdict(int)
+        filled = 0
+        for item in data.items:
+            line = lines[item.po_line_item_id]
+            open_before = max(line.quantity_ordered - line.quantity_received, 0)
+            line.quantity_received += item.quantity_received
+            open_after = max(line.quantity_ordered - line.quantity_received, 0)
+            stock_deltas[(item.product_id, item.location_id)] += item.quantity_received
+            on_order_deltas[item.product_id] += open_after - open_before
+            filled += open_before - open_after
+
+        # Kept in the order the receipt lists them
+        receipt_items = (
+            await self.db.scalars(
+                insert(GoodsReceiptItem).returning(GoodsReceiptItem, sort_by_parameter_order=True),
+                [
+                    {
+                        "goods_receipt_id": receipt.id,
+                        "po_line_item_id": item.po_line_item_id,
+                        "product_id": item.product_id,
+                        "quantity_received": item.quantity_received,
+                        "location_id": item.location_id,
+                    }
+                    for item in data.items
+                ],
             )
-            self.db.add(receipt_item)
-
-            # Update PO line item received quantity
-            line_result = await self.db.execute(
-                select(POLineItem).where(POLineItem.id == item_data.po_line_item_id)
-            )
-            line_item = line_result.scalar_one_or_none()
-            if line_item:
-                line_item.quantity_received += item_data.quantity_received
-
-            # Update stock level
-            stock_result = await self.db.execute(
-                select(StockLevel)
-                .where(
-                    StockLevel.product_id == item_data.product_id,
-                    StockLevel.location_id == item_data.location_id,
-                )
-                .with_for_update()
-            )
-            stock = stock_result.scalar_one_or_none()
-            if stock:
-                stock.quantity_on_hand += item_data.quantity_received
-            else:
-                stock = StockLevel(
-                    product_id=item_data.product_id,
-                    location_id=item_data.location_id,
-                    quantity_on_hand=item_data.quantity_received,
-                )
-                self.db.add(stock)
-
-            # Create stock movement
-            movement = StockMovement(
-                movement_type="in",
-                product_id=item_data.product_id,
-                to_location_id=item_data.location_id,
-                quantity=item_data.quantity_received,
-                reference_type="goods_receipt",
-                reference_id=receipt.id,
-                performed_by=user_id,
+        ).all()
+
+        # Rows in key order, so concurrent receipts lock stock levels in the same
+        # order and cannot deadlock on each other
+        stock_insert = pg_insert(StockLevel).values([
+            {
+                "id": uuid.uuid4(),
+                "product_id": product_id,
+                "location_id": location_id,
+                "quantity_on_hand": quantity,
+                "quantity_reserved": 0,
+            }
+            for (product_id, location_id), quantity in sorted(stock_deltas.items())
+        ])
+        await self.db.execute(
+            stock_insert.on_conflict_do_update(
+                constraint="uq_stock_product_location",
+                set_={
+                    "quantity_on_hand": StockLevel.quantity_on_hand
+                    + stock_insert.excluded.quantity_on_hand,
+                    "updated_at": func.now(),
+                },
             )
-            self.db.add(movement)
+        )
 
-        await self.db.flush()
+        movements = [
+            {
+                "movement_type": "in",
+                "product_id": item.product_id,
+                "to_location_id": item.location_id,
+                "quantity": item.quantity_received,
+                "reference_type": "goods_receipt",
+                "reference_id": receipt.id,
+                "performed_by": user_id,
+            }
+            for item in data.items
+        ]
+        await self.db.execute(insert(StockMovement), movements)
+        await MovementRollupService(self.db).record(movements)
+
+        # A fully received PO leaves ON_ORDER_STATUSES with nothing open, so the
+        # per-line deltas alone keep product_on_order exact.
+        await OnOrderService(self.db).apply_deltas(on_order_deltas)
+        await VendorPerformanceService(self.db).record_receipt(po, data.received_date, filled)
 
-        # Check if PO is fully received
-        await self.db.refresh(po)
         all_received = all(
-            li.quantity_received >= li.quantity_ordered for li in po.line_items
+            line.quantity_received >= line.quantity_ordered for line in lines.values()
         )
-        if all_received:
-            po.status = "received"
-        else:
-            po.status = "partially_received"
-
+        po.status = "received" if all_received else "partially_received"
+        # Touch the PO even when its status is unchanged: line changes are
+        # tracked through the parent's updated_at (e.g. by incremental exports)
+        po.updated_at = func.now()
         await self.db.flush()
-        # Fetch with items loaded for response
-        result = await self.db.execute(
-            select(GoodsReceipt)
-            .options(selectinload(GoodsReceipt.items))
-            .where(GoodsReceipt.id == receipt.id)
-        )
-        return result.scalar_one()
+        invalidate_after_commit(self.db, STOCK, PURCHASING)
+
+        set_committed_value(receipt, "items", list(receipt_items))
+        return receipt
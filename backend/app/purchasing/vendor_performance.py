@@ -0,0 +1,145 @@
+import uuid
+from datetime import date
+
+from sqlalchemy import Integer, case, delete, func, insert, literal, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.reporting.cache import PURCHASING, invalidate_after_commit
+
+from .models import GoodsReceipt, POLineItem, PurchaseOrder, VendorPerformance
+
+# PO statuses that count as placed with the vendor
+PLACED_STATUSES = ("sent", "partially_received", "received")
+
+_COUNTERS = (
+    "order_count",
+    "total_spend",
+    "quantity_ordered",
+    "quantity_filled",
+    "receipt_count",
+    "lead_time_days_total",
+    "lead_time_samples",
+    "on_time_count",
+    "on_time_samples",
+)
+
+
+def _filled_quantity():
+    return func.least(POLineItem.quantity_received, POLineItem.quantity_ordered)
+
+
+def _placed_orders(po_filter, sign: int = 1):
+    """Order counters per vendor for the POs matching *po_filter*, times *sign*."""
+    lines = (
+        select(
+            POLineItem.purchase_order_id,
+            func.sum(POLineItem.quantity_ordered).label("ordered"),
+            func.sum(_filled_quantity()).label("filled"),
+        )
+        .group_by(POLineItem.purchase_order_id)
+        .subquery()
+    )
+    factor = literal(sign, Integer)
+    return (
+        select(
+            PurchaseOrder.vendor_id,
+            (factor * func.count()).label("order_count"),
+            (factor * func.sum(PurchaseOrder.total_amount)).label("total_spend"),
+            (factor * func.coalesce(func.sum(lines.c.ordered), 0)).cast(Integer).label(
+                "quantity_ordered"
+            ),
+            (factor * func.coalesce(func.sum(lines.c.filled), 0)).cast(Integer).label(
+                "quantity_filled"
+            ),
+            *(literal(0, Integer).label(name) for name in _COUNTERS[4:]),
+        )
+        .outerjoin(lines, lines.c.purchase_order_id == PurchaseOrder.id)
+        .where(po_filter)
+        .group_by(PurchaseOrder.vendor_id)
+    )
+
+
+def _receipts():
+    """Receipt counters per vendor, from all goods receipts."""
+    lead_time = GoodsReceipt.received_date - PurchaseOrder.order_date
+    on_time = GoodsReceipt.received_date <= PurchaseOrder.expected_delivery_date
+    return (
+        select(
+            PurchaseOrder.vendor_id,
+            *(literal(0, Integer).label(name) for name in _COUNTERS[:4]),
+            func.count().label("receipt_count"),
+            func.coalesce(func.sum(lead_time), 0).cast(Integer).label("lead_time_days_total"),
+            func.count(PurchaseOrder.order_date).label("lead_time_samples"),
+            func.count(case((on_time, 1))).label("on_time_count"),
+            func.count(PurchaseOrder.expected_delivery_date).label("on_time_samples"),
+        )
+        .join(PurchaseOrder, PurchaseOrder.id == GoodsReceipt.purchase_order_id)
+        .group_by(PurchaseOrder.vendor_id)
+    )
+
+
+class VendorPerformanceService:
+    """Keeps the ``vendor_performance`` rollup in step with POs and receipts.
+
+    Every column is an additive counter, so each event is one upsert adding
+    its deltas to the vendor's row: sending a PO adds it to the vendor's
+    orders, cancelling a sent PO takes it out again, and each goods receipt
+    adds its lead time, punctuality and filled quantity. ``rebuild``
+    recomputes the table from scratch.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _upsert(self, stmt) -> None:
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[VendorPerformance.vendor_id],
+                set_={
+                    **{
+                        name: getattr(VendorPerformance, name) + getattr(stmt.excluded, name)
+                        for name in _COUNTERS
+                    },
+                    "updated_at": func.now(),
+                },
+            )
+        )
+
+    async def add_purchase_orders(self, po_ids: list[uuid.UUID], sign: int) -> None:
+        """Count (``sign=1``) or uncount (``sign=-1``) *po_ids* as placed orders."""
+        if not po_ids:
+            return
+        rows = _placed_orders(PurchaseOrder.id.in_(po_ids), sign)
+        await self._upsert(
+            pg_insert(VendorPerformance).from_select(["vendor_id", *_COUNTERS], rows)
+        )
+
+    async def record_receipt(self, po: PurchaseOrder, received_date: date, filled: int) -> None:
+        """Add one goods receipt on *po* that filled *filled* units of open quantity."""
+        values = dict.fromkeys(_COUNTERS, 0)
+        values.update(receipt_count=1, quantity_filled=filled)
+        if po.order_date is not None:
+            values.update(
+                lead_time_days_total=(received_date - po.order_date).days, lead_time_samples=1
+            )
+        if po.expected_delivery_date is not None:
+            values.update(
+                on_time_count=int(received_date <= po.expected_delivery_date), on_time_samples=1
+            )
+        await self._upsert(pg_insert(VendorPerformance).values(vendor_id=po.vendor_id, **values))
+
+    async def rebuild(self) -> int:
+        combined = union_all(
+            _placed_orders(PurchaseOrder.status.in_(PLACED_STATUSES)), _receipts()
+        ).subquery()
+        totals = select(
+            combined.c.vendor_id,
+            *(func.sum(combined.c[name]).label(name) for name in _COUNTERS),
+        ).group_by(combined.c.vendor_id)
+        await self.db.execute(delete(VendorPerformance))
+        result = await self.db.execute(
+            insert(VendorPerformance).from_select(["vendor_id", *_COUNTERS], totals)
+        )
+        invalidate_after_commit(self.db, PURCHASING)
+        return result.rowcount
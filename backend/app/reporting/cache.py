@@ -0,0 +1,197 @@
+import asyncio
+import functools
+import logging
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session, run_after_commit
+
+logger = logging.getLogger(__name__)
+
+# Data domains that cached reports depend on
+STOCK = "stock"
+PURCHASING = "purchasing"
+PRODUCTS = "products"
+VENDORS = "vendors"
+
+
+class DataVersions:
+    """Monotonic change counters per data domain.
+
+    Cached results remember the counters they were computed at; a result is
+    invalid as soon as any counter it depends on has moved on.
+    """
+
+    def __init__(self):
+        self._versions: dict[str, int] = defaultdict(int)
+
+    def bump(self, *domains: str) -> None:
+        for domain in domains:
+            self._versions[domain] += 1
+
+    def snapshot(self, domains: Iterable[str]) -> tuple[int, ...]:
+        return tuple(self._versions[domain] for domain in domains)
+
+
+data_versions = DataVersions()
+
+
+def invalidate_after_commit(db: AsyncSession, *domains: str) -> None:
+    """Bump *domains* once the session's transaction has committed."""
+    run_after_commit(db, lambda: data_versions.bump(*domains))
+
+
+@dataclass(slots=True)
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    errors: int = 0
+    refresh_seconds_total: float = 0.0
+    refresh_seconds_max: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "avg_refresh_ms": round(1000 * self.refresh_seconds_total / self.refreshes, 2)
+            if self.refreshes
+            else None,
+            "max_refresh_ms": round(1000 * self.refresh_seconds_max, 2),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class _CachedResult:
+    value: object
+    computed_at: float
+    versions: tuple[int, ...]
+
+
+class ReportCache:
+    """Result cache for service methods that take ``self.db``.
+
+    Results are keyed by report name and call arguments and held in a bounded
+    LRU. A result is fresh for its TTL, then served stale while a background
+    task recomputes it on its own session, and dropped once a data domain it
+    depends on changes. Concurrent misses for the same key share one call.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, stale_ttl: float, ttl_overrides: dict[str, int]):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.ttl_overrides = ttl_overrides
+        self._entries: OrderedDict[tuple, _CachedResult] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._background: set[asyncio.Task] = set()
+        self._stats: dict[str, CacheStats] = defaultdict(CacheStats)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        entries: dict[str, int] = defaultdict(int)
+        for key in self._entries:
+            entries[key[0]] += 1
+        return {
+            "max_entries": self.max_entries,
+            "entries": len(self._entries),
+            "reports": {
+                name: {**stats.as_dict(), "entries": entries[name]}
+                for name, stats in sorted(self._stats.items())
+            },
+        }
+
+    def cached(self, name: str, domains: tuple[str, ...], ttl: int | None = None):
+        """Decorate an async service method whose result depends on *domains*."""
+
+        def decorator(method):
+            @functools.wraps(method)
+            async def wrapper(service, *args, **kwargs):
+                key = (name, args, tuple(sorted(kwargs.items())))
+                return await self._get(
+                    key, domains, ttl, lambda db: method(type(service)(db), *args, **kwargs), service.db
+                )
+
+            return wrapper
+
+        return decorator
+
+    async def _get(self, key: tuple, domains: tuple[str, ...], ttl: int | None, compute, db):
+        name = key[0]
+        stats = self._stats[name]
+        fresh_for = self.ttl_overrides.get(name, ttl if ttl is not None else self.ttl)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.versions == data_versions.snapshot(domains):
+            age = time.monotonic() - entry.computed_at
+            if age < fresh_for:
+                stats.hits += 1
+                self._entries.move_to_end(key)
+                return entry.value
+            if age < fresh_for + self.stale_ttl:
+                stats.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    task = asyncio.create_task(self._refresh_in_background(key, domains, compute))
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+                return entry.value
+
+        stats.misses += 1
+        return await self._refresh(key, domains, compute, db)
+
+    async def _refresh_in_background(self, key: tuple, domains: tuple[str, ...], compute) -> None:
+        try:
+            async with async_session() as db:
+                await self._refresh(key, domains, compute, db)
+        except Exception:
+            logger.exception("Background refresh of report %s failed", key[0])
+
+    async def _refresh(self, key: tuple, domains: tuple[str, ...], compute, db):
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        stats = self._stats[key[0]]
+        self._inflight[key] = flight = asyncio.get_running_loop().create_future()
+        versions = data_versions.snapshot(domains)
+        started = time.monotonic()
+        try:
+            value = await compute(db)
+        except BaseException as exc:
+            stats.errors += 1
+            flight.set_exception(exc)
+            flight.exception()  # waiters re-raise it; don't warn if there are none
+            raise
+        else:
+            elapsed = time.monotonic() - started
+            stats.refreshes += 1
+            stats.refresh_seconds_total += elapsed
+            stats.refresh_seconds_max = max(stats.refresh_seconds_max, elapsed)
+            self._entries[key] = _CachedResult(value, time.monotonic(), versions)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            flight.set_result(value)
+            return value
+        finally:
+            del self._inflight[key]
+
+
+report_cache = ReportCache(
+    settings.REPORT_CACHE_MAX_ENTRIES,
+    settings.REPORT_CACHE_TTL_SECONDS,
+    settings.REPORT_CACHE_STALE_SECONDS,
+    settings.REPORT_CACHE_TTLS,
+)
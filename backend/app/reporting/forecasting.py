@@ -0,0 +1,204 @@
+import asyncio
+import uuid
+from datetime import datetime, time, timedelta, timezone
+from itertools import chain
+from statistics import NormalDist
+
+import numpy as np
+from sqlalchemy import Date, Float, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.inventory.models import StockMovement
+from app.inventory.movement_rollup import DEMAND_MOVEMENT_TYPES
+from app.products.models import Product
+from app.purchasing.models import VendorPerformance
+from app.purchasing.replenishment import preferred_suppliers
+
+from .cache import PRODUCTS, PURCHASING, STOCK, invalidate_after_commit, report_cache
+
+
+def smoothing_weights(days: int, alpha: float) -> np.ndarray:
+    """Exponential-smoothing weights for a *days*-long series, oldest first.
+
+    ``history @ weights`` is the smoothed level at the end of the series,
+    i.e. simple exponential smoothing without a day-by-day loop. The weights
+    are normalised, so the (negligible) initial-level term is spread over
+    the window instead of dropped.
+    """
+    weights = alpha * (1 - alpha) ** np.arange(days - 1, -1, -1, dtype=np.float64)
+    return weights / weights.sum()
+
+
+def forecast(
+    history: np.ndarray, lead_times: np.ndarray, weights: np.ndarray, z: float, cover_days: int
+) -> dict[str, np.ndarray]:
+    """Demand level, variability and reorder recommendations for every row of *history*.
+
+    *history* is a (products x days) matrix of daily demand and is
+    overwritten. Variability is the exponentially weighted standard
+    deviation around the level; safety stock covers it over the lead time.
+    """
+    level = history @ weights
+    np.square(history, out=history)
+    sigma = np.sqrt(np.maximum(history @ weights - level**2, 0))
+    safety_stock = z * sigma * np.sqrt(lead_times)
+    return {
+        "daily_demand": level,
+        "demand_std": sigma,
+        "safety_stock": np.ceil(safety_stock),
+        "reorder_point": np.ceil(level * lead_times + safety_stock),
+        "reorder_quantity": np.ceil(level * cover_days),
+    }
+
+
+FORECAST_COLUMNS = [
+    "product_id", "sku", "name", "lead_time_days", "daily_demand", "demand_std",
+    "safety_stock", "reorder_point", "reorder_quantity", "recommended_reorder_point",
+    "recommended_reorder_quantity",
+]
+
+
+def forecast_rows(rows: list, weights: np.ndarray, z: float) -> list[dict]:
+    """Recommendation rows, keyed by ``FORECAST_COLUMNS``, for one batch of history rows.
+
+    Pure CPU work with no database access, so it can run off the event loop.
+    """
+    lengths = np.fromiter((len(r.days) for r in rows), np.int64, len(rows))
+    history = np.zeros((len(rows), len(weights)))
+    history[
+        np.repeat(np.arange(len(rows)), lengths),
+        np.fromiter(chain.from_iterable(r.days for r in rows), np.int64, lengths.sum()),
+    ] = np.fromiter(chain.from_iterable(r.quantities for r in rows), np.float64, lengths.sum())
+    lead_times = np.fromiter((r.lead_time_days for r in rows), np.float64, len(rows))
+
+    columns = forecast(history, lead_times, weights, z, settings.FORECAST_ORDER_COVER_DAYS)
+    return [
+        dict(zip(FORECAST_COLUMNS, (
+            str(row.id),
+            row.sku,
+            row.name,
+            round(row.lead_time_days, 1),
+            round(daily_demand, 3),
+            round(demand_std, 3),
+            int(safety_stock),
+            row.reorder_point,
+            row.reorder_quantity,
+            int(reorder_point),
+            int(reorder_quantity),
+        ), strict=True))
+        for row, daily_demand, demand_std, safety_stock, reorder_point, reorder_quantity in zip(
+            rows,
+            columns["daily_demand"].tolist(),
+            columns["demand_std"].tolist(),
+            columns["safety_stock"].tolist(),
+            columns["reorder_point"].tolist(),
+            columns["reorder_quantity"].tolist(),
+        )
+    ]
+
+
+class DemandForecastService:
+    """Recommends reorder points and quantities from outbound demand history.
+
+    The ledger is aggregated to one row per product holding its non-zero
+    demand days as arrays; rows are streamed ``FORECAST_BATCH_SIZE``
+    products at a time into a dense NumPy matrix and forecast in one
+    vectorised pass per batch, on a worker thread. Lead times are the
+    preferred vendor's actual average (from the vendor performance rollup),
+    else its planned lead time.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _history_query(self, start: datetime, end: datetime):
+        day = func.timezone("UTC", StockMovement.created_at).cast(Date) - start.date()
+        daily = (
+            select(
+                StockMovement.product_id,
+                day.label("day"),
+                func.sum(StockMovement.quantity).label("quantity"),
+            )
+            .where(
+                StockMovement.movement_type.in_(DEMAND_MOVEMENT_TYPES),
+                StockMovement.from_location_id.is_not(None),
+                StockMovement.created_at >= start,
+                StockMovement.created_at < end,
+            )
+            .group_by(StockMovement.product_id, day)
+            .subquery()
+        )
+        history = (
+            select(
+                daily.c.product_id,
+                func.array_agg(daily.c.day).label("days"),
+                func.array_agg(daily.c.quantity).label("quantities"),
+            )
+            .group_by(daily.c.product_id)
+            .subquery()
+        )
+        supplier = preferred_suppliers()
+        lead_time = func.coalesce(
+            VendorPerformance.lead_time_days_total
+            / func.nullif(VendorPerformance.lead_time_samples, 0).cast(Float),
+            supplier.c.lead_time_days,
+            settings.FORECAST_DEFAULT_LEAD_TIME_DAYS,
+        )
+        return (
+            select(
+                Product.id,
+                Product.sku,
+                Product.name,
+                Product.reorder_point,
+                Product.reorder_quantity,
+                lead_time.label("lead_time_days"),
+                history.c.days,
+                history.c.quantities,
+            )
+            .join(history, history.c.product_id == Product.id)
+            .outerjoin(supplier, supplier.c.product_id == Product.id)
+            .outerjoin(VendorPerformance, VendorPerformance.vendor_id == supplier.c.vendor_id)
+            .where(Product.status == "active")
+            .order_by(Product.sku)
+        )
+
+    async def compute(self) -> list[dict]:
+        days = settings.FORECAST_HISTORY_DAYS
+        # Whole UTC days up to, but excluding, today
+        end = datetime.combine(datetime.now(timezone.utc).date(), time(), tzinfo=timezone.utc)
+        start = end - timedelta(days=days)
+        weights = smoothing_weights(days, settings.FORECAST_SMOOTHING_ALPHA)
+        z = NormalDist().inv_cdf(settings.FORECAST_SERVICE_LEVEL)
+
+        recommendations = []
+        result = await self.db.stream(
+            self._history_query(start, end).execution_options(yield_per=settings.FORECAST_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            # Keep the NumPy pass and row building off the event loop serving requests
+            recommendations.extend(await asyncio.to_thread(forecast_rows, rows, weights, z))
+        return recommendations
+
+    @report_cache.cached("demand_forecast", domains=(STOCK, PRODUCTS, PURCHASING))
+    async def get_recommendations(self) -> list[dict]:
+        return await self.compute()
+
+    async def apply(self, product_ids: list[uuid.UUID] | None = None) -> dict:
+        """Write the recommended reorder point and quantity onto the products."""
+        selected = {str(product_id) for product_id in product_ids} if product_ids else None
+        changes = [
+            {
+                "id": uuid.UUID(r["product_id"]),
+                "reorder_point": r["recommended_reorder_point"],
+                "reorder_quantity": r["recommended_reorder_quantity"],
+            }
+            for r in await self.compute()
+            if (selected is None or r["product_id"] in selected)
+            and (r["reorder_point"], r["reorder_quantity"])
+            != (r["recommended_reorder_point"], r["recommended_reorder_quantity"])
+        ]
+        if changes:
+            await self.db.execute(update(Product), changes)
+            invalidate_after_commit(self.db, PRODUCTS)
+        return {"updated": len(changes)}
@@ -0,0 +1,414 @@
+import asyncio
+import logging
+import os
+import uuid
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TextIO
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.auth.models import User
+from app.config import settings
+from app.database import run_after_commit
+from app.exceptions import BadRequestException, NotFoundException
+
+from .forecasting import FORECAST_COLUMNS, DemandForecastService
+from .models import ReportJob
+from .schemas import NoParams, PurchaseHistoryParams, ReportJobCreate, StockTurnoverParams
+from .service import PURCHASE_HISTORY_COLUMNS, STOCK_SUMMARY_COLUMNS, ReportingService
+from .streaming import STREAM_BATCH_SIZE, encode_rows
+from .turnover import TURNOVER_COLUMNS, StockTurnoverService
+
+logger = logging.getLogger(__name__)
+
+
+class JobProgress:
+    def __init__(self):
+        self.rows = 0
+        self.total: int | None = None
+
+
+@dataclass(frozen=True)
+class ReportDefinition:
+    columns: list[str]
+    params: type[BaseModel]
+    # (session, validated params, progress) -> batches of result rows
+    batches: Callable[[AsyncSession, BaseModel, JobProgress], AsyncIterator[list[dict]]]
+
+
+async def _query_batches(db: AsyncSession, query, to_dict) -> AsyncIterator[list[dict]]:
+    result = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    async for partition in result.partitions():
+        yield [to_dict(row) for row in partition]
+
+
+async def _stock_summary(db: AsyncSession, params: NoParams, progress: JobProgress):
+    query = ReportingService.stock_summary_query()
+    async for batch in _query_batches(db, query, ReportingService.stock_summary_row):
+        yield batch
+
+
+async def _purchase_history(db: AsyncSession, params: PurchaseHistoryParams, progress: JobProgress):
+    query = ReportingService.purchase_history_query(params.days)
+    async for batch in _query_batches(db, query, ReportingService.purchase_history_row):
+        yield batch
+
+
+async def _stock_turnover(db: AsyncSession, params: StockTurnoverParams, progress: JobProgress):
+    query = StockTurnoverService(db).report_query(**params.model_dump())
+    result = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    async for partition in result.partitions():
+        # Every row carries the window count of the whole report
+        progress.total = partition[0].total
+        yield [StockTurnoverService.turnover_row(row) for row in partition]
+
+
+async def _demand_forecast(db: AsyncSession, params: NoParams, progress: JobProgress):
+    recommendations = await DemandForecastService(db).compute()
+    progress.total = len(recommendations)
+    for start in range(0, len(recommendations), STREAM_BATCH_SIZE):
+        yield recommendations[start:start + STREAM_BATCH_SIZE]
+
+
+REPORTS: dict[str, ReportDefinition] = {
+    "stock_summary": ReportDefinition(STOCK_SUMMARY_COLUMNS, NoParams, _stock_summary),
+    "purchase_history": ReportDefinition(
+        PURCHASE_HISTORY_COLUMNS, PurchaseHistoryParams, _purchase_history
+    ),
+    "stock_turnover": ReportDefinition(TURNOVER_COLUMNS, StockTurnoverParams, _stock_turnover),
+    "demand_forecast": ReportDefinition(FORECAST_COLUMNS, NoParams, _demand_forecast),
+}
+
+
+def result_path(job: ReportJob) -> Path:
+    return Path(settings.REPORT_JOB_DIR) / f"{job.id}.{job.format}"
+
+
+def partial_path(job: ReportJob) -> Path:
+    path = result_path(job)
+    return path.with_name(path.name + ".part")
+
+
+def _open_result(partial: Path) -> TextIO:
+    partial.parent.mkdir(parents=True, exist_ok=True)
+    return open(partial, "w", encoding="utf-8", newline="")
+
+
+def _job_lock(job_id: uuid.UUID):
+    return func.hashtext(f"reporting.job.{job_id}")
+
+
+class ReportJobService:
+    """Queues report jobs and reads their state for the API."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, data: ReportJobCreate, user_id: uuid.UUID) -> ReportJob:
+        definition = REPORTS.get(data.report)
+        if definition is None:
+            raise NotFoundException(f"Unknown report '{data.report}'")
+        try:
+            params = definition.params.model_validate(data.params)
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            field = ".".join(str(part) for part in error["loc"])
+            raise BadRequestException(f"Invalid parameter '{field}': {error['msg']}") from exc
+
+        job = ReportJob(
+            report=data.report,
+            format=data.format,
+            params=params.model_dump(),
+            created_by=user_id,
+        )
+        self.db.add(job)
+        await self.db.flush()
+        job_id = job.id
+        run_after_commit(self.db, lambda: report_workers.submit(job_id))
+        return job
+
+    async def get(self, job_id: uuid.UUID, user: User) -> ReportJob:
+        job = await self.db.get(ReportJob, job_id)
+        # Other users' jobs are reported as missing rather than forbidden
+        if job is None or (job.created_by != user.id and user.role != "admin"):
+            raise NotFoundException("Report job not found")
+        return job
+
+    async def list_jobs(self, user: User, skip: int = 0, limit: int = 20) -> tuple[list[ReportJob], int]:
+        query = select(ReportJob)
+        if user.role != "admin":
+            query = query.where(ReportJob.created_by == user.id)
+        total = (
+            await self.db.execute(select(func.count()).select_from(query.subquery()))
+        ).scalar_one()
+        result = await self.db.execute(
+            query.order_by(ReportJob.created_at.desc()).offset(skip).limit(limit)
+        )
+        return list(result.scalars().all()), total
+
+
+class ReportJobRunner:
+    """Runs one queued job and writes its result file.
+
+    From before the claim until the job's final state is committed, the
+    runner holds a session-level advisory lock on the job, on a connection
+    of its own. A job submitted to several workers (or processes) therefore
+    runs once, and a ``running`` job whose lock nobody holds was orphaned by
+    a crash. Progress is committed on a separate short transaction after
+    every batch, because committing on the session that reads the report
+    would close its server-side cursor.
+    """
+
+    def __init__(self, sessions: Callable[[], AsyncSession], engine: AsyncEngine):
+        self.sessions = sessions
+        self.engine = engine
+
+    async def run(self, job_id: uuid.UUID) -> None:
+        async with self.engine.connect() as lock_conn:
+            locked = (
+                await lock_conn.execute(select(func.pg_try_advisory_lock(_job_lock(job_id))))
+            ).scalar_one()
+            await lock_conn.commit()
+            if not locked:
+                return
+            try:
+                await self._run(job_id)
+            finally:
+                await lock_conn.execute(select(func.pg_advisory_unlock(_job_lock(job_id))))
+                await lock_conn.commit()
+
+    async def _run(self, job_id: uuid.UUID) -> None:
+        async with self.sessions() as db:
+            job = (
+                await db.execute(
+                    update(ReportJob)
+                    .where(ReportJob.id == job_id, ReportJob.status == "queued")
+                    .values(status="running", started_at=func.now())
+                    .returning(ReportJob)
+                )
+            ).scalar_one_or_none()
+            if job is None:
+                return
+            await db.commit()
+
+            path = result_path(job)
+            partial = partial_path(job)
+            progress = JobProgress()
+            try:
+                await self._write(db, job, partial, progress)
+                await asyncio.to_thread(os.replace, partial, path)
+            except asyncio.CancelledError:
+                # Shutting down: hand the job back to the queue for the next start
+                partial.unlink(missing_ok=True)
+                await self._requeue(job_id)
+                raise
+            except Exception as exc:
+                logger.exception("Report job %s (%s) failed", job.id, job.report)
+                partial.unlink(missing_ok=True)
+                await db.rollback()
+                await db.execute(
+                    update(ReportJob)
+                    .where(ReportJob.id == job_id)
+                    .values(
+                        status="failed", error=str(exc) or type(exc).__name__, finished_at=func.now()
+                    )
+                )
+                await db.commit()
+                return
+
+            await db.execute(
+                update(ReportJob)
+                .where(ReportJob.id == job_id)
+                .values(
+                    status="succeeded",
+                    rows_written=progress.rows,
+                    rows_total=progress.rows,
+                    result_path=str(path),
+                    result_bytes=path.stat().st_size,
+                    finished_at=func.now(),
+                )
+            )
+            await db.commit()
+            logger.info("Report job %s (%s) wrote %d rows", job.id, job.report, progress.rows)
+
+    async def _write(self, db: AsyncSession, job: ReportJob, partial: Path, progress: JobProgress) -> None:
+        definition = REPORTS[job.report]
+        params = definition.params.model_validate(job.params)
+
+        async def counted() -> AsyncIterator[list[dict]]:
+            async for batch in definition.batches(db, params, progress):
+                progress.rows += len(batch)
+                yield batch
+                await self._report_progress(job.id, progress)
+
+        # All file I/O, including the flush on close, stays off the event loop
+        file = await asyncio.to_thread(_open_result, partial)
+        try:
+            async for chunk in encode_rows(counted(), definition.columns, job.format):
+                await asyncio.to_thread(file.write, chunk)
+        finally:
+            await asyncio.to_thread(file.close)
+
+    async def _requeue(self, job_id: uuid.UUID) -> None:
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                update(ReportJob)
+                .where(ReportJob.id == job_id, ReportJob.status == "running")
+                .values(status="queued", started_at=None, rows_written=0, rows_total=None)
+            )
+        logger.info("Report job %s interrupted by shutdown; requeued", job_id)
+
+    async def _report_progress(self, job_id: uuid.UUID, progress: JobProgress) -> None:
+        try:
+            async with self.engine.begin() as conn:
+                await conn.execute(
+                    update(ReportJob)
+                    .where(ReportJob.id == job_id)
+                    .values(rows_written=progress.rows, rows_total=progress.total)
+                )
+        except Exception:
+            # Progress is informational; the job itself carries on
+            logger.warning("Could not record progress of report job %s", job_id, exc_info=True)
+
+
+class ReportWorkerPool:
+    """A fixed number of asyncio workers draining the report job queue.
+
+    Workers use an engine of their own, sized to the worker count, so
+    long-running reports never hold connections from the request pool and
+    at most ``REPORT_JOB_WORKERS`` of them run at once per process.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._queue: asyncio.Queue[uuid.UUID] | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._engine: AsyncEngine | None = None
+        self._sessions: async_sessionmaker | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    async def start(self) -> None:
+        # A reader and a job lock connection per worker, plus one shared by
+        # progress updates and the retention purge
+        self._engine = create_async_engine(
+            settings.DATABASE_URL, pool_size=2 * self.workers + 1, max_overflow=0
+        )
+        self._sessions = async_sessionmaker(self._engine, class_=AsyncSession, expire_on_commit=False)
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"report-worker-{n}") for n in range(self.workers)
+        ]
+        # Retention applies to long-running processes too, not only at startup
+        self._tasks.append(asyncio.create_task(self._purge_periodically(), name="report-job-purge"))
+        try:
+            await self._purge_expired()
+        except Exception:
+            logger.exception("Could not purge expired report jobs")
+        try:
+            await self._recover()
+        except Exception:
+            logger.exception("Could not requeue pending report jobs")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    def submit(self, job_id: uuid.UUID) -> None:
+        if self._queue is None:
+            # Picked up by the next process that starts its workers
+            logger.warning("Report workers are not running; job %s stays queued", job_id)
+            return
+        self._queue.put_nowait(job_id)
+
+    async def _work(self) -> None:
+        runner = ReportJobRunner(self._sessions, self._engine)
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await runner.run(job_id)
+            except Exception:
+                logger.exception("Report worker failed on job %s", job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _purge_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(settings.REPORT_JOB_PURGE_INTERVAL_SECONDS)
+            try:
+                await self._purge_expired()
+            except Exception:
+                logger.exception("Could not purge expired report jobs")
+
+    async def _purge_expired(self) -> int:
+        """Delete jobs finished more than ``REPORT_JOB_RETENTION_HOURS`` ago, and their files."""
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.REPORT_JOB_RETENTION_HOURS)
+        async with self._sessions() as db:
+            expired = (
+                await db.execute(
+                    delete(ReportJob)
+                    .where(ReportJob.finished_at < cutoff)
+                    .returning(ReportJob.result_path)
+                )
+            ).scalars().all()
+            await db.commit()
+        for path in expired:
+            if path:
+                await asyncio.to_thread(Path(path).unlink, missing_ok=True)
+        if expired:
+            logger.info("Purged %d expired report jobs", len(expired))
+        return len(expired)
+
+    async def _recover(self) -> None:
+        """Fail orphaned jobs and requeue those nobody picked up."""
+        async with self._sessions() as db:
+            running = (
+                await db.execute(select(ReportJob).where(ReportJob.status == "running"))
+            ).scalars().all()
+            orphaned = []
+            for job in running:
+                # A live runner holds the job's lock; after a crash nobody does.
+                # Not requeued, in case the job itself brought the process down.
+                locked = await db.execute(select(func.pg_try_advisory_xact_lock(_job_lock(job.id))))
+                if locked.scalar_one():
+                    orphaned.append(job)
+            if orphaned:
+                await db.execute(
+                    update(ReportJob)
+                    .where(ReportJob.id.in_([job.id for job in orphaned]))
+                    .values(
+                        status="failed",
+                        error="Interrupted before it finished; submit the report again",
+                        finished_at=func.now(),
+                    )
+                )
+            queued = (
+                await db.execute(
+                    select(ReportJob.id)
+                    .where(ReportJob.status == "queued")
+                    .order_by(ReportJob.created_at)
+                )
+            ).scalars().all()
+            await db.commit()
+        for job in orphaned:
+            partial_path(job).unlink(missing_ok=True)
+        for job_id in queued:
+            self.submit(job_id)
+        if queued or orphaned:
+            logger.info("Requeued %d report jobs, failed %d orphaned", len(queued), len(orphaned))
+
+
+report_workers = ReportWorkerPool(settings.REPORT_JOB_WORKERS)
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+from app.inventory.models import StockLevel, StockMovement
+from app.products.models import Product
+from app.purchasing.models import PurchaseOrder
+
+from .cache import PRODUCTS, PURCHASING, STOCK, data_versions
+
+logger = logging.getLogger(__name__)
+
+PENDING_PO_STATUSES = ["draft", "pending_approval", "approved", "sent"]
+
+
+def _total_stock_value():
+    return (
+        select(func.coalesce(func.sum(StockLevel.quantity_on_hand * Product.cost_price), 0))
+        .join(Product, Product.id == StockLevel.product_id)
+        .where(Product.cost_price.isnot(None))
+        .scalar_subquery()
+    )
+
+
+def _pending_po_count():
+    return (
+        select(func.count())
+        .select_from(PurchaseOrder)
+        .where(PurchaseOrder.status.in_(PENDING_PO_STATUSES))
+        .scalar_subquery()
+    )
+
+
+def _low_stock_count():
+    on_hand = (
+        select(func.coalesce(func.sum(StockLevel.quantity_on_hand), 0))
+        .where(StockLevel.product_id == Product.id)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+    return (
+        select(func.count())
+        .select_from(Product)
+        .where(
+            Product.status == "active",
+            Product.reorder_point > 0,
+            on_hand < Product.reorder_point,
+        )
+        .scalar_subquery()
+    )
+
+
+def _movements_today():
+    today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (
+        select(func.count())
+        .select_from(StockMovement)
+        .where(StockMovement.created_at >= today_start)
+        .scalar_subquery()
+    )
+
+
+@dataclass(frozen=True)
+class Kpi:
+    name: str
+    expression: Callable
+    domains: tuple[str, ...]
+    convert: type = int
+
+
+KPIS = (
+    Kpi("total_stock_value", _total_stock_value, (STOCK, PRODUCTS), float),
+    Kpi("pending_po_count", _pending_po_count, (PURCHASING,)),
+    Kpi("low_stock_count", _low_stock_count, (STOCK, PRODUCTS)),
+    Kpi("movements_today", _movements_today, (STOCK,)),
+)
+
+FRESH, STALE, MISSING = "fresh", "stale", "missing"
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry:
+    value: object
+    computed_at: float
+    versions: tuple[int, ...]
+
+
+class KpiCache:
+    """Dashboard KPIs cached per KPI.
+
+    A KPI is fresh for ``ttl`` seconds and may then be served stale for
+    ``stale_ttl`` more while a background task recomputes it. A write to a
+    domain the KPI depends on makes it missing, so the next read recomputes
+    it synchronously. All recomputation goes through a single flight: a
+    burst of dashboard loads shares one query, and that query only computes
+    the KPIs that actually need it.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: dict[str, _Entry] = {}
+        self._flight: asyncio.Future | None = None
+        self._background: asyncio.Task | None = None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _state(self, kpi: Kpi, now: float) -> str:
+        entry = self._entries.get(kpi.name)
+        if entry is None or entry.versions != data_versions.snapshot(kpi.domains):
+            return MISSING
+        age = now - entry.computed_at
+        if age < self.ttl:
+            return FRESH
+        if age < self.ttl + self.stale_ttl:
+            return STALE
+        return MISSING
+
+    async def get(self, db: AsyncSession) -> dict:
+        now = time.monotonic()
+        states = {kpi.name: self._state(kpi, now) for kpi in KPIS}
+        if MISSING in states.values():
+            await self._refresh([kpi for kpi in KPIS if states[kpi.name] != FRESH], db)
+        elif STALE in states.values() and self._background is None:
+            self._background = asyncio.create_task(self._refresh_in_background())
+        return {kpi.name: self._entries[kpi.name].value for kpi in KPIS}
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            async with async_session() as db:
+                now = time.monotonic()
+                await self._refresh([kpi for kpi in KPIS if self._state(kpi, now) != FRESH], db)
+        except Exception:
+            logger.exception("Background dashboard KPI refresh failed")
+        finally:
+            self._background = None
+
+    async def _refresh(self, kpis: list[Kpi], db: AsyncSession) -> None:
+        while self._flight is not None:
+            # Another caller is already querying; reuse its results if they cover us
+            await asyncio.shield(self._flight)
+            now = time.monotonic()
+            kpis = [kpi for kpi in kpis if self._state(kpi, now) != FRESH]
+        if not kpis:
+            return
+
+        self._flight = flight = asyncio.get_running_loop().create_future()
+        try:
+            versions = {kpi.name: data_versions.snapshot(kpi.domains) for kpi in kpis}
+            row = (
+                await db.execute(select(*[kpi.expression().label(kpi.name) for kpi in kpis]))
+            ).one()
+            computed_at = time.monotonic()
+            for kpi in kpis:
+                # Versions are taken before the query, so a write that lands
+                # meanwhile leaves this entry already invalid.
+                self._entries[kpi.name] = _Entry(
+                    kpi.convert(getattr(row, kpi.name) or 0), computed_at, versions[kpi.name]
+                )
+        finally:
+            self._flight = None
+            flight.set_result(None)
+
+
+kpi_cache = KpiCache(settings.DASHBOARD_KPI_TTL_SECONDS, settings.DASHBOARD_KPI_STALE_SECONDS)
@@ -0,0 +1,156 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import (
+    TIMESTAMP, BigInteger, ForeignKey, Integer, Select, String, Text, column, event, func, select,
+    table, text,
+)
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.inventory.models import StockLevel
+from app.products.models import Product
+from app.purchasing.models import PurchaseOrder
+from app.vendors.models import Vendor
+
+from .cache import PRODUCTS, PURCHASING, STOCK, VENDORS
+
+
+class ReportJob(Base):
+    """A report run in the background, with its result written to disk."""
+
+    __tablename__ = "report_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    report: Mapped[str] = mapped_column(String(50), nullable=False)
+    format: Mapped[str] = mapped_column(String(10), nullable=False)
+    params: Mapped[dict] = mapped_column(JSONB, nullable=False, default=dict)
+    # queued -> running -> succeeded | failed
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued", index=True)
+    rows_written: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Only known up front for some reports
+    rows_total: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    result_path: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    result_bytes: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_by: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
+    started_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+
+
+class ReportViewState(Base):
+    """When each materialized reporting view was last refreshed."""
+
+    __tablename__ = "report_view_state"
+
+    name: Mapped[str] = mapped_column(String(63), primary_key=True)
+    refreshed_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    # Sum of the source tables' row change counters at that refresh
+    change_baseline: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    refresh_ms: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class MaterializedView:
+    """A reporting view over the operational tables, created with the schema.
+
+    ``unique_columns`` back the unique index that ``REFRESH MATERIALIZED
+    VIEW CONCURRENTLY`` requires; ``sources`` are the tables whose changed
+    rows count towards the refresh threshold.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        query: Select,
+        unique_columns: tuple[str, ...],
+        sources: tuple[str, ...],
+        domains: tuple[str, ...],
+        indexes: tuple[tuple[str, ...], ...] = (),
+    ):
+        self.name = name
+        self.query = query
+        self.unique_columns = unique_columns
+        self.sources = sources
+        self.domains = domains
+        self.indexes = indexes
+        self.table = table(name, *(column(c.key, c.type) for c in query.selected_columns))
+        self.c = self.table.c
+
+    def create_statements(self) -> list[str]:
+        definition = self.query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+        statements = [
+            f"CREATE MATERIALIZED VIEW IF NOT EXISTS {self.name} AS {definition}",
+            f"CREATE UNIQUE INDEX IF NOT EXISTS ix_{self.name}_key "
+            f"ON {self.name} ({', '.join(self.unique_columns)})",
+        ]
+        for columns in self.indexes:
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS ix_{self.name}_{'_'.join(columns)} "
+                f"ON {self.name} ({', '.join(columns)})"
+            )
+        return statements
+
+    def drop_statement(self) -> str:
+        return f"DROP MATERIALIZED VIEW IF EXISTS {self.name}"
+
+
+STOCK_SUMMARY_VIEW = MaterializedView(
+    "report_stock_summary",
+    select(
+        Product.id,
+        Product.sku,
+        Product.name,
+        Product.cost_price,
+        func.coalesce(func.sum(StockLevel.quantity_on_hand), 0).label("total_on_hand"),
+        func.coalesce(func.sum(StockLevel.quantity_reserved), 0).label("total_reserved"),
+    )
+    .outerjoin(StockLevel, StockLevel.product_id == Product.id)
+    .where(Product.status == "active")
+    .group_by(Product.id, Product.sku, Product.name, Product.cost_price),
+    unique_columns=("id",),
+    sources=("products", "stock_levels"),
+    domains=(STOCK, PRODUCTS),
+    indexes=(("name",),),
+)
+
+PURCHASE_HISTORY_VIEW = MaterializedView(
+    "report_purchase_history",
+    select(
+        PurchaseOrder.id,
+        PurchaseOrder.po_number,
+        PurchaseOrder.status,
+        PurchaseOrder.total_amount,
+        PurchaseOrder.order_date,
+        PurchaseOrder.created_at,
+        Vendor.code.label("vendor_code"),
+        Vendor.name.label("vendor_name"),
+    ).join(Vendor, Vendor.id == PurchaseOrder.vendor_id),
+    unique_columns=("id",),
+    sources=("purchase_orders", "vendors"),
+    domains=(PURCHASING, VENDORS),
+    indexes=(("created_at",),),
+)
+
+REPORT_VIEWS = {view.name: view for view in (STOCK_SUMMARY_VIEW, PURCHASE_HISTORY_VIEW)}
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_report_views(target, connection, **kw) -> None:
+    for view in REPORT_VIEWS.values():
+        for statement in view.create_statements():
+            connection.execute(text(statement))
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_report_views(target, connection, **kw) -> None:
+    for view in REPORT_VIEWS.values():
+        connection.execute(text(view.drop_statement()))
@@ -1,15 +1,45 @@
-from fastapi import APIRouter, Depends, Query
+import uuid
+from pathlib import Path
+
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.models import User
 from app.database import get_db
-from app.dependencies import get_current_active_user
+from app.dependencies import get_current_active_user, require_roles
+from app.exceptions import ConflictException, NotFoundException
+from app.products.classification import ClassificationService
+
+from .cache import report_cache
+from .forecasting import DemandForecastService
+from .jobs import ReportJobService
+from .models import PURCHASE_HISTORY_VIEW, STOCK_SUMMARY_VIEW, MaterializedView, ReportJob
+from .schemas import DemandForecastApply, ReportJobCreate, ReportJobResponse
+from .service import PURCHASE_HISTORY_COLUMNS, STOCK_SUMMARY_COLUMNS, ReportingService
+from .streaming import MEDIA_TYPES, stream_report
+from .turnover import SORT_FIELDS, StockTurnoverService
+from .views import FRESHNESS_HEADER, ReportViewService
 
-from .service import ReportingService
+_FORMAT_PATTERN = "^(json|csv|ndjson)$"
 
 router = APIRouter()
 
 
+def _job_response(job: ReportJob) -> ReportJobResponse:
+    response = ReportJobResponse.model_validate(job)
+    if job.status == "succeeded":
+        response.progress = 1.0
+    elif job.rows_total:
+        response.progress = round(min(job.rows_written / job.rows_total, 1.0), 4)
+    return response
+
+
+async def _freshness(db: AsyncSession, view: MaterializedView) -> dict[str, str]:
+    refreshed_at = await ReportViewService(db).refreshed_at(view)
+    return {FRESHNESS_HEADER: refreshed_at.isoformat()} if refreshed_at else {}
+
+
 @router.get("/dashboard/kpis")
 async def get_dashboard_kpis(
     db: AsyncSession = Depends(get_db),
@@ -31,19 +61,45 @@ async def get_recent_activity(
 
 @router.get("/reports/stock-summary")
 async def get_stock_summary(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     _: User = Depends(get_current_active_user),
+    fmt: str = Query("json", alias="format", pattern=_FORMAT_PATTERN),
 ):
+    freshness = await _freshness(db, STOCK_SUMMARY_VIEW)
+    if fmt != "json":
+        return stream_report(
+            ReportingService.stock_summary_query(),
+            ReportingService.stock_summary_row,
+            STOCK_SUMMARY_COLUMNS,
+            fmt,
+            "stock-summary",
+            freshness,
+        )
+    response.headers.update(freshness)
     service = ReportingService(db)
     return await service.get_stock_summary()
 
 
 @router.get("/reports/purchase-history")
 async def get_purchase_history(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     _: User = Depends(get_current_active_user),
     days: int = Query(90, ge=1, le=365),
+    fmt: str = Query("json", alias="format", pattern=_FORMAT_PATTERN),
 ):
+    freshness = await _freshness(db, PURCHASE_HISTORY_VIEW)
+    if fmt != "json":
+        return stream_report(
+            ReportingService.purchase_history_query(days),
+            ReportingService.purchase_history_row,
+            PURCHASE_HISTORY_COLUMNS,
+            fmt,
+            f"purchase-history-{days}d",
+            freshness,
+        )
+    response.headers.update(freshness)
     service = ReportingService(db)
     return await service.get_purchase_history(days)
 
@@ -55,3 +111,149 @@ async def get_vendor_performance(
 ):
     service = ReportingService(db)
     return await service.get_vendor_performance()
+
+
+@router.get("/reports/movement-series")
+async def get_movement_series(
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(get_current_active_user),
+    days: int = Query(90, ge=1, le=365),
+    product_id: list[uuid.UUID] = Query([]),
+    warehouse_id: uuid.UUID | None = Query(None),
+    location_id: uuid.UUID | None = Query(None),
+):
+    service = ReportingService(db)
+    return await service.get_movement_series(
+        days, tuple(sorted(set(product_id))), warehouse_id, location_id
+    )
+
+
+@router.get("/reports/abc-xyz")
+async def get_abc_xyz_classification(
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(get_current_active_user),
+):
+    return await ClassificationService(db).summary()
+
+
+@router.get("/reports/demand-forecast", response_model=dict)
+async def get_demand_forecast(
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(get_current_active_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    recommendations = await DemandForecastService(db).get_recommendations()
+    total = len(recommendations)
+    return {
+        "items": recommendations[skip:skip + limit],
+        "total": total,
+        "page": skip // limit + 1,
+        "page_size": limit,
+        "total_pages": (total + limit - 1) // limit if limit else 1,
+    }
+
+
+@router.post("/reports/demand-forecast/apply")
+async def apply_demand_forecast(
+    data: DemandForecastApply,
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_roles("admin", "manager")),
+):
+    return await DemandForecastService(db).apply(data.product_ids)
+
+
+@router.get("/reports/stock-turnover")
+async def get_stock_turnover(
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(get_current_active_user),
+    period_days: int = Query(90, ge=1, le=730),
+    dead_after_days: int = Query(90, ge=1, le=730),
+    sort: str = Query("days_of_supply", pattern=f"^({'|'.join(SORT_FIELDS)})$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    dead_only: bool = Query(False),
+    cursor: str | None = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+):
+    return await StockTurnoverService(db).report(
+        period_days, dead_after_days, sort, order == "desc", dead_only, cursor, limit
+    )
+
+
+@router.post("/reports/jobs", response_model=ReportJobResponse, status_code=202)
+async def create_report_job(
+    data: ReportJobCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    job = await ReportJobService(db).create(data, current_user.id)
+    return _job_response(job)
+
+
+@router.get("/reports/jobs", response_model=dict)
+async def list_report_jobs(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+):
+    items, total = await ReportJobService(db).list_jobs(current_user, skip, limit)
+    return {
+        "items": [_job_response(job) for job in items],
+        "total": total,
+        "page": skip // limit + 1,
+        "page_size": limit,
+        "total_pages": (total + limit - 1) // limit if limit else 1,
+    }
+
+
+@router.get("/reports/jobs/{job_id}", response_model=ReportJobResponse)
+async def get_report_job(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    return _job_response(await ReportJobService(db).get(job_id, current_user))
+
+
+@router.get("/reports/jobs/{job_id}/download")
+async def download_report_job(
+    job_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    job = await ReportJobService(db).get(job_id, current_user)
+    if job.status != "succeeded":
+        raise ConflictException(f"Report job is {job.status}")
+    path = Path(job.result_path)
+    if not path.is_file():
+        raise NotFoundException("Report job result is no longer available")
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES[job.format],
+        filename=f"{job.report}-{job.created_at:%Y%m%dT%H%M%S}.{job.format}",
+    )
+
+
+@router.get("/reports/views")
+async def get_report_views(
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_roles("admin", "manager")),
+):
+    return await ReportViewService(db).status()
+
+
+@router.post("/reports/views/{name}/refresh")
+async def refresh_report_view(
+    name: str,
+    db: AsyncSession = Depends(get_db),
+    _: User = Depends(require_roles("admin", "manager")),
+):
+    return await ReportViewService(db).refresh(name)
+
+
+@router.get("/reports/cache-stats")
+async def get_report_cache_stats(
+    _: User = Depends(require_roles("admin")),
+):
+    return report_cache.stats()
@@ -0,0 +1,57 @@
+import uuid
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from .turnover import SORT_FIELDS
+
+
+class DemandForecastApply(BaseModel):
+    # Defaults to every product with a recommendation
+    product_ids: list[uuid.UUID] | None = Field(None, max_length=100_000)
+
+
+class ReportJobCreate(BaseModel):
+    report: str = Field(..., max_length=50)
+    format: str = Field("csv", pattern="^(csv|ndjson)$")
+    # Validated against the report's own parameter model
+    params: dict = Field(default_factory=dict)
+
+
+class ReportJobResponse(BaseModel):
+    id: uuid.UUID
+    report: str
+    format: str
+    params: dict
+    status: str
+    rows_written: int
+    rows_total: int | None
+    progress: float | None = None
+    result_bytes: int | None
+    error: str | None
+    created_by: uuid.UUID
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    model_config = {"from_attributes": True}
+
+
+class PurchaseHistoryParams(BaseModel):
+    days: int = Field(90, ge=1, le=365)
+
+    model_config = {"extra": "forbid"}
+
+
+class StockTurnoverParams(BaseModel):
+    period_days: int = Field(90, ge=1, le=730)
+    dead_after_days: int = Field(90, ge=1, le=730)
+    sort: str = Field("days_of_supply", pattern=f"^({'|'.join(SORT_FIELDS)})$")
+    descending: bool = True
+    dead_only: bool = False
+
+    model_config = {"extra": "forbid"}
+
+
+class NoParams(BaseModel):
+    model_config = {"extra": "forbid"}
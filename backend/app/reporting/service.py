@@ -1,12 +1,27 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import func, select
+from sqlalchemy import Float, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.inventory.models import StockLevel, StockMovement
+from app.inventory.models import StockMovement, StockMovementDaily
 from app.products.models import Product
-from app.purchasing.models import PurchaseOrder, GoodsReceipt
+from app.purchasing.models import GoodsReceipt, VendorPerformance
 from app.vendors.models import Vendor
+from app.warehouse.models import Location, Zone
+
+from .cache import PRODUCTS, PURCHASING, STOCK, VENDORS, report_cache
+from .kpis import kpi_cache
+from .models import PURCHASE_HISTORY_VIEW, STOCK_SUMMARY_VIEW
+
+STOCK_SUMMARY_COLUMNS = [
+    "product_id", "sku", "name", "total_on_hand", "total_reserved",
+    "total_available", "cost_price", "stock_value",
+]
+PURCHASE_HISTORY_COLUMNS = [
+    "po_id", "po_number", "status", "total_amount", "order_date",
+    "created_at", "vendor_code", "vendor_name",
+]
 
 
 class ReportingService:
@@ -14,58 +29,7 @@ class ReportingService:
         self.db = db
 
     async def get_dashboard_kpis(self) -> dict:
-        # Total stock value
-        stock_value_result = await self.db.execute(
-            select(func.sum(StockLevel.quantity_on_hand * Product.cost_price))
-            .join(Product, Product.id == StockLevel.product_id)
-            .where(Product.cost_price.isnot(None))
-        )
-        total_stock_value = float(stock_value_result.scalar() or 0)
-
-        # Pending PO count
-        pending_po_result = await self.db.execute(
-            select(func.count())
-            .select_from(PurchaseOrder)
-            .where(PurchaseOrder.status.in_(["draft", "pending_approval", "approved", "sent"]))
-        )
-        pending_po_count = pending_po_result.scalar() or 0
-
-        # Low stock alerts count
-        stock_subquery = (
-            select(
-                StockLevel.product_id,
-                func.sum(StockLevel.quantity_on_hand).label("total_on_hand"),
-            )
-            .group_by(StockLevel.product_id)
-            .subquery()
-        )
-        low_stock_result = await self.db.execute(
-            select(func.count())
-            .select_from(Product)
-            .outerjoin(stock_subquery, stock_subquery.c.product_id == Product.id)
-            .where(
-                Product.status == "active",
-                Product.reorder_point > 0,
-                func.coalesce(stock_subquery.c.total_on_hand, 0) < Product.reorder_point,
-            )
-        )
-        low_stock_count = low_stock_result.scalar() or 0
-
-        # Movements today
-        today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-        movements_result = await self.db.execute(
-            select(func.count())
-            .select_from(StockMovement)
-            .where(StockMovement.created_at >= today_start)
-        )
-        movements_today = movements_result.scalar() or 0
-
-        return {
-            "total_stock_value": total_stock_value,
-            "pending_po_count": pending_po_count,
-            "low_stock_count": low_stock_count,
-            "movements_today": movements_today,
-        }
+        return await kpi_cache.get(self.db)
 
     async def get_recent_activity(self, limit: int = 20) -> list[dict]:
         result = await self.db.execute(
@@ -95,83 +59,93 @@ class ReportingService:
             for row in result.all()
         ]
 
+    @staticmethod
+    def stock_summary_query():
+        view = STOCK_SUMMARY_VIEW.c
+        return select(
+            view.id, view.sku, view.name, view.cost_price, view.total_on_hand, view.total_reserved
+        ).order_by(view.name)
+
+    @staticmethod
+    def stock_summary_row(row) -> dict:
+        return {
+            "product_id": str(row.id),
+            "sku": row.sku,
+            "name": row.name,
+            "total_on_hand": row.total_on_hand,
+            "total_reserved": row.total_reserved,
+            "total_available": row.total_on_hand - row.total_reserved,
+            "cost_price": float(row.cost_price) if row.cost_price else None,
+            "stock_value": float(row.total_on_hand * row.cost_price) if row.cost_price else None,
+        }
+
+    @report_cache.cached("stock_summary", domains=(STOCK, PRODUCTS))
     async def get_stock_summary(self) -> list[dict]:
-        result = await self.db.execute(
+        result = await self.db.execute(self.stock_summary_query())
+        return [self.stock_summary_row(row) for row in result.all()]
+
+    @staticmethod
+    def purchase_history_query(days: int = 90):
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        view = PURCHASE_HISTORY_VIEW.c
+        return (
             select(
-                Product.id,
-                Product.sku,
-                Product.name,
-                Product.cost_price,
-                func.coalesce(func.sum(StockLevel.quantity_on_hand), 0).label("total_on_hand"),
-                func.coalesce(func.sum(StockLevel.quantity_reserved), 0).label("total_reserved"),
+                view.id,
+                view.po_number,
+                view.status,
+                view.total_amount,
+                view.order_date,
+                view.created_at,
+                view.vendor_code,
+                view.vendor_name,
             )
-            .outerjoin(StockLevel, StockLevel.product_id == Product.id)
-            .where(Product.status == "active")
-            .group_by(Product.id, Product.sku, Product.name, Product.cost_price)
-            .order_by(Product.name)
+            .where(view.created_at >= since)
+            .order_by(view.created_at.desc())
         )
-        return [
-            {
-                "product_id": str(row.id),
-                "sku": row.sku,
-                "name": row.name,
-                "total_on_hand": row.total_on_hand,
-                "total_reserved": row.total_reserved,
-                "total_available": row.total_on_hand - row.total_reserved,
-                "cost_price": float(row.cost_price) if row.cost_price else None,
-                "stock_value": float(row.total_on_hand * row.cost_price) if row.cost_price else None,
-            }
-            for row in result.all()
-        ]
 
+    @staticmethod
+    def purchase_history_row(row) -> dict:
+        return {
+            "po_id": str(row.id),
+            "po_number": row.po_number,
+            "status": row.status,
+            "total_amount": float(row.total_amount),
+            "order_date": row.order_date.isoformat() if row.order_date else None,
+            "created_at": row.created_at.isoformat(),
+            "vendor_code": row.vendor_code,
+            "vendor_name": row.vendor_name,
+        }
+
+    @report_cache.cached("purchase_history", domains=(PURCHASING, VENDORS))
     async def get_purchase_history(
         self, days: int = 90
     ) -> list[dict]:
-        since = datetime.now(timezone.utc) - timedelta(days=days)
-        result = await self.db.execute(
-            select(
-                PurchaseOrder.id,
-                PurchaseOrder.po_number,
-                PurchaseOrder.status,
-                PurchaseOrder.total_amount,
-                PurchaseOrder.order_date,
-                PurchaseOrder.created_at,
-                Vendor.code.label("vendor_code"),
-                Vendor.name.label("vendor_name"),
-            )
-            .join(Vendor, Vendor.id == PurchaseOrder.vendor_id)
-            .where(PurchaseOrder.created_at >= since)
-            .order_by(PurchaseOrder.created_at.desc())
-        )
-        return [
-            {
-                "po_id": str(row.id),
-                "po_number": row.po_number,
-                "status": row.status,
-                "total_amount": float(row.total_amount),
-                "order_date": row.order_date.isoformat() if row.order_date else None,
-                "created_at": row.created_at.isoformat(),
-                "vendor_code": row.vendor_code,
-                "vendor_name": row.vendor_name,
-            }
-            for row in result.all()
-        ]
+        result = await self.db.execute(self.purchase_history_query(days))
+        return [self.purchase_history_row(row) for row in result.all()]
 
+    @report_cache.cached("vendor_performance", domains=(PURCHASING, VENDORS))
     async def get_vendor_performance(self) -> list[dict]:
+        perf = VendorPerformance
         result = await self.db.execute(
             select(
                 Vendor.id,
                 Vendor.code,
                 Vendor.name,
                 Vendor.rating,
-                func.count(PurchaseOrder.id).label("order_count"),
-                func.sum(PurchaseOrder.total_amount).label("total_spend"),
-                func.avg(Vendor.lead_time_days).label("avg_lead_time"),
+                Vendor.lead_time_days,
+                func.coalesce(perf.order_count, 0).label("order_count"),
+                func.coalesce(perf.total_spend, 0).label("total_spend"),
+                func.coalesce(perf.receipt_count, 0).label("receipt_count"),
+                (perf.lead_time_days_total / func.nullif(perf.lead_time_samples, 0).cast(Float))
+                .label("avg_lead_time"),
+                (perf.on_time_count / func.nullif(perf.on_time_samples, 0).cast(Float))
+                .label("on_time_rate"),
+                (perf.quantity_filled / func.nullif(perf.quantity_ordered, 0).cast(Float))
+                .label("fill_rate"),
             )
-            .outerjoin(PurchaseOrder, PurchaseOrder.vendor_id == Vendor.id)
+            .outerjoin(perf, perf.vendor_id == Vendor.id)
             .where(Vendor.status == "active")
-            .group_by(Vendor.id, Vendor.code, Vendor.name, Vendor.rating)
-            .order_by(func.count(PurchaseOrder.id).desc())
+            .order_by(func.coalesce(perf.order_count, 0).desc(), Vendor.code)
         )
         return [
             {
@@ -180,8 +154,83 @@ class ReportingService:
                 "vendor_name": row.name,
                 "rating": float(row.rating) if row.rating else None,
                 "order_count": row.order_count,
-                "total_spend": float(row.total_spend or 0),
-                "avg_lead_time": float(row.avg_lead_time) if row.avg_lead_time else None,
+                "total_spend": float(row.total_spend),
+                "receipt_count": row.receipt_count,
+                "planned_lead_time": row.lead_time_days,
+                "avg_lead_time": row.avg_lead_time,
+                "on_time_rate": row.on_time_rate,
+                "fill_rate": row.fill_rate,
             }
             for row in result.all()
         ]
+
+    @report_cache.cached("movement_series", domains=(STOCK, PRODUCTS))
+    async def get_movement_series(
+        self,
+        days: int = 90,
+        product_ids: tuple[uuid.UUID, ...] = (),
+        warehouse_id: uuid.UUID | None = None,
+        location_id: uuid.UUID | None = None,
+    ) -> dict:
+        """Daily in/out per product over the last *days* days, read from the rollup.
+
+        Each series is a set of dense arrays aligned to ``start``..``end``
+        (UTC days), so charts need no further reshaping. Figures are per
+        location touched, as the rollup stores them: a transfer within the
+        selected scope adds to both ``quantity_in`` and ``quantity_out`` and
+        counts twice in ``location_movements``.
+        """
+        end = datetime.now(timezone.utc).date()
+        start = end - timedelta(days=days - 1)
+        daily = StockMovementDaily
+        query = (
+            select(
+                daily.product_id,
+                Product.sku,
+                Product.name,
+                daily.day,
+                func.sum(daily.quantity_in).label("quantity_in"),
+                func.sum(daily.quantity_out).label("quantity_out"),
+                func.sum(
+                    daily.in_count + daily.out_count + daily.adjustment_count + daily.transfer_count
+                ).label("location_movements"),
+            )
+            .join(Product, Product.id == daily.product_id)
+            .where(daily.day.between(start, end))
+            .group_by(daily.product_id, Product.sku, Product.name, daily.day)
+            .order_by(Product.sku, daily.day)
+        )
+        if product_ids:
+            query = query.where(daily.product_id.in_(product_ids))
+        if location_id:
+            query = query.where(daily.location_id == location_id)
+        if warehouse_id:
+            query = query.where(
+                daily.location_id.in_(
+                    select(Location.id)
+                    .join(Zone, Zone.id == Location.zone_id)
+                    .where(Zone.warehouse_id == warehouse_id)
+                )
+            )
+
+        series: dict[uuid.UUID, dict] = {}
+        for row in (await self.db.execute(query)).all():
+            entry = series.get(row.product_id)
+            if entry is None:
+                entry = series[row.product_id] = {
+                    "product_id": str(row.product_id),
+                    "sku": row.sku,
+                    "name": row.name,
+                    "quantity_in": [0] * days,
+                    "quantity_out": [0] * days,
+                    "location_movements": [0] * days,
+                }
+            index = (row.day - start).days
+            entry["quantity_in"][index] = row.quantity_in
+            entry["quantity_out"][index] = row.quantity_out
+            entry["location_movements"][index] = row.location_movements
+        return {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "series": list(series.values()),
+        }
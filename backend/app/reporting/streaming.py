@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Callable
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.database import async_session
+
+STREAM_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+async def _rows(query: Select, to_dict: Callable[[object], dict]) -> AsyncIterator[list[dict]]:
+    # The response body is sent after the request's session has closed, so the
+    # cursor gets a session of its own for exactly as long as the stream runs.
+    async with async_session() as db:
+        result = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for partition in result.partitions():
+            yield [to_dict(row) for row in partition]
+
+
+async def _csv(batches: AsyncIterator[list[dict]], columns: list[str]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    async for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # An empty result still produces the header
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def _ndjson(batches: AsyncIterator[list[dict]]) -> AsyncIterator[str]:
+    async for batch in batches:
+        yield "".join(json.dumps(row) + "\n" for row in batch)
+
+
+def encode_rows(
+    batches: AsyncIterator[list[dict]], columns: list[str], fmt: str
+) -> AsyncIterator[str]:
+    return _csv(batches, columns) if fmt == "csv" else _ndjson(batches)
+
+
+def stream_report(
+    query: Select,
+    to_dict: Callable[[object], dict],
+    columns: list[str],
+    fmt: str,
+    filename: str,
+    headers: dict[str, str] | None = None,
+) -> StreamingResponse:
+    """Stream *query* as CSV or NDJSON from a server-side cursor.
+
+    Rows are fetched ``STREAM_BATCH_SIZE`` at a time and each batch is
+    written out before the next is read, so memory stays flat however
+    large the result is.
+    """
+    return StreamingResponse(
+        encode_rows(_rows(query, to_dict), columns, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{fmt}"',
+            **(headers or {}),
+        },
+    )
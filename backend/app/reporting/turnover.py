@@ -0,0 +1,227 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Float, and_, case, func, literal, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.exceptions import BadRequestException
+from app.inventory.models import StockLevel, StockMovement
+from app.inventory.movement_rollup import DEMAND_MOVEMENT_TYPES
+from app.products.models import Product
+
+# Sort field -> the JSON type its keys take in a cursor
+_SORT_KEY_TYPES = {
+    "days_of_supply": (int, float),
+    "turnover": (int, float),
+    "stock_value": (int, float),
+    "on_hand": int,
+    "last_outbound_at": (int, float),
+    "sku": str,
+}
+SORT_FIELDS = tuple(_SORT_KEY_TYPES)
+TURNOVER_COLUMNS = [
+    "product_id", "sku", "name", "on_hand", "usage", "daily_usage", "turnover",
+    "days_of_supply", "days_of_supply_percentile", "stock_value", "last_outbound_at",
+    "dead_stock",
+]
+
+
+def cursor_scope(
+    sort: str, descending: bool, period_days: int, dead_after_days: int, dead_only: bool
+) -> list:
+    """The parameters a cursor is only valid for; JSON-shaped so it round-trips as is."""
+    return [sort, descending, period_days, dead_after_days, dead_only]
+
+
+def encode_cursor(scope: list, value, product_id: uuid.UUID) -> str:
+    # json keeps float('inf') as the non-standard Infinity token, which is fine here
+    return base64.urlsafe_b64encode(
+        json.dumps([scope, value, str(product_id)]).encode()
+    ).decode()
+
+
+def decode_cursor(cursor: str, scope: list) -> tuple:
+    try:
+        cursor_scope, value, product_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        product_id = uuid.UUID(product_id)
+    except (ValueError, TypeError, AttributeError) as exc:
+        raise BadRequestException("Invalid cursor") from exc
+    if cursor_scope != scope:
+        raise BadRequestException("Cursor was issued for a different sort order or filter")
+    # bool is an int to isinstance, but never a valid key
+    if isinstance(value, bool) or not isinstance(value, _SORT_KEY_TYPES[scope[0]]):
+        raise BadRequestException("Invalid cursor")
+    return value, product_id
+
+
+class StockTurnoverService:
+    """Turnover, days of supply and dead stock per active product.
+
+    One statement aggregates the ledger over the longer of the two windows,
+    derives average inventory from today's on-hand and the period's net
+    flow, and ranks every product with window functions; pages are then cut
+    by keyset on (sort key, product id), so deep pages cost the same as the
+    first one.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _report_query(self, period_days: int, dead_after_days: int, dead_only: bool):
+        now = datetime.now(timezone.utc)
+        period_start = now - timedelta(days=period_days)
+        dead_before = now - timedelta(days=dead_after_days)
+        horizon = min(period_start, dead_before)
+
+        outbound = and_(
+            StockMovement.movement_type.in_(DEMAND_MOVEMENT_TYPES),
+            StockMovement.from_location_id.is_not(None),
+        )
+        in_period = StockMovement.created_at >= period_start
+        # Transfers add and remove the same quantity, so they cancel out here
+        signed = case(
+            (StockMovement.to_location_id.is_not(None), StockMovement.quantity), else_=0
+        ) - case((StockMovement.from_location_id.is_not(None), StockMovement.quantity), else_=0)
+        flows = (
+            select(
+                StockMovement.product_id,
+                func.coalesce(
+                    func.sum(StockMovement.quantity).filter(outbound, in_period), 0
+                ).label("usage"),
+                func.coalesce(func.sum(signed).filter(in_period), 0).label("net_change"),
+                func.max(StockMovement.created_at).filter(outbound).label("last_outbound_at"),
+            )
+            .where(StockMovement.created_at >= horizon)
+            .group_by(StockMovement.product_id)
+            .subquery()
+        )
+        stock = (
+            select(StockLevel.product_id, func.sum(StockLevel.quantity_on_hand).label("on_hand"))
+            .group_by(StockLevel.product_id)
+            .subquery()
+        )
+
+        on_hand = func.coalesce(stock.c.on_hand, 0)
+        usage = func.coalesce(flows.c.usage, 0)
+        daily_usage = usage.cast(Float) / period_days
+        average_inventory = (on_hand - func.coalesce(flows.c.net_change, 0) / 2.0).cast(Float)
+        base = (
+            select(
+                Product.id.label("product_id"),
+                Product.sku,
+                Product.name,
+                on_hand.label("on_hand"),
+                usage.label("usage"),
+                daily_usage.label("daily_usage"),
+                (usage / func.nullif(average_inventory, 0)).label("turnover"),
+                # NULL = stock on hand with no usage at all, i.e. infinite supply
+                case(
+                    (on_hand <= 0, 0.0),
+                    (usage == 0, None),
+                    else_=on_hand / daily_usage,
+                ).label("days_of_supply"),
+                (on_hand * func.coalesce(Product.cost_price, 0)).cast(Float).label("stock_value"),
+                flows.c.last_outbound_at,
+                and_(
+                    on_hand > 0,
+                    or_(flows.c.last_outbound_at.is_(None), flows.c.last_outbound_at < dead_before),
+                ).label("dead_stock"),
+            )
+            .outerjoin(flows, flows.c.product_id == Product.id)
+            .outerjoin(stock, stock.c.product_id == Product.id)
+            .where(Product.status == "active")
+            .subquery()
+        )
+        sort_keys = {
+            "days_of_supply": func.coalesce(base.c.days_of_supply, literal(float("inf"), Float)),
+            "turnover": func.coalesce(base.c.turnover, 0.0),
+            "stock_value": base.c.stock_value,
+            "on_hand": base.c.on_hand,
+            "last_outbound_at": func.coalesce(func.extract("epoch", base.c.last_outbound_at).cast(Float), -1.0),
+            "sku": base.c.sku,
+        }
+        query = select(
+            base,
+            *(key.label(f"sort_{name}") for name, key in sort_keys.items()),
+            func.percent_rank()
+            .over(order_by=sort_keys["days_of_supply"])
+            .label("days_of_supply_percentile"),
+            func.count().over().label("total"),
+        )
+        if dead_only:
+            query = query.where(base.c.dead_stock)
+        return query
+
+    def report_query(
+        self,
+        period_days: int = 90,
+        dead_after_days: int = 90,
+        sort: str = "days_of_supply",
+        descending: bool = True,
+        dead_only: bool = False,
+        cursor: str | None = None,
+    ):
+        """The whole report in sort order, starting after *cursor*."""
+        ranked = self._report_query(period_days, dead_after_days, dead_only).subquery()
+        key = ranked.c[f"sort_{sort}"]
+        query = select(ranked)
+        if cursor:
+            after = decode_cursor(
+                cursor, cursor_scope(sort, descending, period_days, dead_after_days, dead_only)
+            )
+            position = tuple_(key, ranked.c.product_id)
+            query = query.where(position < after if descending else position > after)
+        if descending:
+            return query.order_by(key.desc(), ranked.c.product_id.desc())
+        return query.order_by(key, ranked.c.product_id)
+
+    @staticmethod
+    def turnover_row(row) -> dict:
+        return {
+            "product_id": str(row.product_id),
+            "sku": row.sku,
+            "name": row.name,
+            "on_hand": row.on_hand,
+            "usage": row.usage,
+            "daily_usage": round(row.daily_usage, 3),
+            "turnover": round(row.turnover, 3) if row.turnover is not None else None,
+            "days_of_supply": (
+                round(row.days_of_supply, 1) if row.days_of_supply is not None else None
+            ),
+            "days_of_supply_percentile": round(row.days_of_supply_percentile, 4),
+            "stock_value": row.stock_value,
+            "last_outbound_at": row.last_outbound_at.isoformat() if row.last_outbound_at else None,
+            "dead_stock": row.dead_stock,
+        }
+
+    async def report(
+        self,
+        period_days: int = 90,
+        dead_after_days: int = 90,
+        sort: str = "days_of_supply",
+        descending: bool = True,
+        dead_only: bool = False,
+        cursor: str | None = None,
+        limit: int = 50,
+    ) -> dict:
+        query = self.report_query(period_days, dead_after_days, sort, descending, dead_only, cursor)
+        rows = (await self.db.execute(query.limit(limit + 1))).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            "items": [self.turnover_row(row) for row in rows],
+            "total": rows[0].total if rows else None,
+            "next_cursor": (
+                encode_cursor(
+                    cursor_scope(sort, descending, period_days, dead_after_days, dead_only),
+                    getattr(rows[-1], f"sort_{sort}"),
+                    rows[-1].product_id,
+                )
+                if has_more
+                else None
+            ),
+            "limit": limit,
+        }
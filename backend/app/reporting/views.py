@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, create_async_engine
+
+from app.config import settings
+from app.exceptions import NotFoundException
+
+from .cache import data_versions, invalidate_after_commit
+from .models import REPORT_VIEWS, MaterializedView, ReportViewState
+
+logger = logging.getLogger(__name__)
+
+FRESHNESS_HEADER = "X-Report-Refreshed-At"
+
+
+async def _change_counter(conn, view: MaterializedView) -> int:
+    # Cumulative inserts/updates/deletes from the statistics collector; cheap
+    # to read and good enough to tell "a few rows" from "a lot of rows"
+    result = await conn.execute(
+        text(
+            "SELECT coalesce(sum(n_tup_ins + n_tup_upd + n_tup_del), 0) "
+            "FROM pg_stat_user_tables WHERE relname = ANY(:tables)"
+        ),
+        {"tables": list(view.sources)},
+    )
+    return int(result.scalar_one())
+
+
+async def refresh_view(conn: AsyncConnection, view: MaterializedView) -> bool:
+    """Refresh *view* concurrently, unless another process is already at it.
+
+    Runs in the caller's transaction; the refresh time recorded is the
+    transaction's snapshot time, which is what the view reflects.
+    """
+    locked = (
+        await conn.execute(
+            select(func.pg_try_advisory_xact_lock(func.hashtext(f"reporting.view.{view.name}")))
+        )
+    ).scalar_one()
+    if not locked:
+        return False
+    started = time.perf_counter()
+    baseline = await _change_counter(conn, view)
+    # Readers keep seeing the previous contents until the refresh commits
+    await conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view.name}"))
+    elapsed_ms = round(1000 * (time.perf_counter() - started))
+    stmt = pg_insert(ReportViewState).values(
+        name=view.name, refreshed_at=func.now(), change_baseline=baseline, refresh_ms=elapsed_ms
+    )
+    await conn.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ReportViewState.name],
+            set_={
+                "refreshed_at": stmt.excluded.refreshed_at,
+                "change_baseline": stmt.excluded.change_baseline,
+                "refresh_ms": stmt.excluded.refresh_ms,
+            },
+        )
+    )
+    logger.info("Refreshed %s in %d ms", view.name, elapsed_ms)
+    return True
+
+
+class ReportViewService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def refreshed_at(self, view: MaterializedView) -> datetime | None:
+        return (
+            await self.db.execute(
+                select(ReportViewState.refreshed_at).where(ReportViewState.name == view.name)
+            )
+        ).scalar_one_or_none()
+
+    async def status(self) -> list[dict]:
+        states = {
+            state.name: state
+            for state in (await self.db.execute(select(ReportViewState))).scalars().all()
+        }
+        connection = await self.db.connection()
+        views = []
+        for name, view in REPORT_VIEWS.items():
+            state = states.get(name)
+            changes = await _change_counter(connection, view)
+            views.append({
+                "name": name,
+                "refreshed_at": state.refreshed_at if state else None,
+                "refresh_ms": state.refresh_ms if state else None,
+                "pending_changes": max(changes - state.change_baseline, 0) if state else None,
+            })
+        return views
+
+    async def refresh(self, name: str) -> dict:
+        view = REPORT_VIEWS.get(name)
+        if view is None:
+            raise NotFoundException(f"Unknown report view '{name}'")
+        refreshed = await refresh_view(await self.db.connection(), view)
+        if refreshed:
+            invalidate_after_commit(self.db, *view.domains)
+        return {"name": name, "refreshed": refreshed}
+
+
+class ReportViewScheduler:
+    """Keeps the reporting views fresh from inside the application.
+
+    Every ``REPORT_VIEW_CHECK_SECONDS`` each view is refreshed if it is older
+    than ``REPORT_VIEW_MAX_AGE_SECONDS`` or its source tables have changed
+    by at least ``REPORT_VIEW_CHANGE_THRESHOLD`` rows since the last
+    refresh. An advisory lock per view keeps concurrent app processes from
+    refreshing the same view at the same time, and refreshes run on a
+    single-connection engine of their own rather than the request pool.
+
+    Cached reports are per process. A process that did not do a refresh
+    itself sees the new refresh time on its next check and drops its cached
+    results then, so it lags by at most ``REPORT_VIEW_CHECK_SECONDS``.
+    """
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self._engine: AsyncEngine | None = None
+        # Refresh time of each view as of this process's last check
+        self._seen: dict[str, datetime] = {}
+
+    def start(self) -> None:
+        self._engine = create_async_engine(settings.DATABASE_URL, pool_size=1, max_overflow=0)
+        self._task = asyncio.create_task(self._run(), name="report-view-scheduler")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    async def _run(self) -> None:
+        while True:
+            for view in REPORT_VIEWS.values():
+                try:
+                    await self.refresh_if_due(view)
+                except Exception:
+                    logger.exception("Could not refresh %s", view.name)
+            await asyncio.sleep(settings.REPORT_VIEW_CHECK_SECONDS)
+
+    async def refresh_if_due(self, view: MaterializedView) -> bool:
+        async with self._engine.begin() as conn:
+            state = await self._state(conn, view)
+            if state is not None:
+                seen = self._seen.setdefault(view.name, state.refreshed_at)
+                if seen != state.refreshed_at:
+                    # Refreshed by another process, or through the API, since the last check
+                    self._seen[view.name] = state.refreshed_at
+                    data_versions.bump(*view.domains)
+                age = (datetime.now(timezone.utc) - state.refreshed_at).total_seconds()
+                changes = await _change_counter(conn, view) - state.change_baseline
+                # A negative delta means the statistics were reset
+                if (
+                    age < settings.REPORT_VIEW_MAX_AGE_SECONDS
+                    and 0 <= changes < settings.REPORT_VIEW_CHANGE_THRESHOLD
+                ):
+                    return False
+            refreshed = await refresh_view(conn, view)
+            if refreshed:
+                self._seen[view.name] = (await self._state(conn, view)).refreshed_at
+        if refreshed:
+            data_versions.bump(*view.domains)
+        return refreshed
+
+    @staticmethod
+    async def _state(conn: AsyncConnection, view: MaterializedView):
+        return (
+            await conn.execute(
+                select(ReportViewState.refreshed_at, ReportViewState.change_baseline).where(
+                    ReportViewState.name == view.name
+                )
+            )
+        ).one_or_none()
+
+
+report_view_scheduler = ReportViewScheduler()
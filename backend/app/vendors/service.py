@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.exceptions import BadRequestException, ConflictException, NotFoundException
 from app.products.models import ProductVendor
 from app.purchasing.models import PurchaseOrder
+from app.reporting.cache import VENDORS, invalidate_after_commit
 
 from .models import Vendor
 from .schemas import ProductVendorCreate, VendorCreate, VendorUpdate
@@ -51,7 +52,7 @@ class VendorService:
         vendor = Vendor(**data.model_dump())
         self.db.add(vendor)
         await self.db.flush()
-        await self.db.refresh(vendor)
+        invalidate_after_commit(self.db, VENDORS)
         return vendor
 
     async def update_vendor(self, vendor_id: uuid.UUID, data: VendorUpdate) -> Vendor:
@@ -59,7 +60,7 @@ class VendorService:
         for key, value in data.model_dump(exclude_unset=True).items():
             setattr(vendor, key, value)
         await self.db.flush()
-        await self.db.refresh(vendor)
+        invalidate_after_commit(self.db, VENDORS)
         return vendor
 
     async def delete_vendor(self, vendor_id: uuid.UUID) -> Vendor:
@@ -81,6 +82,7 @@ class VendorService:
             )
         vendor.status = "inactive"
         await self.db.flush()
+        invalidate_after_commit(self.db, VENDORS)
         return vendor
 
     async def get_vendor_products(self, vendor_id: uuid.UUID) -> list[ProductVendor]:
@@ -110,5 +112,4 @@ class VendorService:
         )
         self.db.add(link)
         await self.db.flush()
-        await self.db.refresh(link)
         return link
@@ -4,6 +4,7 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.database import run_after_commit
 from app.exceptions import BadRequestException, ConflictException, NotFoundException
 from app.inventory.models import StockLevel
 
@@ -16,12 +17,18 @@ from .schemas import (
     ZoneCreate,
     ZoneUpdate,
 )
+from .topology import topology
 
 
 class WarehouseService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    def _invalidate_topology(self) -> None:
+        # Drop the snapshot now and again once the change is visible to other sessions
+        topology.invalidate()
+        run_after_commit(self.db, topology.invalidate)
+
     async def list_warehouses(self) -> list[Warehouse]:
         result = await self.db.execute(select(Warehouse).order_by(Warehouse.name))
         return list(result.scalars().all())
@@ -44,7 +51,7 @@ class WarehouseService:
         warehouse = Warehouse(**data.model_dump())
         self.db.add(warehouse)
         await self.db.flush()
-        return await self.get_warehouse(warehouse.id)
+        return warehouse
 
     async def update_warehouse(self, warehouse_id: uuid.UUID, data: WarehouseUpdate) -> Warehouse:
         result = await self.db.execute(select(Warehouse).where(Warehouse.id == warehouse_id))
@@ -54,32 +61,30 @@ class WarehouseService:
         for key, value in data.model_dump(exclude_unset=True).items():
             setattr(warehouse, key, value)
         await self.db.flush()
-        return await self.get_warehouse(warehouse.id)
+        return warehouse
 
     async def create_zone(self, warehouse_id: uuid.UUID, data: ZoneCreate) -> Zone:
         result = await self.db.execute(select(Warehouse).where(Warehouse.id == warehouse_id))
         if not result.scalar_one_or_none():
             raise NotFoundException("Warehouse not found")
-        zone = Zone(warehouse_id=warehouse_id, **data.model_dump())
+        zone = Zone(warehouse_id=warehouse_id, locations=[], **data.model_dump())
         self.db.add(zone)
         await self.db.flush()
-        result = await self.db.execute(
-            select(Zone).options(selectinload(Zone.locations)).where(Zone.id == zone.id)
-        )
-        return result.scalar_one()
+        self._invalidate_topology()
+        return zone
 
     async def update_zone(self, zone_id: uuid.UUID, data: ZoneUpdate) -> Zone:
-        result = await self.db.execute(select(Zone).where(Zone.id == zone_id))
+        result = await self.db.execute(
+            select(Zone).options(selectinload(Zone.locations)).where(Zone.id == zone_id)
+        )
         zone = result.scalar_one_or_none()
         if not zone:
             raise NotFoundException("Zone not found")
         for key, value in data.model_dump(exclude_unset=True).items():
             setattr(zone, key, value)
         await self.db.flush()
-        result = await self.db.execute(
-            select(Zone).options(selectinload(Zone.locations)).where(Zone.id == zone.id)
-        )
-        return result.scalar_one()
+        self._invalidate_topology()
+        return zone
 
     async def delete_zone(self, zone_id: uuid.UUID) -> None:
         result = await self.db.execute(
@@ -103,6 +108,7 @@ class WarehouseService:
                     "Cannot delete zone: locations within it still have stock"
                 )
         await self.db.delete(zone)
+        self._invalidate_topology()
 
     async def create_location(self, zone_id: uuid.UUID, data: LocationCreate) -> Location:
         result = await self.db.execute(select(Zone).where(Zone.id == zone_id))
@@ -111,7 +117,7 @@ class WarehouseService:
         location = Location(zone_id=zone_id, **data.model_dump())
         self.db.add(location)
         await self.db.flush()
-        await self.db.refresh(location)
+        self._invalidate_topology()
         return location
 
     async def update_location(self, location_id: uuid.UUID, data: LocationUpdate) -> Location:
@@ -122,7 +128,7 @@ class WarehouseService:
         for key, value in data.model_dump(exclude_unset=True).items():
             setattr(location, key, value)
         await self.db.flush()
-        await self.db.refresh(location)
+        self._invalidate_topology()
         return location
 
     async def delete_location(self, location_id: uuid.UUID) -> None:
@@ -143,3 +149,4 @@ class WarehouseService:
                 "Cannot delete location: it still has stock records"
             )
         await self.db.delete(location)
+        self._invalidate_topology()
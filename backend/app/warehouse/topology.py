@@ -0,0 +1,121 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session
+
+from .models import Location, Warehouse, Zone
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class LocationPath:
+    location_id: uuid.UUID
+    location_code: str
+    zone_id: uuid.UUID
+    zone_code: str
+    warehouse_id: uuid.UUID
+    warehouse_code: str
+
+    @property
+    def path(self) -> str:
+        return f"{self.warehouse_code}/{self.zone_code}/{self.location_code}"
+
+
+class WarehouseTopology:
+    """Process-wide snapshot of the location -> zone -> warehouse hierarchy.
+
+    The snapshot is loaded with a single join and reused until a zone/location
+    mutation invalidates it or it outlives ``TOPOLOGY_CACHE_TTL_SECONDS`` (the
+    TTL bounds staleness for mutations made by other worker processes).
+    ``version`` increases on every reload so callers can detect changes.
+
+    Loads run on a short session of their own, so the snapshot only ever
+    holds committed rows and never locations from a caller's transaction
+    that may still roll back.
+    """
+
+    def __init__(self, ttl_seconds: int, sessions: Callable[[], AsyncSession]):
+        self.ttl_seconds = ttl_seconds
+        self.sessions = sessions
+        self.version = 0
+        self._locations: dict[uuid.UUID, LocationPath] = {}
+        self._loaded_at: float | None = None
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at > self.ttl_seconds
+        )
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._loaded_at = None
+
+    async def load(self) -> None:
+        generation = self._generation
+        async with self.sessions() as db:
+            rows = (
+                await db.execute(
+                    select(
+                        Location.id,
+                        Location.code,
+                        Zone.id,
+                        Zone.code,
+                        Warehouse.id,
+                        Warehouse.code,
+                    )
+                    .join(Zone, Zone.id == Location.zone_id)
+                    .join(Warehouse, Warehouse.id == Zone.warehouse_id)
+                )
+            ).all()
+        self._locations = {row[0]: LocationPath(*row) for row in rows}
+        self.version += 1
+        # A mutation that landed while we were reading leaves the snapshot stale
+        if generation == self._generation:
+            self._loaded_at = time.monotonic()
+        logger.info(
+            "Loaded warehouse topology v%d (%d locations)", self.version, len(self._locations)
+        )
+
+    async def ensure_loaded(self) -> None:
+        if not self.is_stale:
+            return
+        async with self._lock:
+            if self.is_stale:
+                await self.load()
+
+    def resolve(self, location_id: uuid.UUID | None) -> LocationPath | None:
+        if location_id is None:
+            return None
+        return self._locations.get(location_id)
+
+    def path(self, location_id: uuid.UUID | None) -> str | None:
+        location = self.resolve(location_id)
+        return location.path if location else None
+
+    def enrich(self, rows: list[dict], key: str = "location_id") -> list[dict]:
+        """Add ``*_code`` and ``*_path`` fields for the location referenced by *key*.
+
+        Rows are updated in place; call ``ensure_loaded`` first.
+        """
+        prefix = key.removesuffix("_id")
+        for row in rows:
+            location = self.resolve(row.get(key))
+            row[f"{prefix}_code"] = location.location_code if location else None
+            row[f"{prefix}_path"] = location.path if location else None
+        return rows
+
+
+topology = WarehouseTopology(settings.TOPOLOGY_CACHE_TTL_SECONDS, async_session)
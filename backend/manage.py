@@ -0,0 +1,94 @@
+"""Maintenance commands.
+
+Usage:
+    python manage.py backfill-movement-rollup [--since YYYY-MM-DD]
+    python manage.py classify-products
+    python manage.py refresh-report-views [--name NAME]
+    python manage.py rebuild-category-tree
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date
+
+import app.main  # noqa: F401  (registers every model with the mapper)
+from app.database import async_session, engine
+from app.inventory.movement_rollup import MovementRollupService
+from app.products.category_tree import CategoryTree
+from app.products.classification import ClassificationService
+from app.reporting.models import REPORT_VIEWS
+from app.reporting.views import refresh_view
+
+logger = logging.getLogger("manage")
+
+
+async def backfill_movement_rollup(args: argparse.Namespace) -> None:
+    async with async_session() as db:
+        rows = await MovementRollupService(db).backfill(args.since)
+        await db.commit()
+    since = args.since.isoformat() if args.since else "the beginning"
+    logger.info("Rebuilt %d daily movement rows from %s", rows, since)
+
+
+async def classify_products(args: argparse.Namespace) -> None:
+    async with async_session() as db:
+        summary = await ClassificationService(db).classify()
+        await db.commit()
+    for entry in summary["classes"]:
+        logger.info("%s%s: %d products", entry["abc_class"], entry["xyz_class"], entry["products"])
+
+
+async def refresh_report_views(args: argparse.Namespace) -> None:
+    for name in [args.name] if args.name else REPORT_VIEWS:
+        async with engine.begin() as conn:
+            refreshed = await refresh_view(conn, REPORT_VIEWS[name])
+        if not refreshed:
+            logger.warning("%s is being refreshed by another process, skipped", name)
+
+
+async def rebuild_category_tree(args: argparse.Namespace) -> None:
+    async with async_session() as db:
+        pairs = await CategoryTree(db).rebuild()
+        await db.commit()
+    logger.info("Rebuilt the category closure with %d pairs", pairs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser(
+        "backfill-movement-rollup", help="Rebuild stock_movement_daily from stock_movements"
+    )
+    backfill.add_argument("--since", type=date.fromisoformat, help="First day to rebuild")
+    backfill.set_defaults(handler=backfill_movement_rollup)
+
+    classify = commands.add_parser(
+        "classify-products", help="Recompute the ABC/XYZ class of every active product"
+    )
+    classify.set_defaults(handler=classify_products)
+
+    refresh = commands.add_parser(
+        "refresh-report-views", help="Refresh the materialized reporting views now"
+    )
+    refresh.add_argument("--name", choices=sorted(REPORT_VIEWS), help="Only refresh this view")
+    refresh.set_defaults(handler=refresh_report_views)
+
+    tree = commands.add_parser(
+        "rebuild-category-tree", help="Recompute product_category_closure from parent_id"
+    )
+    tree.set_defaults(handler=rebuild_category_tree)
+
+    args = parser.parse_args()
+
+    async def run() -> None:
+        try:
+            await args.handler(args)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -7,15 +7,19 @@ from sqlalchemy import text
 from app.database import async_session, engine, Base
 from app.auth.models import User
 from app.auth.service import hash_password
+from app.products.category_tree import CategoryTree
 from app.products.models import Product, ProductCategory
 from app.vendors.models import Vendor
 from app.warehouse.models import Warehouse, Zone, Location
 from app.inventory.models import StockLevel
 
 # Import all models so Base.metadata is complete
-from app.purchasing.models import PurchaseOrder, POLineItem, GoodsReceipt, GoodsReceiptItem  # noqa
-from app.inventory.models import StockMovement, StockAdjustment  # noqa
-from app.products.models import ProductImage, ProductVendor  # noqa
+from app.purchasing.models import PurchaseOrder, POLineItem, GoodsReceipt, GoodsReceiptItem, ProductOnOrder, VendorPerformance  # noqa
+from app.inventory.models import StockMovement, StockMovementDaily, StockAdjustment  # noqa
+from app.products.models import ProductImage, ProductVendor, ProductClassification, ProductCategoryClosure  # noqa
+from app.idempotency.models import IdempotencyKey  # noqa
+from app.exports.models import ExportWatermark  # noqa
+from app.reporting.models import ReportJob  # noqa
 
 
 async def seed():
@@ -45,6 +49,7 @@ async def seed():
         cables = ProductCategory(name="Cables & Adapters")
         session.add_all([electronics, accessories, cables])
         await session.flush()
+        await CategoryTree(session).rebuild()
 
         # --- Products ---
         products = [
@@ -69,6 +74,24 @@ async def seed():
         session.add_all(vendors)
         await session.flush()
 
+        # --- Vendor catalog (POs may only order products linked to the vendor) ---
+        supplied_by = {
+            vendors[0]: products[:5] + [products[7]],
+            vendors[1]: products[:3] + [products[7]],
+            vendors[2]: products[5:7] + [products[2]],
+        }
+        session.add_all([
+            ProductVendor(
+                vendor_id=vendor.id,
+                product_id=product.id,
+                unit_cost=product.cost_price,
+                is_preferred=(vendor is vendors[0] or product in products[5:7]),
+            )
+            for vendor, supplied in supplied_by.items()
+            for product in supplied
+        ])
+        await session.flush()
+
         # --- Warehouse ---
         warehouse = Warehouse(code="WH-MAIN", name="Main Warehouse", address="123 Industrial Ave, City")
         session.add(warehouse)
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 import pytest
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
@@ -8,6 +10,7 @@ from app.database import get_db
 from app.config import settings
 from app.dependencies import get_current_active_user
 from app.auth.models import User
+from app.warehouse.topology import topology
 
 # Using the main test database URL
 engine = create_async_engine(settings.DATABASE_URL, echo=False)
@@ -48,10 +51,25 @@ async def client(db_session: AsyncSession, override_user: User):
     async def override_get_current_active_user():
         return override_user
 
+    # The topology loads on its own session; here it has to see the test's transaction
+    @asynccontextmanager
+    async def topology_session():
+        yield db_session
+
     app.dependency_overrides[get_db] = override_get_db
     app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    sessions, topology.sessions = topology.sessions, topology_session
     
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
         yield c
         
     app.dependency_overrides.clear()
+    topology.sessions = sessions
+    topology.invalidate()
+
+@pytest.fixture
+async def persisted_user(db_session: AsyncSession, override_user: User) -> User:
+    # Stock and purchasing writes reference users.id, so the override user must exist
+    db_session.add(override_user)
+    await db_session.flush()
+    return override_user
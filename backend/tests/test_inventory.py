@@ -0,0 +1,102 @@
+import pytest
+from httpx import AsyncClient
+
+pytestmark = [
+    pytest.mark.asyncio(loop_scope="session"),
+    pytest.mark.usefixtures("persisted_user"),
+]
+
+
+async def _create_stocked_location(client: AsyncClient, suffix: str) -> dict:
+    warehouse = (await client.post(
+        "/api/v1/warehouses", json={"code": f"WH-{suffix}", "name": f"Warehouse {suffix}"}
+    )).json()
+    zone = (await client.post(
+        f"/api/v1/warehouses/{warehouse['id']}/zones", json={"code": "STOR", "name": "Storage"}
+    )).json()
+    location = (await client.post(
+        f"/api/v1/zones/{zone['id']}/locations", json={"code": "A-01-01"}
+    )).json()
+    product = (await client.post(
+        "/api/v1/products", json={"sku": f"INV-{suffix}", "name": f"Inventory {suffix}"}
+    )).json()
+    response = await client.post("/api/v1/inventory/adjustments", json={
+        "product_id": product["id"],
+        "location_id": location["id"],
+        "adjustment_type": "count",
+        "quantity_change": 25,
+        "reason": "Initial count",
+    })
+    assert response.status_code == 201
+    return {"warehouse": warehouse, "zone": zone, "location": location, "product": product}
+
+
+async def test_stock_by_location_is_enriched_and_paginated(client: AsyncClient):
+    setup = await _create_stocked_location(client, "LOC1")
+
+    response = await client.get(
+        "/api/v1/inventory/stock-levels/by-location",
+        params={"warehouse_id": setup["warehouse"]["id"], "limit": 10},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    row = data["items"][0]
+    assert row["warehouse_code"] == "WH-LOC1"
+    assert row["zone_code"] == "STOR"
+    assert row["location_code"] == "A-01-01"
+    assert row["product_sku"] == "INV-LOC1"
+    assert row["quantity_available"] == 25
+
+
+async def test_stock_by_location_rollup(client: AsyncClient):
+    setup = await _create_stocked_location(client, "LOC2")
+
+    response = await client.get(
+        "/api/v1/inventory/stock-levels/by-location",
+        params={"warehouse_id": setup["warehouse"]["id"], "rollup": "true"},
+    )
+    assert response.status_code == 200
+    levels = {row["level"]: row for row in response.json()["items"]}
+    assert levels["warehouse"]["total_on_hand"] == 25
+    assert levels["warehouse"]["zone_id"] is None
+    assert levels["zone"]["zone_code"] == "STOR"
+    assert levels["zone"]["total_on_hand"] == 25
+
+
+async def test_product_stock_includes_location_path(client: AsyncClient):
+    setup = await _create_stocked_location(client, "LOC3")
+
+    response = await client.get(
+        f"/api/v1/inventory/stock-levels/product/{setup['product']['id']}"
+    )
+    assert response.status_code == 200
+    assert response.json()[0]["location_path"] == "WH-LOC3/STOR/A-01-01"
+
+
+async def test_adjustment_retry_with_idempotency_key_is_replayed(client: AsyncClient):
+    setup = await _create_stocked_location(client, "IDEM")
+    payload = {
+        "product_id": setup["product"]["id"],
+        "location_id": setup["location"]["id"],
+        "adjustment_type": "damage",
+        "quantity_change": -5,
+        "reason": "Crushed pallet",
+    }
+    headers = {"Idempotency-Key": "scanner-7-0001"}
+
+    first = await client.post("/api/v1/inventory/adjustments", json=payload, headers=headers)
+    retry = await client.post("/api/v1/inventory/adjustments", json=payload, headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+    stock = (await client.get(
+        f"/api/v1/inventory/stock-levels/product/{setup['product']['id']}"
+    )).json()
+    assert stock[0]["quantity_on_hand"] == 20
+
+    reused = await client.post(
+        "/api/v1/inventory/adjustments", json={**payload, "quantity_change": -6}, headers=headers
+    )
+    assert reused.status_code == 409
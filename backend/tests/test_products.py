@@ -1,6 +1,11 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from httpx import AsyncClient
 
+from app.inventory.models import StockMovement
+
 pytestmark = pytest.mark.asyncio(loop_scope="session")
 
 async def test_create_product(client: AsyncClient):
@@ -36,6 +41,31 @@ async def test_list_products(client: AsyncClient):
     assert len(data["items"]) >= 1
     assert data["total"] >= 1
 
+async def test_list_products_with_sparse_fields(client: AsyncClient):
+    product = (await client.post(
+        "/api/v1/products", json={"sku": "SPARSE-1", "name": "Sparse", "cost_price": 3.5}
+    )).json()
+    await client.post(
+        f"/api/v1/products/{product['id']}/images", json={"url": "https://img/1.png", "sort_order": 1}
+    )
+
+    response = await client.get(
+        "/api/v1/products", params={"search": "SPARSE-1", "fields": "sku,name,status"}
+    )
+    [item] = response.json()["items"]
+    assert item == {"id": product["id"], "sku": "SPARSE-1", "name": "Sparse", "status": "active"}
+
+    response = await client.get(
+        "/api/v1/products",
+        params={"search": "SPARSE-1", "fields": "sku,cost_price", "include": "images"},
+    )
+    [item] = response.json()["items"]
+    assert item["cost_price"] == 3.5
+    assert [image["url"] for image in item["images"]] == ["https://img/1.png"]
+
+    response = await client.get("/api/v1/products", params={"fields": "sku,password"})
+    assert response.status_code == 400
+
 async def test_get_product(client: AsyncClient):
     # Prepare data
     payload = {
@@ -54,3 +84,175 @@ async def test_get_product(client: AsyncClient):
     data = response.json()
     assert data["id"] == product_id
     assert data["sku"] == payload["sku"]
+
+
+async def test_abc_xyz_classification_filters_products(client: AsyncClient, db_session, persisted_user):
+    warehouse = (await client.post("/api/v1/warehouses", json={"code": "WH-ABC", "name": "ABC"})).json()
+    zone = (await client.post(
+        f"/api/v1/warehouses/{warehouse['id']}/zones", json={"code": "STOR", "name": "Storage"}
+    )).json()
+    location = (await client.post(f"/api/v1/zones/{zone['id']}/locations", json={"code": "A-01"})).json()
+    steady, erratic, idle = [
+        (await client.post("/api/v1/products", json={"sku": sku, "name": sku, "cost_price": 10})).json()
+        for sku in ("ABC-STEADY", "ABC-ERRATIC", "ABC-IDLE")
+    ]
+
+    def consumed(product: dict, quantity: int, weeks_ago: int) -> StockMovement:
+        return StockMovement(
+            movement_type="out",
+            product_id=uuid.UUID(product["id"]),
+            from_location_id=uuid.UUID(location["id"]),
+            quantity=quantity,
+            performed_by=persisted_user.id,
+            created_at=datetime.now(timezone.utc) - timedelta(weeks=weeks_ago, days=1),
+        )
+
+    # 10 a week all year (value 5200) vs. 100 in a single week (value 1000)
+    db_session.add_all(consumed(steady, 10, week) for week in range(52))
+    db_session.add(consumed(erratic, 100, 3))
+    await db_session.flush()
+
+    response = await client.post("/api/v1/products/classifications/rebuild")
+    assert response.status_code == 200
+
+    async def skus(**params) -> set[str]:
+        page = (await client.get("/api/v1/products", params={"search": "ABC-", **params})).json()
+        return {p["sku"] for p in page["items"]}
+
+    assert await skus(abc_class="A") == {"ABC-STEADY"}
+    assert await skus(abc_class="B") == {"ABC-ERRATIC"}
+    assert await skus(xyz_class="X") == {"ABC-STEADY"}
+    assert await skus(abc_class="C", xyz_class="Z") == {"ABC-IDLE"}
+
+    stock = (await client.get("/api/v1/inventory/stock-levels?search=ABC-&abc_class=B")).json()
+    [row] = stock["items"]
+    assert (row["product_sku"], row["xyz_class"]) == ("ABC-ERRATIC", "Z")
+
+
+async def test_category_tree_and_subtree_filters(client: AsyncClient):
+    async def category(name: str, parent: dict | None = None) -> dict:
+        response = await client.post(
+            "/api/v1/product-categories",
+            json={"name": name, "parent_id": parent["id"] if parent else None},
+        )
+        assert response.status_code == 201
+        return response.json()
+
+    root = await category("Tree Root")
+    audio = await category("Tree Audio", root)
+    headphones = await category("Tree Headphones", audio)
+    video = await category("Tree Video", root)
+    products = {
+        sku: (await client.post(
+            "/api/v1/products", json={"sku": sku, "name": sku, "category_id": node["id"]}
+        )).json()
+        for sku, node in (("TREE-1", root), ("TREE-2", headphones), ("TREE-3", video))
+    }
+
+    async def skus(node: dict, **params) -> set[str]:
+        response = await client.get(
+            "/api/v1/products",
+            params={"category_id": node["id"], "fields": "sku", "limit": 100, **params},
+        )
+        return {item["sku"] for item in response.json()["items"]}
+
+    assert await skus(root) == {"TREE-1"}
+    assert await skus(root, include_descendants=True) == {"TREE-1", "TREE-2", "TREE-3"}
+    assert await skus(audio, include_descendants=True) == {"TREE-2"}
+
+    tree = (await client.get("/api/v1/product-categories/tree", params={"root_id": root["id"]})).json()
+    assert [node["name"] for node in tree] == ["Tree Root"]
+    assert [child["name"] for child in tree[0]["children"]] == ["Tree Audio", "Tree Video"]
+    assert tree[0]["children"][0]["children"][0]["name"] == "Tree Headphones"
+
+    # Moving a subtree carries its descendants along
+    await client.put(f"/api/v1/product-categories/{audio['id']}", json={"parent_id": video["id"]})
+    assert await skus(video, include_descendants=True) == {"TREE-2", "TREE-3"}
+    response = await client.put(
+        f"/api/v1/product-categories/{root['id']}", json={"parent_id": headphones["id"]}
+    )
+    assert response.status_code == 400
+
+    stock = (await client.get(
+        "/api/v1/inventory/stock-levels",
+        params={"category_id": root["id"], "include_descendants": True, "limit": 100},
+    )).json()
+    assert {item["product_sku"] for item in stock["items"]} == {"TREE-1", "TREE-2", "TREE-3"}
+
+    # Deleting a category makes its children roots
+    await client.put(f"/api/v1/product-categories/{audio['id']}", json={"parent_id": root["id"]})
+    await client.delete(f"/api/v1/products/{products['TREE-1']['id']}")
+    assert (await client.delete(f"/api/v1/product-categories/{root['id']}")).status_code == 204
+    tree = (await client.get("/api/v1/product-categories/tree")).json()
+    roots = {node["name"] for node in tree}
+    assert {"Tree Audio", "Tree Video"} <= roots
+    assert await skus(audio, include_descendants=True) == {"TREE-2"}
+
+
+async def test_import_products_upserts_valid_rows_and_reports_errors(client: AsyncClient):
+    await client.post("/api/v1/product-categories", json={"name": "Import Cat"})
+    await client.post("/api/v1/products", json={
+        "sku": "EXIST-1", "name": "Old", "barcode": "B-OLD", "cost_price": 4, "reorder_point": 7,
+    })
+    catalog = (
+        "sku,name,category,cost_price,barcode,reorder_point\n"
+        "IMP-1,Imported one,Import Cat,2.50,B-1,5\n"
+        "IMP-2,Imported two,,abc,,\n"
+        "IMP-1,Again,,,,\n"
+        "IMP-3,Three,Nope,,,\n"
+        "IMP-4,Four,,1,B-OLD,\n"
+        "EXIST-1,Renamed,,,,\n"
+        ",Nameless,,,,\n"
+        "IMP-5,Five,,,,-1\n"
+    )
+
+    async def upload(content: str, name: str = "catalog.csv", **params) -> dict:
+        response = await client.post(
+            "/api/v1/products/import", params=params, files={"file": (name, content.encode())}
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    preview = await upload(catalog, dry_run=True)
+    assert (preview["rows"], preview["valid"], preview["inserted"]) == (8, 2, 0)
+    listed = (await client.get("/api/v1/products", params={"search": "IMP-1"})).json()
+    assert listed["total"] == 0
+
+    report = await upload(catalog)
+    assert {key: report[key] for key in ("rows", "invalid", "inserted", "updated", "unchanged")} == {
+        "rows": 8, "invalid": 6, "inserted": 1, "updated": 1, "unchanged": 0,
+    }
+    assert [(error["line"], error["error"]) for error in report["errors"]] == [
+        (3, "cost_price is not a valid numeric(12,2)"),
+        (4, "Duplicate SKU, first given on line 2"),
+        (5, "Unknown category 'Nope'"),
+        (6, "Barcode is already used by EXIST-1"),
+        (8, "sku is required"),
+        (9, "reorder_point must not be negative"),
+    ]
+
+    [imported] = (await client.get("/api/v1/products", params={"search": "IMP-1"})).json()["items"]
+    assert (imported["name"], imported["cost_price"], imported["reorder_point"]) == ("Imported one", 2.5, 5)
+    assert imported["status"] == "active"
+    [renamed] = (await client.get("/api/v1/products", params={"search": "EXIST-1"})).json()["items"]
+    # Blank cells leave the stored values alone
+    assert (renamed["name"], renamed["barcode"], renamed["cost_price"], renamed["reorder_point"]) == (
+        "Renamed", "B-OLD", 4, 7,
+    )
+
+    again = await upload(catalog)
+    assert (again["inserted"], again["updated"], again["unchanged"]) == (0, 0, 2)
+
+    lines = '{"sku": "IMP-6", "name": "Six", "weight_kg": 1.25}\n{"sku": \n'
+    report = await upload(lines, name="catalog.ndjson")
+    assert (report["inserted"], report["errors"]) == (1, [{"line": 2, "sku": None, "error": "Invalid JSON"}])
+
+    response = await client.post(
+        "/api/v1/products/import", files={"file": ("c.csv", b"sku,title\nA,B\n")}
+    )
+    assert response.status_code == 400
+    for content in (b"sku,name\nA,\xff\n", b'sku,name\nA,"' + b"x" * 200_000 + b'"\n'):
+        response = await client.post("/api/v1/products/import", files={"file": ("c.csv", content)})
+        assert response.status_code == 400, response.text
+    report = await upload("sku,name\nNUL-1,a\x00b\n")
+    assert report["errors"] == [{"line": 2, "sku": None, "error": "Row contains a NUL character"}]
@@ -0,0 +1,350 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app.reporting.cache import PURCHASING, data_versions
+from tests.conftest import engine
+
+pytestmark = [
+    pytest.mark.asyncio(loop_scope="session"),
+    pytest.mark.usefixtures("persisted_user"),
+]
+
+
+async def _create_vendor_and_product(client: AsyncClient, suffix: str) -> tuple[dict, dict]:
+    vendor = (await client.post(
+        "/api/v1/vendors", json={"code": f"VND-{suffix}", "name": f"Vendor {suffix}"}
+    )).json()
+    product = (await client.post(
+        "/api/v1/products", json={"sku": f"PUR-{suffix}", "name": f"Purchased {suffix}"}
+    )).json()
+    await client.post(
+        f"/api/v1/vendors/{vendor['id']}/products",
+        json={"product_id": product["id"], "unit_cost": 4.75},
+    )
+    return vendor, product
+
+
+async def _create_po(client: AsyncClient, vendor: dict, product: dict, quantity: int = 10) -> dict:
+    response = await client.post("/api/v1/purchase-orders", json={
+        "vendor_id": vendor["id"],
+        "line_items": [
+            {"product_id": product["id"], "quantity_ordered": quantity, "unit_price": 2.5},
+        ],
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+async def test_po_numbers_are_unique_and_sequential(client: AsyncClient):
+    vendor, product = await _create_vendor_and_product(client, "NUM")
+
+    first = await _create_po(client, vendor, product)
+    second = await _create_po(client, vendor, product)
+
+    assert first["po_number"] != second["po_number"]
+    assert first["po_number"][:7] == second["po_number"][:7]
+    assert int(second["po_number"][7:]) > int(first["po_number"][7:])
+
+
+async def test_status_transition_statement_count(client: AsyncClient):
+    vendor, product = await _create_vendor_and_product(client, "TRN")
+    po = await _create_po(client, vendor, product)
+
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _count)
+    try:
+        response = await client.post(f"/api/v1/purchase-orders/{po['id']}/submit")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _count)
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "pending_approval"
+    assert len(response.json()["line_items"]) == 1
+    assert len(statements) <= 2
+
+    response = await client.post(f"/api/v1/purchase-orders/{po['id']}/send")
+    assert response.status_code == 400
+    assert "pending_approval" in response.json()["detail"]
+
+
+async def test_bulk_transition_reports_ineligible_pos(client: AsyncClient):
+    vendor, product = await _create_vendor_and_product(client, "BLK")
+    drafts = [await _create_po(client, vendor, product) for _ in range(2)]
+    sent = await _send_po(client, await _create_po(client, vendor, product))
+    missing = "00000000-0000-0000-0000-000000000000"
+
+    response = await client.post("/api/v1/purchase-orders/bulk-transition", json={
+        "ids": [d["id"] for d in drafts] + [sent["id"], missing],
+        "status": "pending_approval",
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["updated"], body["failed"]) == (2, 2)
+    first, second, ineligible, unknown = body["results"]
+    assert first["success"] and first["previous_status"] == "draft"
+    assert second["status"] == "pending_approval"
+    assert not ineligible["success"]
+    assert ineligible["detail"] == "Cannot transition from 'sent' to 'pending_approval'"
+    assert unknown["detail"] == "Purchase order not found"
+
+    detail = (await client.get(f"/api/v1/purchase-orders/{drafts[0]['id']}")).json()
+    assert detail["status"] == "pending_approval"
+
+
+async def test_po_list_returns_summaries(client: AsyncClient):
+    vendor, product = await _create_vendor_and_product(client, "SUM")
+    po = await _create_po(client, vendor, product, quantity=7)
+
+    page = (await client.get(f"/api/v1/purchase-orders?vendor_id={vendor['id']}")).json()
+    [summary] = page["items"]
+    assert summary["id"] == po["id"]
+    assert summary["vendor_name"] == vendor["name"]
+    assert summary["line_count"] == 1
+    assert summary["quantity_ordered"] == 7
+    assert summary["quantity_received"] == 0
+    assert "line_items" not in summary
+
+    full = (await client.get(f"/api/v1/purchase-orders?vendor_id={vendor['id']}&view=full")).json()
+    assert len(full["items"][0]["line_items"]) == 1
+
+
+async def test_update_po_diffs_line_items(client: AsyncClient):
+    vendor, product = await _create_vendor_and_product(client, "DIFF")
+    _, other = await _create_vendor_and_product(client, "DIFF2")
+    await client.post(f"/api/v1/vendors/{vendor['id']}/products", json={"product_id": other["id"]})
+    po = (await client.post("/api/v1/purchase-orders", json={
+        "vendor_id": vendor["id"],
+        "line_items": [
+            {"product_id": product["id"], "quantity_ordered": 4},
+            {"product_id": other["id"], "quantity_ordered": 1, "unit_price": 10},
+        ],
+    })).json()
+    kept, dropped = po["line_items"]
+    assert kept["unit_price"] == 4.75
+
+    response = await client.put(f"/api/v1/purchase-orders/{po['id']}", json={
+        "line_items": [
+            {"id": kept["id"], "product_id": product["id"], "quantity_ordered": 6},
+            {"product_id": other["id"], "quantity_ordered": 2, "unit_price": 1.5, "sort_order": 1},
+        ],
+    })
+    assert response.status_code == 200
+    lines = response.json()["line_items"]
+    assert lines[0]["id"] == kept["id"]
+    assert lines[0]["quantity_ordered"] == 6
+    assert lines[1]["id"] not in (kept["id"], dropped["id"])
+    assert response.json()["subtotal"] == 6 * 4.75 + 2 * 1.5
+
+    stored = (await client.get(f"/api/v1/purchase-orders/{po['id']}")).json()
+    assert sorted(l["quantity_ordered"] for l in stored["line_items"]) == [2, 6]
+
+
+async def test_create_po_rejects_unlinked_products(client: AsyncClient):
+    vendor, _ = await _create_vendor_and_product(client, "UNL")
+    _, unlinked = await _create_vendor_and_product(client, "UNL2")
+
+    response = await client.post("/api/v1/purchase-orders", json={
+        "vendor_id": vendor["id"],
+        "line_items": [{"product_id": unlinked["id"], "quantity_ordered": 1}],
+    })
+    assert response.status_code == 400
+    assert unlinked["id"] in response.json()["detail"]
+
+
+async def test_replenishment_creates_draft_pos_per_vendor(client: AsyncClient):
+    preferred = (await client.post("/api/v1/vendors", json={"code": "VND-RPA", "name": "Preferred"})).json()
+    cheaper = (await client.post("/api/v1/vendors", json={"code": "VND-RPB", "name": "Cheaper"})).json()
+    product = (await client.post("/api/v1/products", json={
+        "sku": "RPL-1", "name": "Replenished", "reorder_point": 50, "reorder_quantity": 20,
+    })).json()
+    for vendor, cost, is_preferred in ((preferred, 3, True), (cheaper, 2, False)):
+        await client.post(f"/api/v1/vendors/{vendor['id']}/products", json={
+            "product_id": product["id"], "unit_cost": cost, "is_preferred": is_preferred,
+        })
+
+    # Linked to the vendor, but with no vendor cost and no cost price
+    unpriced = (await client.post("/api/v1/products", json={
+        "sku": "RPL-2", "name": "Unpriced", "reorder_point": 5,
+    })).json()
+    await client.post(f"/api/v1/vendors/{preferred['id']}/products", json={
+        "product_id": unpriced["id"], "is_preferred": True,
+    })
+
+    response = await client.post("/api/v1/purchase-orders/replenishment?dry_run=true")
+    assert response.status_code == 200
+    proposal = response.json()
+    [order] = [o for o in proposal["purchase_orders"] if o["vendor_id"] == preferred["id"]]
+    assert order["po_id"] is None
+    assert [line["product_sku"] for line in order["lines"]] == ["RPL-1"]
+    assert order["lines"][0]["quantity"] == 50
+    assert order["lines"][0]["unit_price"] == 3
+    [line] = [l for l in proposal["unpriced"] if l["product_id"] == unpriced["id"]]
+    assert line["unit_price"] is None
+
+    response = await client.post(
+        f"/api/v1/purchase-orders/replenishment?vendor_id={preferred['id']}"
+    )
+    [order] = response.json()["purchase_orders"]
+    po = (await client.get(f"/api/v1/purchase-orders/{order['po_id']}")).json()
+    assert po["status"] == "draft"
+    assert [line["quantity_ordered"] for line in po["line_items"]] == [50]
+
+    # The draft PO now covers the shortfall, so a second run proposes nothing
+    rerun = (await client.post(
+        f"/api/v1/purchase-orders/replenishment?dry_run=true&vendor_id={preferred['id']}"
+    )).json()
+    assert rerun["purchase_orders"] == []
+
+
+async def _create_location(client: AsyncClient, suffix: str) -> dict:
+    warehouse = (await client.post(
+        "/api/v1/warehouses", json={"code": f"WH-{suffix}", "name": f"Warehouse {suffix}"}
+    )).json()
+    zone = (await client.post(
+        f"/api/v1/warehouses/{warehouse['id']}/zones", json={"code": "RECV", "name": "Receiving"}
+    )).json()
+    return (await client.post(
+        f"/api/v1/zones/{zone['id']}/locations", json={"code": "RECV-01"}
+    )).json()
+
+
+async def _send_po(client: AsyncClient, po: dict) -> dict:
+    for action in ("submit", "approve", "send"):
+        response = await client.post(f"/api/v1/purchase-orders/{po['id']}/{action}")
+        assert response.status_code == 200
+    return response.json()
+
+
+async def test_receive_goods_in_batches(client: AsyncClient):
+    vendor, product = await _create_vendor_and_product(client, "GR")
+    location = await _create_location(client, "GR")
+    po = await _send_po(client, await _create_po(client, vendor, product, quantity=10))
+    line = po["line_items"][0]
+
+    receipt_line = {
+        "po_line_item_id": line["id"],
+        "product_id": product["id"],
+        "location_id": location["id"],
+    }
+    response = await client.post(f"/api/v1/purchase-orders/{po['id']}/receive", json={
+        "received_date": "2026-01-15",
+        "items": [{**receipt_line, "quantity_received": 3}, {**receipt_line, "quantity_received": 2}],
+    })
+    assert response.status_code == 201
+    receipt = response.json()
+    assert receipt["receipt_number"].startswith("GR-")
+    assert [i["quantity_received"] for i in receipt["items"]] == [3, 2]
+    assert (await client.get(f"/api/v1/purchase-orders/{po['id']}")).json()["status"] == "partially_received"
+
+    response = await client.post(f"/api/v1/purchase-orders/{po['id']}/receive", json={
+        "received_date": "2026-01-16",
+        "items": [{**receipt_line, "quantity_received": 5}],
+    })
+    assert response.status_code == 201
+
+    updated = (await client.get(f"/api/v1/purchase-orders/{po['id']}")).json()
+    assert updated["status"] == "received"
+    assert updated["line_items"][0]["quantity_received"] == 10
+    stock = (await client.get(f"/api/v1/inventory/stock-levels/product/{product['id']}")).json()
+    assert stock[0]["quantity_on_hand"] == 10
+
+
+async def test_receive_goods_rejects_foreign_line_items(client: AsyncClient):
+    vendor, product = await _create_vendor_and_product(client, "GRX")
+    location = await _create_location(client, "GRX")
+    po = await _send_po(client, await _create_po(client, vendor, product))
+    other = await _create_po(client, vendor, product)
+
+    response = await client.post(f"/api/v1/purchase-orders/{po['id']}/receive", json={
+        "received_date": "2026-01-15",
+        "items": [{
+            "po_line_item_id": other["line_items"][0]["id"],
+            "product_id": product["id"],
+            "location_id": location["id"],
+            "quantity_received": 1,
+        }],
+    })
+    assert response.status_code == 400
+
+
+async def _on_order(client: AsyncClient, product: dict) -> int:
+    page = (await client.get(f"/api/v1/inventory/stock-levels?search={product['sku']}")).json()
+    return page["items"][0]["quantity_on_order"]
+
+
+async def test_on_order_follows_transitions_and_receipts(client: AsyncClient):
+    vendor, product = await _create_vendor_and_product(client, "ONO")
+    location = await _create_location(client, "ONO")
+    po = await _create_po(client, vendor, product, quantity=10)
+    assert await _on_order(client, product) == 0
+
+    po = await _send_po(client, po)
+    assert await _on_order(client, product) == 10
+
+    await client.post(f"/api/v1/purchase-orders/{po['id']}/receive", json={
+        "received_date": "2026-01-15",
+        "items": [{
+            "po_line_item_id": po["line_items"][0]["id"],
+            "product_id": product["id"],
+            "location_id": location["id"],
+            "quantity_received": 4,
+        }],
+    })
+    assert await _on_order(client, product) == 6
+
+    cancelled = await _send_po(client, await _create_po(client, vendor, product, quantity=5))
+    assert await _on_order(client, product) == 11
+    await client.post(f"/api/v1/purchase-orders/{cancelled['id']}/cancel")
+    assert await _on_order(client, product) == 6
+
+    response = await client.post("/api/v1/purchase-orders/on-order/rebuild")
+    assert response.status_code == 200
+    assert await _on_order(client, product) == 6
+
+
+async def test_vendor_performance_rollup_tracks_receipts(client: AsyncClient):
+    vendor, product = await _create_vendor_and_product(client, "PERF")
+    location = await _create_location(client, "PERF")
+    po = (await client.post("/api/v1/purchase-orders", json={
+        "vendor_id": vendor["id"],
+        "order_date": "2026-01-01",
+        "expected_delivery_date": "2026-01-10",
+        "line_items": [{"product_id": product["id"], "quantity_ordered": 10}],
+    })).json()
+    po = await _send_po(client, po)
+    receipt_line = {
+        "po_line_item_id": po["line_items"][0]["id"],
+        "product_id": product["id"],
+        "location_id": location["id"],
+    }
+    for received_date, quantity in (("2026-01-05", 4), ("2026-01-15", 4)):
+        await client.post(f"/api/v1/purchase-orders/{po['id']}/receive", json={
+            "received_date": received_date,
+            "items": [{**receipt_line, "quantity_received": quantity}],
+        })
+    cancelled = await _send_po(client, await _create_po(client, vendor, product))
+    await client.post(f"/api/v1/purchase-orders/{cancelled['id']}/cancel")
+
+    async def scorecard() -> dict:
+        data_versions.bump(PURCHASING)
+        rows = (await client.get("/api/v1/reports/vendor-performance")).json()
+        return next(r for r in rows if r["vendor_id"] == vendor["id"])
+
+    expected = {
+        "order_count": 1,
+        "total_spend": 47.5,
+        "receipt_count": 2,
+        "avg_lead_time": 9.0,
+        "on_time_rate": 0.5,
+        "fill_rate": 0.8,
+    }
+    assert {k: v for k, v in (await scorecard()).items() if k in expected} == expected
+
+    response = await client.post("/api/v1/purchase-orders/vendor-performance/rebuild")
+    assert response.status_code == 200
+    assert {k: v for k, v in (await scorecard()).items() if k in expected} == expected
@@ -0,0 +1,298 @@
+import base64
+import json
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.database import engine
+from app.inventory.models import StockMovement
+from app.inventory.movement_rollup import MovementRollupService
+from app.reporting.cache import PRODUCTS, STOCK, data_versions, report_cache
+from app.reporting.jobs import ReportJobRunner
+from app.reporting.kpis import kpi_cache
+
+pytestmark = [
+    pytest.mark.asyncio(loop_scope="session"),
+    pytest.mark.usefixtures("persisted_user"),
+]
+
+
+async def _adjust(client: AsyncClient, product: dict, location: dict, quantity: int) -> None:
+    response = await client.post("/api/v1/inventory/adjustments", json={
+        "product_id": product["id"],
+        "location_id": location["id"],
+        "adjustment_type": "count",
+        "quantity_change": quantity,
+        "reason": "Cycle count",
+    })
+    assert response.status_code == 201
+
+
+async def test_dashboard_kpis_are_cached_until_stock_changes(client: AsyncClient):
+    kpi_cache.clear()
+    warehouse = (await client.post("/api/v1/warehouses", json={"code": "WH-KPI", "name": "KPI"})).json()
+    zone = (await client.post(
+        f"/api/v1/warehouses/{warehouse['id']}/zones", json={"code": "STOR", "name": "Storage"}
+    )).json()
+    location = (await client.post(f"/api/v1/zones/{zone['id']}/locations", json={"code": "K-01"})).json()
+    product = (await client.post(
+        "/api/v1/products", json={"sku": "KPI-1", "name": "Valued", "cost_price": 2}
+    )).json()
+
+    before = (await client.get("/api/v1/dashboard/kpis")).json()
+    assert set(before) == {"total_stock_value", "pending_po_count", "low_stock_count", "movements_today"}
+
+    await _adjust(client, product, location, 10)
+    # The test transaction never commits, so nothing has invalidated the cache yet
+    assert (await client.get("/api/v1/dashboard/kpis")).json() == before
+
+    data_versions.bump(STOCK)
+    after = (await client.get("/api/v1/dashboard/kpis")).json()
+    assert after["total_stock_value"] == before["total_stock_value"] + 20
+    assert after["movements_today"] == before["movements_today"] + 1
+    assert after["pending_po_count"] == before["pending_po_count"]
+
+
+async def test_report_cache_serves_repeat_calls_and_tracks_stats(client: AsyncClient):
+    report_cache.clear()
+    before = report_cache.stats()["reports"].get("stock_summary", {"hits": 0, "misses": 0})
+
+    async def views() -> dict:
+        return {view["name"]: view for view in (await client.get("/api/v1/reports/views")).json()}
+
+    # Refresh state is committed outside the test transaction, so compare with what was there
+    untouched = (await views())["report_purchase_history"]["refreshed_at"]
+    await client.post("/api/v1/products", json={"sku": "RPC-1", "name": "Cached"})
+    # The report reads a materialized view, which only sees the product once refreshed
+    refresh = await client.post("/api/v1/reports/views/report_stock_summary/refresh")
+    assert refresh.json() == {"name": "report_stock_summary", "refreshed": True}
+
+    response = await client.get("/api/v1/reports/stock-summary")
+    assert "x-report-refreshed-at" in response.headers
+    first = response.json()
+    second = (await client.get("/api/v1/reports/stock-summary")).json()
+    assert second == first
+    assert "RPC-1" in {row["sku"] for row in first}
+
+    data_versions.bump(PRODUCTS)
+    await client.get("/api/v1/reports/stock-summary")
+
+    after = await views()
+    assert after["report_stock_summary"]["refreshed_at"] is not None
+    assert after["report_purchase_history"]["refreshed_at"] == untouched
+
+    stats = (await client.get("/api/v1/reports/cache-stats")).json()["reports"]["stock_summary"]
+    assert stats["hits"] - before["hits"] == 1
+    assert stats["misses"] - before["misses"] == 2
+    assert stats["avg_refresh_ms"] is not None
+
+
+async def test_reports_stream_as_csv_and_ndjson(client: AsyncClient):
+    response = await client.get("/api/v1/reports/stock-summary?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="stock-summary.csv"' in response.headers["content-disposition"]
+    header = response.text.splitlines()[0]
+    assert header == "product_id,sku,name,total_on_hand,total_reserved,total_available,cost_price,stock_value"
+
+    response = await client.get("/api/v1/reports/purchase-history?days=30&format=ndjson")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    for line in response.text.splitlines():
+        assert json.loads(line).keys() >= {"po_number", "vendor_code"}
+
+    response = await client.get("/api/v1/reports/stock-summary?format=xml")
+    assert response.status_code == 422
+
+
+async def test_movement_series_reads_daily_rollup(client: AsyncClient, db_session):
+    warehouse = (await client.post("/api/v1/warehouses", json={"code": "WH-SER", "name": "Series"})).json()
+    zone = (await client.post(
+        f"/api/v1/warehouses/{warehouse['id']}/zones", json={"code": "STOR", "name": "Storage"}
+    )).json()
+    first, second = [
+        (await client.post(f"/api/v1/zones/{zone['id']}/locations", json={"code": code})).json()
+        for code in ("S-01", "S-02")
+    ]
+    product = (await client.post("/api/v1/products", json={"sku": "SER-1", "name": "Charted"})).json()
+    await _adjust(client, product, first, 10)
+    await _adjust(client, product, first, -3)
+    await client.post("/api/v1/inventory/transfers", json={
+        "product_id": product["id"],
+        "from_location_id": first["id"],
+        "to_location_id": second["id"],
+        "quantity": 2,
+    })
+
+    async def today(**params) -> dict:
+        data_versions.bump(STOCK)
+        body = (await client.get(
+            "/api/v1/reports/movement-series", params={"days": 7, "product_id": product["id"], **params}
+        )).json()
+        [series] = body["series"]
+        assert len(series["quantity_in"]) == 7
+        return {key: series[key][-1] for key in ("quantity_in", "quantity_out", "location_movements")}
+
+    # Three ledger movements; the transfer is out of S-01 and into S-02, so it touches both
+    assert await today() == {"quantity_in": 12, "quantity_out": 5, "location_movements": 4}
+    assert await today(location_id=second["id"]) == {
+        "quantity_in": 2, "quantity_out": 0, "location_movements": 1,
+    }
+
+    await MovementRollupService(db_session).backfill()
+    assert await today() == {"quantity_in": 12, "quantity_out": 5, "location_movements": 4}
+
+
+async def test_demand_forecast_recommends_and_applies_reorder_points(
+    client: AsyncClient, db_session, persisted_user
+):
+    warehouse = (await client.post("/api/v1/warehouses", json={"code": "WH-FC", "name": "Forecast"})).json()
+    zone = (await client.post(
+        f"/api/v1/warehouses/{warehouse['id']}/zones", json={"code": "STOR", "name": "Storage"}
+    )).json()
+    location = (await client.post(f"/api/v1/zones/{zone['id']}/locations", json={"code": "F-01"})).json()
+    vendor = (await client.post(
+        "/api/v1/vendors", json={"code": "VND-FC", "name": "Forecast", "lead_time_days": 4}
+    )).json()
+    product = (await client.post("/api/v1/products", json={"sku": "FC-1", "name": "Forecast"})).json()
+    await client.post(f"/api/v1/vendors/{vendor['id']}/products", json={"product_id": product["id"]})
+
+    # Steady demand of 5 a day for the last 90 days
+    today = datetime.now(timezone.utc).replace(hour=12)
+    db_session.add_all(
+        StockMovement(
+            movement_type="adjustment",
+            product_id=uuid.UUID(product["id"]),
+            from_location_id=uuid.UUID(location["id"]),
+            quantity=5,
+            performed_by=persisted_user.id,
+            created_at=today - timedelta(days=day),
+        )
+        for day in range(1, 91)
+    )
+    await db_session.flush()
+
+    data_versions.bump(STOCK)
+    page = (await client.get("/api/v1/reports/demand-forecast?limit=1000")).json()
+    [rec] = [r for r in page["items"] if r["product_id"] == product["id"]]
+    assert rec["daily_demand"] == pytest.approx(5, abs=0.01)
+    assert rec["lead_time_days"] == 4
+    # 4 days of 5 a day, plus a unit of safety stock for the zero days before the history
+    assert (rec["safety_stock"], rec["recommended_reorder_point"]) == (1, 21)
+    assert rec["recommended_reorder_quantity"] == 150
+
+    response = await client.post(
+        "/api/v1/reports/demand-forecast/apply", json={"product_ids": [product["id"]]}
+    )
+    assert response.json() == {"updated": 1}
+    updated = (await client.get(f"/api/v1/products/{product['id']}")).json()
+    assert (updated["reorder_point"], updated["reorder_quantity"]) == (21, 150)
+
+
+async def test_stock_turnover_flags_dead_stock_and_pages_by_keyset(client: AsyncClient):
+    warehouse = (await client.post("/api/v1/warehouses", json={"code": "WH-TO", "name": "Turnover"})).json()
+    zone = (await client.post(
+        f"/api/v1/warehouses/{warehouse['id']}/zones", json={"code": "STOR", "name": "Storage"}
+    )).json()
+    location = (await client.post(f"/api/v1/zones/{zone['id']}/locations", json={"code": "T-01"})).json()
+    moving, idle, empty = [
+        (await client.post("/api/v1/products", json={"sku": sku, "name": sku, "cost_price": 2})).json()
+        for sku in ("TO-MOVING", "TO-IDLE", "TO-EMPTY")
+    ]
+    await _adjust(client, moving, location, 100)
+    await _adjust(client, moving, location, -30)
+    await _adjust(client, idle, location, 10)
+
+    rows, cursor, issued = {}, None, []
+    params = {"period_days": 30, "sort": "days_of_supply", "order": "asc", "limit": 1}
+    while True:
+        page = (
+            await client.get("/api/v1/reports/stock-turnover", params={**params, "cursor": cursor})
+        ).json()
+        rows.update((row["sku"], row) for row in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+        issued.append(cursor)
+    skus = [sku for sku in rows if sku.startswith("TO-")]
+    # Ascending days of supply: nothing on hand, then 70 days, then never used up
+    assert skus == ["TO-EMPTY", "TO-MOVING", "TO-IDLE"]
+
+    assert rows["TO-MOVING"]["days_of_supply"] == 70
+    # 30 used against an average of (70 + 0) / 2 on hand
+    assert rows["TO-MOVING"]["turnover"] == pytest.approx(30 / 35, abs=0.001)
+    assert rows["TO-MOVING"]["dead_stock"] is False
+    assert rows["TO-IDLE"]["days_of_supply"] is None
+    assert rows["TO-IDLE"]["dead_stock"] is True
+    assert rows["TO-EMPTY"]["dead_stock"] is False
+
+    dead = (await client.get("/api/v1/reports/stock-turnover?dead_only=true")).json()
+    assert {row["sku"] for row in dead["items"]} >= {"TO-IDLE"}
+    assert all(row["dead_stock"] for row in dead["items"])
+
+    response = await client.get("/api/v1/reports/stock-turnover?cursor=not-a-cursor")
+    assert response.status_code == 400
+    # Cursors only continue the listing they came from
+    response = await client.get(
+        "/api/v1/reports/stock-turnover", params={**params, "order": "desc", "cursor": issued[0]}
+    )
+    assert response.status_code == 400
+    assert "different sort" in response.json()["detail"]
+    scope = ["days_of_supply", False, 30, 90, False]
+    forged = base64.urlsafe_b64encode(json.dumps([scope, {}, moving["id"]]).encode()).decode()
+    response = await client.get("/api/v1/reports/stock-turnover", params={**params, "cursor": forged})
+    assert (response.status_code, response.json()["detail"]) == (400, "Invalid cursor")
+
+
+async def test_report_jobs_run_in_background_and_download(
+    client: AsyncClient, db_session, persisted_user, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(settings, "REPORT_JOB_DIR", str(tmp_path))
+    warehouse = (await client.post("/api/v1/warehouses", json={"code": "WH-JOB", "name": "Jobs"})).json()
+    zone = (await client.post(
+        f"/api/v1/warehouses/{warehouse['id']}/zones", json={"code": "STOR", "name": "Storage"}
+    )).json()
+    location = (await client.post(f"/api/v1/zones/{zone['id']}/locations", json={"code": "J-01"})).json()
+    product = (await client.post("/api/v1/products", json={"sku": "JOB-1", "name": "Queued"})).json()
+    await _adjust(client, product, location, 12)
+
+    response = await client.post("/api/v1/reports/jobs", json={"report": "nope"})
+    assert response.status_code == 404
+    response = await client.post(
+        "/api/v1/reports/jobs", json={"report": "stock_turnover", "params": {"period_days": 0}}
+    )
+    assert response.status_code == 400
+
+    job = (await client.post("/api/v1/reports/jobs", json={
+        "report": "stock_turnover", "format": "csv", "params": {"period_days": 30},
+    })).json()
+    assert job["status"] == "queued"
+    assert job["params"]["period_days"] == 30
+    response = await client.get(f"/api/v1/reports/jobs/{job['id']}/download")
+    assert response.status_code == 409
+
+    # Stand in for a pool worker, on the test's transaction
+    @asynccontextmanager
+    async def sessions():
+        yield db_session
+
+    await ReportJobRunner(sessions, engine).run(uuid.UUID(job["id"]))
+
+    finished = (await client.get(f"/api/v1/reports/jobs/{job['id']}")).json()
+    assert finished["status"] == "succeeded", finished["error"]
+    assert finished["progress"] == 1.0
+    assert finished["rows_written"] == finished["rows_total"] > 0
+    listed = (await client.get("/api/v1/reports/jobs")).json()
+    assert job["id"] in {item["id"] for item in listed["items"]}
+
+    response = await client.get(f"/api/v1/reports/jobs/{job['id']}/download")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.splitlines()
+    assert lines[0].startswith("product_id,sku,name,on_hand")
+    assert len(lines) == finished["rows_written"] + 1
+    assert any(",JOB-1,Queued,12," in line for line in lines)
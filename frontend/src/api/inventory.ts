@@ -1,12 +1,15 @@
 import client from './client';
-import type { AggregatedStock, ReorderAlert, StockAdjustmentCreate, StockMovement, StockTransferCreate } from '../types/inventory';
+import type { AggregatedStock, ReorderAlert, StockAdjustmentCreate, StockLocation, StockLocationRollup, StockMovement, StockTransferCreate } from '../types/inventory';
 import type { PaginatedResponse } from '../types/common';
 
 export const getStockLevels = (params?: Record<string, string | number | undefined>): Promise<PaginatedResponse<AggregatedStock>> =>
   client.get('/inventory/stock-levels', { params }).then((r) => r.data);
 
-export const getStockByLocation = (productId?: string) =>
-  client.get('/inventory/stock-levels/by-location', { params: { product_id: productId } }).then((r) => r.data);
+export const getStockByLocation = (params?: Record<string, string | number | undefined>): Promise<PaginatedResponse<StockLocation>> =>
+  client.get('/inventory/stock-levels/by-location', { params }).then((r) => r.data);
+
+export const getStockLocationRollup = (params?: Record<string, string | number | undefined>): Promise<{ items: StockLocationRollup[]; total: number }> =>
+  client.get('/inventory/stock-levels/by-location', { params: { ...params, rollup: true } }).then((r) => r.data);
 
 export const getProductStock = (productId: string) =>
   client.get(`/inventory/stock-levels/product/${productId}`).then((r) => r.data);
@@ -1,10 +1,20 @@
 import client from './client';
-import type { Product, ProductCreate, ProductCategory } from '../types/product';
+import type { CatalogImportResult, CategoryTreeNode, Product, ProductCreate, ProductCategory } from '../types/product';
 import type { PaginatedResponse } from '../types/common';
 
 export const getProducts = (params?: Record<string, string | number | undefined>): Promise<PaginatedResponse<Product>> =>
   client.get('/products', { params }).then((r) => r.data);
 
+// Slim rows for pickers: the API selects only these columns and skips images
+export type ProductOption = Pick<Product, 'id' | 'sku' | 'name' | 'status' | 'cost_price'>;
+
+export const getProductOptions = (
+  params?: Record<string, string | number | undefined>,
+): Promise<PaginatedResponse<ProductOption>> =>
+  client
+    .get('/products', { params: { ...params, fields: 'sku,name,status,cost_price' } })
+    .then((r) => r.data);
+
 export const getProduct = (id: string): Promise<Product> =>
   client.get(`/products/${id}`).then((r) => r.data);
 
@@ -17,9 +27,21 @@ export const updateProduct = (id: string, data: Partial<ProductCreate>): Promise
 export const deleteProduct = (id: string): Promise<Product> =>
   client.delete(`/products/${id}`).then((r) => r.data);
 
+// The format follows the file extension (.csv or .ndjson)
+export const importProducts = (file: File, dryRun = false): Promise<CatalogImportResult> => {
+  const form = new FormData();
+  form.append('file', file);
+  return client
+    .post('/products/import', form, { params: { dry_run: dryRun } })
+    .then((r) => r.data);
+};
+
 export const getCategories = (): Promise<ProductCategory[]> =>
   client.get('/product-categories').then((r) => r.data);
 
+export const getCategoryTree = (rootId?: string): Promise<CategoryTreeNode[]> =>
+  client.get('/product-categories/tree', { params: { root_id: rootId } }).then((r) => r.data);
+
 export const createCategory = (data: { name: string; parent_id?: string }): Promise<ProductCategory> =>
   client.post('/product-categories', data).then((r) => r.data);
 
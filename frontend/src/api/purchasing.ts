@@ -1,8 +1,8 @@
 import client from './client';
-import type { PurchaseOrder, PurchaseOrderCreate, GoodsReceipt } from '../types/purchasing';
+import type { PurchaseOrder, PurchaseOrderCreate, PurchaseOrderSummary, GoodsReceipt, POBulkTransitionResponse, ReplenishmentResult } from '../types/purchasing';
 import type { PaginatedResponse } from '../types/common';
 
-export const getPurchaseOrders = (params?: Record<string, string | number | undefined>): Promise<PaginatedResponse<PurchaseOrder>> =>
+export const getPurchaseOrders = (params?: Record<string, string | number | undefined>): Promise<PaginatedResponse<PurchaseOrderSummary>> =>
   client.get('/purchase-orders', { params }).then((r) => r.data);
 
 export const getPurchaseOrder = (id: string): Promise<PurchaseOrder> =>
@@ -26,5 +26,11 @@ export const sendPO = (id: string): Promise<PurchaseOrder> =>
 export const cancelPO = (id: string): Promise<PurchaseOrder> =>
   client.post(`/purchase-orders/${id}/cancel`).then((r) => r.data);
 
+export const bulkTransitionPOs = (ids: string[], status: string): Promise<POBulkTransitionResponse> =>
+  client.post('/purchase-orders/bulk-transition', { ids, status }).then((r) => r.data);
+
 export const receiveGoods = (poId: string, data: { received_date: string; notes?: string; items: { po_line_item_id: string; product_id: string; quantity_received: number; location_id: string }[] }): Promise<GoodsReceipt> =>
   client.post(`/purchase-orders/${poId}/receive`, data).then((r) => r.data);
+
+export const runReplenishment = (params?: { dry_run?: boolean; vendor_id?: string }): Promise<ReplenishmentResult> =>
+  client.post('/purchase-orders/replenishment', null, { params }).then((r) => r.data);
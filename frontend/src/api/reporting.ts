@@ -14,3 +14,89 @@ export const getPurchaseHistory = (days = 90) =>
 
 export const getVendorPerformance = () =>
   client.get('/reports/vendor-performance').then((r) => r.data);
+
+export type ReportExportFormat = 'csv' | 'ndjson';
+
+export const exportStockSummary = (format: ReportExportFormat = 'csv') =>
+  client
+    .get('/reports/stock-summary', { params: { format }, responseType: 'blob' })
+    .then((r) => r.data as Blob);
+
+export const exportPurchaseHistory = (days = 90, format: ReportExportFormat = 'csv') =>
+  client
+    .get('/reports/purchase-history', { params: { days, format }, responseType: 'blob' })
+    .then((r) => r.data as Blob);
+
+export interface MovementSeriesParams {
+  days?: number;
+  product_id?: string[];
+  warehouse_id?: string;
+  location_id?: string;
+}
+
+export const getMovementSeries = (params: MovementSeriesParams = {}) =>
+  client
+    .get('/reports/movement-series', { params, paramsSerializer: { indexes: null } })
+    .then((r) => r.data);
+
+export const getDemandForecast = (params: { skip?: number; limit?: number } = {}) =>
+  client.get('/reports/demand-forecast', { params }).then((r) => r.data);
+
+export const applyDemandForecast = (productIds?: string[]) =>
+  client
+    .post('/reports/demand-forecast/apply', { product_ids: productIds ?? null })
+    .then((r) => r.data as { updated: number });
+
+export interface StockTurnoverParams {
+  period_days?: number;
+  dead_after_days?: number;
+  sort?: 'days_of_supply' | 'turnover' | 'stock_value' | 'on_hand' | 'last_outbound_at' | 'sku';
+  order?: 'asc' | 'desc';
+  dead_only?: boolean;
+  cursor?: string;
+  limit?: number;
+}
+
+export const getStockTurnover = (params: StockTurnoverParams = {}) =>
+  client.get('/reports/stock-turnover', { params }).then((r) => r.data);
+
+export interface ReportJob {
+  id: string;
+  report: 'stock_summary' | 'purchase_history' | 'stock_turnover' | 'demand_forecast';
+  format: 'csv' | 'ndjson';
+  params: Record<string, unknown>;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  rows_written: number;
+  rows_total: number | null;
+  progress: number | null;
+  result_bytes: number | null;
+  error: string | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+}
+
+export const createReportJob = (
+  report: ReportJob['report'],
+  format: ReportJob['format'] = 'csv',
+  params: Record<string, unknown> = {},
+) => client.post('/reports/jobs', { report, format, params }).then((r) => r.data as ReportJob);
+
+export const getReportJob = (id: string) =>
+  client.get(`/reports/jobs/${id}`).then((r) => r.data as ReportJob);
+
+export const downloadReportJob = (id: string) =>
+  client.get(`/reports/jobs/${id}/download`, { responseType: 'blob' }).then((r) => r.data as Blob);
+
+export interface ReportView {
+  name: string;
+  refreshed_at: string | null;
+  refresh_ms: number | null;
+  pending_changes: number | null;
+}
+
+export const getReportViews = () =>
+  client.get('/reports/views').then((r) => r.data as ReportView[]);
+
+export const refreshReportView = (name: string) =>
+  client.post(`/reports/views/${name}/refresh`).then((r) => r.data as { name: string; refreshed: boolean });
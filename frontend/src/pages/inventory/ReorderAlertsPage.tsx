@@ -18,6 +18,7 @@ const ReorderAlertsPage: React.FC = () => {
     { title: 'SKU', dataIndex: 'product_sku', key: 'sku' },
     { title: 'Product', dataIndex: 'product_name', key: 'name' },
     { title: 'On Hand', dataIndex: 'total_on_hand', key: 'on_hand' },
+    { title: 'On Order', dataIndex: 'quantity_on_order', key: 'on_order' },
     { title: 'Reorder Point', dataIndex: 'reorder_point', key: 'rp' },
     { title: 'Reorder Qty', dataIndex: 'reorder_quantity', key: 'rq' },
     { title: 'Deficit', dataIndex: 'deficit', key: 'deficit', render: (v: number) => <Tag color="red">-{v}</Tag> },
@@ -2,11 +2,10 @@ import React, { useEffect, useState, useCallback } from 'react';
 import { Form, Select, InputNumber, Input, Button, Card, Row, Col, message, Table, Tag } from 'antd';
 import PageHeader from '../../components/PageHeader';
 import { createAdjustment, getAdjustments } from '../../api/inventory';
-import { getProducts } from '../../api/products';
+import { getProductOptions, type ProductOption } from '../../api/products';
 import { getWarehouses, getWarehouse } from '../../api/warehouse';
 import { ADJUSTMENT_TYPES } from '../../utils/constants';
 import { formatDateTime, extractErrorMessage } from '../../utils/formatters';
-import type { Product } from '../../types/product';
 import type { StockAdjustmentCreate } from '../../types/inventory';
 
 interface LocationOption {
@@ -25,7 +24,7 @@ interface AdjustmentRecord {
 
 const StockAdjustmentPage: React.FC = () => {
   const [form] = Form.useForm();
-  const [products, setProducts] = useState<Product[]>([]);
+  const [products, setProducts] = useState<ProductOption[]>([]);
   const [locations, setLocations] = useState<LocationOption[]>([]);
   const [adjustments, setAdjustments] = useState<AdjustmentRecord[]>([]);
   const [submitting, setSubmitting] = useState(false);
@@ -33,7 +32,7 @@ const StockAdjustmentPage: React.FC = () => {
   const loadData = useCallback(async () => {
     try {
       const [prods, whs, adjRes] = await Promise.all([
-        getProducts({ limit: 100 }),
+        getProductOptions({ limit: 100 }),
         getWarehouses(),
         getAdjustments({ limit: 20 }),
       ]);
@@ -35,6 +35,7 @@ const StockLevelsPage: React.FC = () => {
     { title: 'On Hand', dataIndex: 'total_on_hand', key: 'on_hand', render: formatNumber },
     { title: 'Reserved', dataIndex: 'total_reserved', key: 'reserved', render: formatNumber },
     { title: 'Available', dataIndex: 'total_available', key: 'available', render: formatNumber },
+    { title: 'On Order', dataIndex: 'quantity_on_order', key: 'on_order', render: formatNumber },
     {
       title: 'Status', key: 'status',
       render: (_: unknown, r: AggregatedStock) => {
@@ -6,12 +6,11 @@ import dayjs from 'dayjs';
 import PageHeader from '../../components/PageHeader';
 import { createPurchaseOrder, getPurchaseOrder, updatePurchaseOrder, submitPO, approvePO, sendPO, cancelPO } from '../../api/purchasing';
 import { getVendors } from '../../api/vendors';
-import { getProducts } from '../../api/products';
+import { getProductOptions, type ProductOption } from '../../api/products';
 import { PO_STATUS_COLORS, PO_STATUS_LABELS } from '../../utils/constants';
 import { formatCurrency, extractErrorMessage } from '../../utils/formatters';
 import type { PurchaseOrder, POLineItemCreate } from '../../types/purchasing';
 import type { Vendor } from '../../types/vendor';
-import type { Product } from '../../types/product';
 
 interface LineItemWithKey extends POLineItemCreate {
   key: number;
@@ -31,7 +30,7 @@ const PurchaseOrderFormPage: React.FC = () => {
   const [form] = Form.useForm();
   const [po, setPo] = useState<PurchaseOrder | null>(null);
   const [vendors, setVendors] = useState<Vendor[]>([]);
-  const [products, setProducts] = useState<Product[]>([]);
+  const [products, setProducts] = useState<ProductOption[]>([]);
   const [lineItems, setLineItems] = useState<LineItemWithKey[]>([]);
   const [loading, setLoading] = useState(false);
   const [submitting, setSubmitting] = useState(false);
@@ -43,7 +42,7 @@ const PurchaseOrderFormPage: React.FC = () => {
     try {
       const [vendorRes, productRes] = await Promise.all([
         getVendors({ limit: 100 }),
-        getProducts({ limit: 100 }),
+        getProductOptions({ limit: 100 }),
       ]);
       setVendors(vendorRes.items);
       setProducts(productRes.items);
@@ -68,6 +67,7 @@ const PurchaseOrderFormPage: React.FC = () => {
         });
         setLineItems(p.line_items.map((li, i) => ({
           key: i,
+          id: li.id,
           product_id: li.product_id,
           quantity_ordered: li.quantity_ordered,
           unit_price: li.unit_price,
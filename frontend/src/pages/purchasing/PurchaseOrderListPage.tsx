@@ -4,13 +4,13 @@ import { PlusOutlined } from '@ant-design/icons';
 import { useNavigate } from 'react-router-dom';
 import PageHeader from '../../components/PageHeader';
 import { getPurchaseOrders } from '../../api/purchasing';
-import type { PurchaseOrder } from '../../types/purchasing';
+import type { PurchaseOrderSummary } from '../../types/purchasing';
 import { PO_STATUS_COLORS, PO_STATUS_LABELS } from '../../utils/constants';
 import { formatCurrency, formatDate } from '../../utils/formatters';
 
 const PurchaseOrderListPage: React.FC = () => {
   const navigate = useNavigate();
-  const [orders, setOrders] = useState<PurchaseOrder[]>([]);
+  const [orders, setOrders] = useState<PurchaseOrderSummary[]>([]);
   const [total, setTotal] = useState(0);
   const [loading, setLoading] = useState(false);
   const [status, setStatus] = useState<string | undefined>();
@@ -33,13 +33,15 @@ const PurchaseOrderListPage: React.FC = () => {
   useEffect(() => { load(); }, [load]);
 
   const columns = [
-    { title: 'PO Number', dataIndex: 'po_number', key: 'po_number', render: (v: string, r: PurchaseOrder) => <a onClick={() => navigate(`/purchase-orders/${r.id}`)}>{v}</a> },
+    { title: 'PO Number', dataIndex: 'po_number', key: 'po_number', render: (v: string, r: PurchaseOrderSummary) => <a onClick={() => navigate(`/purchase-orders/${r.id}`)}>{v}</a> },
+    { title: 'Vendor', dataIndex: 'vendor_name', key: 'vendor_name' },
     { title: 'Status', dataIndex: 'status', key: 'status', render: (s: string) => <Tag color={PO_STATUS_COLORS[s]}>{PO_STATUS_LABELS[s] || s}</Tag> },
     { title: 'Order Date', dataIndex: 'order_date', key: 'order_date', render: formatDate },
     { title: 'Expected Delivery', dataIndex: 'expected_delivery_date', key: 'expected_delivery_date', render: formatDate },
     { title: 'Subtotal', dataIndex: 'subtotal', key: 'subtotal', render: formatCurrency },
     { title: 'Total', dataIndex: 'total_amount', key: 'total_amount', render: formatCurrency },
-    { title: 'Items', key: 'items', render: (_: unknown, r: PurchaseOrder) => r.line_items?.length || 0 },
+    { title: 'Items', dataIndex: 'line_count', key: 'line_count' },
+    { title: 'Received', key: 'received', render: (_: unknown, r: PurchaseOrderSummary) => `${r.quantity_received} / ${r.quantity_ordered}` },
     { title: 'Created', dataIndex: 'created_at', key: 'created_at', render: formatDate },
   ];
 
@@ -34,9 +34,15 @@ interface VendorPerformanceItem {
   rating: number | null;
   order_count: number;
   total_spend: number;
+  receipt_count: number;
+  planned_lead_time: number;
   avg_lead_time: number | null;
+  on_time_rate: number | null;
+  fill_rate: number | null;
 }
 
+const formatRate = (v: number | null) => (v != null ? `${Math.round(v * 100)}%` : '-');
+
 const ReportsPage: React.FC = () => {
   const [stockData, setStockData] = useState<StockSummaryItem[]>([]);
   const [purchaseData, setPurchaseData] = useState<PurchaseHistoryItem[]>([]);
@@ -81,7 +87,9 @@ const ReportsPage: React.FC = () => {
     { title: 'Rating', dataIndex: 'rating', key: 'rating', render: (r: number | null) => r != null ? <Rate disabled value={r} allowHalf style={{ fontSize: 14 }} /> : '-' },
     { title: 'Orders', dataIndex: 'order_count', key: 'orders' },
     { title: 'Total Spend', dataIndex: 'total_spend', key: 'spend', render: formatCurrency },
-    { title: 'Avg Lead Time', dataIndex: 'avg_lead_time', key: 'lead', render: (v: number | null) => v != null ? `${Math.round(v)} days` : '-' },
+    { title: 'Avg Lead Time', dataIndex: 'avg_lead_time', key: 'lead', render: (v: number | null, row: VendorPerformanceItem) => v != null ? `${v.toFixed(1)} days (planned ${row.planned_lead_time})` : '-' },
+    { title: 'On Time', dataIndex: 'on_time_rate', key: 'on_time', render: formatRate },
+    { title: 'Fill Rate', dataIndex: 'fill_rate', key: 'fill', render: formatRate },
   ];
 
   const tabs = [
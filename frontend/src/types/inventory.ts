@@ -2,12 +2,42 @@ export interface StockLevel {
   id: string;
   product_id: string;
   location_id: string;
+  location_path: string | null;
   quantity_on_hand: number;
   quantity_reserved: number;
   quantity_available: number;
   updated_at: string;
 }
 
+export interface StockLocation {
+  id: string;
+  product_id: string;
+  product_sku: string;
+  product_name: string;
+  location_id: string;
+  location_code: string;
+  zone_id: string;
+  zone_code: string;
+  warehouse_id: string;
+  warehouse_code: string;
+  quantity_on_hand: number;
+  quantity_reserved: number;
+  quantity_available: number;
+  updated_at: string;
+}
+
+export interface StockLocationRollup {
+  warehouse_id: string;
+  warehouse_code: string;
+  zone_id: string | null;
+  zone_code: string | null;
+  level: 'warehouse' | 'zone';
+  product_count: number;
+  total_on_hand: number;
+  total_reserved: number;
+  total_available: number;
+}
+
 export interface AggregatedStock {
   product_id: string;
   product_sku: string;
@@ -15,9 +45,12 @@ export interface AggregatedStock {
   total_on_hand: number;
   total_reserved: number;
   total_available: number;
+  quantity_on_order: number;
   reorder_point: number;
   cost_price: number | null;
   stock_value: number | null;
+  abc_class: 'A' | 'B' | 'C' | null;
+  xyz_class: 'X' | 'Y' | 'Z' | null;
 }
 
 export interface StockMovement {
@@ -25,7 +58,9 @@ export interface StockMovement {
   movement_type: string;
   product_id: string;
   from_location_id: string | null;
+  from_location_path: string | null;
   to_location_id: string | null;
+  to_location_path: string | null;
   quantity: number;
   reference_type: string | null;
   reference_id: string | null;
@@ -39,6 +74,7 @@ export interface ReorderAlert {
   product_sku: string;
   product_name: string;
   total_on_hand: number;
+  quantity_on_order: number;
   reorder_point: number;
   reorder_quantity: number;
   deficit: number;
@@ -49,3 +49,28 @@ export interface ProductCategory {
   parent_id: string | null;
   created_at: string;
 }
+
+export interface CategoryTreeNode {
+  id: string;
+  name: string;
+  parent_id: string | null;
+  children: CategoryTreeNode[];
+}
+
+export interface CatalogImportError {
+  line: number;
+  sku: string | null;
+  error: string;
+}
+
+export interface CatalogImportResult {
+  rows: number;
+  valid: number;
+  invalid: number;
+  inserted: number;
+  updated: number;
+  unchanged: number;
+  dry_run: boolean;
+  errors: CatalogImportError[];
+  errors_truncated: boolean;
+}
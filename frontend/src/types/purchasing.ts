@@ -30,7 +30,26 @@ export interface PurchaseOrder {
   line_items: POLineItem[];
 }
 
+export interface PurchaseOrderSummary {
+  id: string;
+  po_number: string;
+  vendor_id: string;
+  vendor_name: string;
+  status: string;
+  order_date: string | null;
+  expected_delivery_date: string | null;
+  subtotal: number;
+  tax_amount: number;
+  total_amount: number;
+  line_count: number;
+  quantity_ordered: number;
+  quantity_received: number;
+  created_at: string;
+  updated_at: string;
+}
+
 export interface POLineItemCreate {
+  id?: string;
   product_id: string;
   quantity_ordered: number;
   unit_price: number;
@@ -67,3 +86,47 @@ export interface GoodsReceipt {
   created_at: string;
   items: GoodsReceiptItem[];
 }
+
+export interface ReplenishmentLine {
+  product_id: string;
+  product_sku: string;
+  product_name: string;
+  on_hand: number;
+  on_order: number;
+  reorder_point: number;
+  quantity: number;
+  unit_price: number | null;
+}
+
+export interface ReplenishmentOrder {
+  vendor_id: string;
+  vendor_code: string;
+  vendor_name: string;
+  po_id: string | null;
+  po_number: string | null;
+  subtotal: number;
+  lines: ReplenishmentLine[];
+}
+
+export interface ReplenishmentResult {
+  dry_run: boolean;
+  purchase_orders: ReplenishmentOrder[];
+  unassigned: ReplenishmentLine[];
+  unpriced: ReplenishmentLine[];
+}
+
+export interface POBulkTransitionResult {
+  id: string;
+  po_number: string | null;
+  success: boolean;
+  previous_status: string | null;
+  status: string | null;
+  detail: string | null;
+}
+
+export interface POBulkTransitionResponse {
+  status: string;
+  updated: number;
+  failed: number;
+  results: POBulkTransitionResult[];
+}